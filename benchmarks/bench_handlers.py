@@ -0,0 +1,270 @@
+"""
+Drives simulated Telegram updates through TelegramBotManager against MockBinanceServer.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_handlers --updates 2000 --concurrency 50
+    python -m benchmarks.bench_handlers --json results.json
+    python -m benchmarks.bench_handlers --compare results.json --max-regression 0.2
+
+With --compare the run exits with status 1 if the overall p99 latency or the
+number of outbound requests per update grew by more than max-regression.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks.mock_binance_server import MockBinanceServer
+from binance_exchange_info_cache import ExchangeInfoCache
+from binance_market_data_async_rest_client import BinanceMarketDataAsyncRestClient
+from binance_market_data_cache import CachedBinanceMarketDataClient
+from binance_ticker_snapshot import BinanceTickerSnapshot
+from kline_store import KlineStore
+from price_alert_engine import PriceAlertEngine
+from telegram_bot_manager import TelegramBotManager
+from telegram_send_scheduler import TelegramSendScheduler
+
+
+# (scenario name, handler method, command arguments)
+COMMANDS = (
+    ('start', 'start', []),
+    ('help', 'help', []),
+    ('server_time', 'server_time', []),
+    ('exchange_info', 'get_exchange_info', []),
+    ('price_btc', 'price_btc', []),
+    ('avg_price_btc', 'get_avg_price_btc', []),
+    ('book_ticker_btc', 'get_book_ticker_btc', []),
+    ('ticker_price_btc', 'get_ticker_price_btc', []),
+    ('ticker_24hr_btc', 'get_ticker_24hr_btc', []),
+    ('recent_trades_btc', 'get_recent_trades_btc', []),
+    ('historical_trades_btc', 'get_historical_trades_btc', []),
+    ('aggregate_trades_btc', 'get_aggregate_trades_btc', []),
+    ('klines_btc', 'get_klines_btc', []),
+    ('order_book_btc', 'get_order_book_btc', []),
+    ('indicators', 'indicators', ['BTCUSDT', '1h']),
+    ('depth', 'depth', ['BTCUSDT', '50000']),
+    ('alert', 'alert', ['BTCUSDT', 'above', '1000000']),
+    ('alerts', 'alerts', []),
+)
+
+# Callback data of the inline keyboard buttons, dispatched through TelegramBotManager.button
+CALLBACKS = (
+    'help', 'server_time', 'price_btc', 'avg_price_btc', 'book_ticker_btc', 'ticker_price_btc', 'ticker_24hr_btc',
+    'recent_trades_btc', 'historical_trades_btc', 'aggregate_trades_btc', 'klines_btc', 'order_book_btc',
+    'market_data_menu', 'main_menu',
+)
+
+
+class RecordingBot:
+    """
+    Stands in for telegram.Bot and counts the outgoing messages instead of sending them.
+    """
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.edited = 0
+        self._message_ids = itertools.count(1)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent += 1
+        return SimpleNamespace(chat_id=chat_id, message_id=next(self._message_ids), text=text)
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs):
+        self.edited += 1
+        return SimpleNamespace(chat_id=chat_id, message_id=message_id, text=text)
+
+
+async def _answer(*args, **kwargs) -> None:
+    pass
+
+
+def make_update(chat_id, callback_data=None) -> SimpleNamespace:
+    """
+    Builds the parts of telegram.Update the handlers read.
+    """
+    chat = SimpleNamespace(id=chat_id, type='private')
+    message = SimpleNamespace(chat_id=chat_id, message_id=chat_id * 1000, chat=chat)
+    if callback_data is None:
+        return SimpleNamespace(effective_chat=chat, effective_user=chat, message=message, callback_query=None)
+    query = SimpleNamespace(data=callback_data, message=message, answer=_answer)
+    return SimpleNamespace(effective_chat=chat, effective_user=chat, message=None, callback_query=query)
+
+
+def rss_bytes() -> int:
+    """
+    Current resident set size, from /proc where available, else the peak from getrusage.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+async def run_benchmark(args) -> dict:
+    server = MockBinanceServer(args.latency, args.jitter, args.error_rate, args.symbols)
+    base_url = await server.start()
+    work_dir = tempfile.mkdtemp(prefix='bench_')
+
+    rest_client = client = BinanceMarketDataAsyncRestClient(base_url=base_url, pool_size=args.pool_size)
+    if args.cache:
+        client = CachedBinanceMarketDataClient(client).allow_stale()
+    ticker_snapshot = BinanceTickerSnapshot(rest_client) if args.snapshot else None
+    exchange_info = ExchangeInfoCache(client, path=os.path.join(work_dir, 'exchange_info.json'))
+    kline_store = KlineStore(os.path.join(work_dir, 'klines'))
+    price_alerts = PriceAlertEngine(os.path.join(work_dir, 'alerts.json'))
+
+    manager = TelegramBotManager('123456:BENCHMARK', client, ticker_snapshot, exchange_info, kline_store, price_alerts)
+    bot = RecordingBot()
+    manager.sender = TelegramSendScheduler(bot, global_rate=1e9, global_burst=1e9, chat_rate=1e9, chat_burst=1e9)
+    await manager._post_init(None)
+    await exchange_info.refresh()
+    if ticker_snapshot is not None:
+        await ticker_snapshot.refresh()
+
+    scenarios = [(name, getattr(manager, method), args_) for name, method, args_ in COMMANDS]
+    scenarios += [(f"button:{data}", manager.button, data) for data in CALLBACKS]
+    latencies = {name: [] for name, _, _ in scenarios}
+    errors = 0
+
+    async def drive(index) -> None:
+        nonlocal errors
+        name, handler, extra = scenarios[index % len(scenarios)]
+        chat_id = 1 + index % args.chats
+        if name.startswith('button:'):
+            update, context = make_update(chat_id, extra), SimpleNamespace(args=[])
+        else:
+            update, context = make_update(chat_id), SimpleNamespace(args=list(extra))
+        started = time.perf_counter()
+        try:
+            await handler(update, context)
+        except Exception as e:
+            errors += 1
+            if errors <= 5:
+                print(f"{name} failed: {e!r}")
+        latencies[name].append(time.perf_counter() - started)
+
+    # Warm-up pass, so connection setup and first-time caches are not measured
+    await asyncio.gather(*(drive(index) for index in range(len(scenarios))))
+    for values in latencies.values():
+        values.clear()
+    requests_before = server.total_requests
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(index) -> None:
+        async with semaphore:
+            await drive(index)
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(index) for index in range(args.updates)))
+    elapsed = time.perf_counter() - started
+    outbound = server.total_requests - requests_before
+
+    await manager._post_shutdown(None)
+    await server.stop()
+
+    all_latencies = np.array([value for values in latencies.values() for value in values])
+    per_scenario = {
+        name: {'count': len(values), 'p50_ms': float(np.percentile(values, 50) * 1e3),
+               'p99_ms': float(np.percentile(values, 99) * 1e3)}
+        for name, values in latencies.items() if values
+    }
+    return {
+        'updates': args.updates,
+        'concurrency': args.concurrency,
+        'elapsed_s': elapsed,
+        'throughput_per_s': args.updates / elapsed,
+        'p50_ms': float(np.percentile(all_latencies, 50) * 1e3),
+        'p99_ms': float(np.percentile(all_latencies, 99) * 1e3),
+        'errors': errors,
+        'outbound_requests': outbound,
+        'outbound_per_update': outbound / args.updates,
+        'outbound_by_endpoint': dict(server.requests),
+        'telegram_messages': bot.sent + bot.edited,
+        'rss_mb': rss_bytes() / 2 ** 20,
+        'rss_growth_mb': (rss_bytes() - rss_before) / 2 ** 20,
+        'scenarios': per_scenario,
+    }
+
+
+def print_report(result) -> None:
+    print(f"{'scenario':<32}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, stats in sorted(result['scenarios'].items()):
+        print(f"{name:<32}{stats['count']:>8}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    print()
+    print(f"Updates:            {result['updates']} at concurrency {result['concurrency']}")
+    print(f"Throughput:         {result['throughput_per_s']:.1f} updates/s")
+    print(f"Latency:            p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+    print(f"Handler errors:     {result['errors']}")
+    print(f"Outbound requests:  {result['outbound_requests']} ({result['outbound_per_update']:.2f} per update)")
+    print(f"Telegram messages:  {result['telegram_messages']}")
+    print(f"RSS:                {result['rss_mb']:.1f} MiB ({result['rss_growth_mb']:+.1f} MiB during the run)")
+
+
+def compare(result, baseline, max_regression) -> bool:
+    """
+    Prints the change against a baseline run.
+
+    Returns:
+        bool: False if a tracked metric regressed by more than max_regression.
+    """
+    ok = True
+    for key, higher_is_worse in (('p50_ms', True), ('p99_ms', True), ('throughput_per_s', False),
+                                 ('outbound_per_update', True), ('rss_mb', True)):
+        old, new = baseline.get(key), result[key]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = change > max_regression if higher_is_worse else -change > max_regression
+        # Only latency and outbound request count fail the run, the other metrics are too noisy
+        if worse and key in ('p99_ms', 'outbound_per_update'):
+            ok = False
+        print(f"{key:<22}{old:>12.2f} -> {new:>12.2f} ({change:+.1%}){'  REGRESSION' if worse else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the bot handlers against a mock Binance server.')
+    parser.add_argument('--updates', type=int, default=1000, help='Number of simulated updates')
+    parser.add_argument('--concurrency', type=int, default=32, help='Updates handled at the same time')
+    parser.add_argument('--chats', type=int, default=100, help='Number of distinct simulated chats')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock server latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Mock server latency jitter in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of mock requests that fail')
+    parser.add_argument('--symbols', type=int, default=500, help='Symbols in the all-symbols fixtures')
+    parser.add_argument('--pool-size', type=int, default=50, help='HTTP connection pool size')
+    parser.add_argument('--no-cache', dest='cache', action='store_false', help='Disable the response cache')
+    parser.add_argument('--no-snapshot', dest='snapshot', action='store_false', help='Disable the ticker snapshot')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--compare', help='Baseline results file to compare with')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed relative regression')
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    print_report(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print()
+        if not compare(result, baseline, args.max_regression):
+            exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+
+class MockBinanceServer:
+    """
+    A local stand-in for data-api.binance.vision used by the benchmarks.
+
+    Serves the public market data endpoints the bot uses with fixture payloads
+    shaped like the real responses (decimal strings, full row layouts, a few
+    hundred symbols for the all-symbols lists). Every request waits for a
+    configurable latency and fails with the configured probability, half of
+    the failures being 429 with Retry-After and half 500.
+
+    Requests are counted per path, so a benchmark can report how many
+    outbound calls a workload produced.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, symbols=500, seed=1) -> None:
+        """
+        Args:
+            latency (float, optional): Mean response latency in seconds. Default: 0.05.
+            jitter (float, optional): Uniform +- jitter added to the latency in seconds. Default: 0.02.
+            error_rate (float, optional): Probability of answering with an error. Default: 0.
+            symbols (int, optional): Number of symbols in the all-symbols lists. Default: 500.
+            seed (int, optional): Seed of the fixture and error generators. Default: 1.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = Counter()
+        self.weight = 0
+        self._runner = None
+        self._fixtures = self._build_fixtures(symbols)
+        self.app = web.Application()
+        self.app.router.add_get('/api/v3/{endpoint:.*}', self._handle)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    async def start(self, host='127.0.0.1', port=0) -> str:
+        """
+        Starts serving in the running event loop.
+
+        Returns:
+            str: Base URL to pass to BinanceMarketDataAsyncRestClient.
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return f"http://{host}:{self._runner.addresses[0][1]}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _build_fixtures(self, count) -> dict:
+        rnd = self.random
+        assets = ['BTC', 'ETH', 'BNB', 'SOL', 'XRP', 'ADA', 'DOGE', 'TRX', 'DOT', 'LTC']
+        assets += [f"A{index:03d}" for index in range(max(0, count // 2 - len(assets)))]
+        symbols = {'BTCUSDT': 64000.0}
+        for asset in assets:
+            for quote in ('USDT', 'BTC'):
+                if asset != quote and len(symbols) < count:
+                    symbols.setdefault(f"{asset}{quote}", rnd.uniform(0.0001, 3000.0))
+
+        prices, book_tickers, tickers_24hr, exchange_symbols = [], [], [], []
+        for symbol, price in symbols.items():
+            quote = 'USDT' if symbol.endswith('USDT') else 'BTC'
+            prices.append({"symbol": symbol, "price": f"{price:.8f}"})
+            book_tickers.append({"symbol": symbol, "bidPrice": f"{price * 0.9999:.8f}", "bidQty": f"{rnd.uniform(0, 10):.8f}",
+                                 "askPrice": f"{price * 1.0001:.8f}", "askQty": f"{rnd.uniform(0, 10):.8f}"})
+            tickers_24hr.append({
+                "symbol": symbol, "priceChange": f"{price * 0.01:.8f}", "priceChangePercent": "1.000",
+                "weightedAvgPrice": f"{price:.8f}", "prevClosePrice": f"{price * 0.99:.8f}",
+                "lastPrice": f"{price:.8f}", "lastQty": "0.01000000", "bidPrice": f"{price * 0.9999:.8f}",
+                "bidQty": "1.00000000", "askPrice": f"{price * 1.0001:.8f}", "askQty": "1.00000000",
+                "openPrice": f"{price * 0.99:.8f}", "highPrice": f"{price * 1.02:.8f}", "lowPrice": f"{price * 0.98:.8f}",
+                "volume": "12345.00000000", "quoteVolume": f"{12345 * price:.8f}", "openTime": 0, "closeTime": 0,
+                "firstId": 1, "lastId": 100000, "count": 100000,
+            })
+            exchange_symbols.append({
+                "symbol": symbol, "status": "TRADING", "baseAsset": symbol[:-len(quote)], "quoteAsset": quote,
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": "0.00000001", "maxPrice": "1000000.00000000", "tickSize": "0.00000001"},
+                    {"filterType": "LOT_SIZE", "minQty": "0.00001000", "maxQty": "9000.00000000", "stepSize": "0.00001000"},
+                    {"filterType": "NOTIONAL", "minNotional": "5.00000000"},
+                ],
+            })
+
+        return {
+            'symbols': symbols,
+            'ticker/price': prices,
+            'ticker/bookTicker': book_tickers,
+            'ticker/24hr': tickers_24hr,
+            'exchangeInfo': {
+                "timezone": "UTC", "serverTime": 0,
+                "rateLimits": [{"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": 6000}],
+                "symbols": exchange_symbols,
+            },
+        }
+
+    def _price(self, symbol) -> float:
+        return self._fixtures['symbols'].get(symbol, 1.0)
+
+    def _trades(self, symbol, limit) -> list:
+        price = self._price(symbol)
+        now = int(time.time() * 1000)
+        return [{"id": 1000000 + index, "price": f"{price * (1 + (index % 7 - 3) * 1e-4):.8f}", "qty": "0.01200000",
+                 "quoteQty": f"{price * 0.012:.8f}", "time": now - (limit - index) * 50,
+                 "isBuyerMaker": index % 2 == 0, "isBestMatch": True} for index in range(limit)]
+
+    def _agg_trades(self, symbol, limit, from_id) -> list:
+        price = self._price(symbol)
+        now = int(time.time() * 1000)
+        first = from_id if from_id is not None else 5000000
+        return [{"a": first + index, "p": f"{price * (1 + (index % 5 - 2) * 1e-4):.8f}", "q": "0.05000000",
+                 "f": (first + index) * 2, "l": (first + index) * 2 + 1, "T": now - (limit - index) * 50,
+                 "m": index % 3 == 0, "M": True} for index in range(limit)]
+
+    def _klines(self, symbol, interval, limit, start_time, end_time) -> list:
+        step = {'1s': 1, '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800, '1h': 3600, '2h': 7200,
+                '4h': 14400, '6h': 21600, '8h': 28800, '12h': 43200, '1d': 86400, '3d': 259200,
+                '1w': 604800}.get(interval, 60) * 1000
+        now = int(time.time() * 1000) // step * step
+        end = min(end_time if end_time is not None else now, now)
+        start = start_time if start_time is not None else end - (limit - 1) * step
+        first = -(-start // step) * step
+        price = self._price(symbol)
+        rows = []
+        for open_time in range(first, end + 1, step):
+            wave = ((open_time // step) % 17 - 8) * 1e-3
+            close = price * (1 + wave)
+            rows.append([open_time, f"{price:.8f}", f"{max(price, close) * 1.001:.8f}",
+                         f"{min(price, close) * 0.999:.8f}", f"{close:.8f}", "10.00000000", open_time + step - 1,
+                         f"{close * 10:.8f}", 100, "5.00000000", f"{close * 5:.8f}", "0"])
+            if len(rows) == limit:
+                break
+        return rows
+
+    def _depth(self, symbol, limit) -> dict:
+        price = self._price(symbol)
+        tick = price * 1e-5
+        return {
+            "lastUpdateId": int(time.time() * 1000),
+            "bids": [[f"{price - tick * (index + 1):.8f}", f"{0.1 + index % 10 * 0.05:.8f}"] for index in range(limit)],
+            "asks": [[f"{price + tick * (index + 1):.8f}", f"{0.1 + index % 10 * 0.05:.8f}"] for index in range(limit)],
+        }
+
+    def _payload(self, endpoint, query):
+        symbol = query.get('symbol')
+        limit = int(query.get('limit', 500))
+        fixtures = self._fixtures
+        if endpoint == 'time':
+            return {"serverTime": int(time.time() * 1000)}
+        if endpoint in ('ticker/price', 'ticker/bookTicker', 'ticker/24hr'):
+            rows = fixtures[endpoint]
+            if symbol:
+                return next((row for row in rows if row['symbol'] == symbol), None)
+            if 'symbols' in query:
+                wanted = set(json.loads(query['symbols']))
+                return [row for row in rows if row['symbol'] in wanted]
+            return rows
+        if endpoint == 'avgPrice':
+            return {"mins": 5, "price": f"{self._price(symbol):.8f}", "closeTime": int(time.time() * 1000)}
+        if endpoint in ('trades', 'historicalTrades'):
+            return self._trades(symbol, limit)
+        if endpoint == 'aggTrades':
+            from_id = query.get('fromId')
+            return self._agg_trades(symbol, limit, int(from_id) if from_id is not None else None)
+        if endpoint == 'klines':
+            start_time, end_time = query.get('startTime'), query.get('endTime')
+            return self._klines(symbol, query.get('interval', '1m'), limit,
+                                int(start_time) if start_time is not None else None,
+                                int(end_time) if end_time is not None else None)
+        if endpoint == 'depth':
+            return self._depth(symbol, limit)
+        if endpoint == 'exchangeInfo':
+            return fixtures['exchangeInfo']
+        return None
+
+    async def _handle(self, request) -> web.Response:
+        endpoint = request.match_info['endpoint']
+        self.requests[endpoint] += 1
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+        if self.random.random() < self.error_rate:
+            if self.random.random() < 0.5:
+                return web.json_response({"code": -1003, "msg": "Too many requests."}, status=429,
+                                         headers={"Retry-After": "1"})
+            return web.json_response({"code": -1000, "msg": "An unknown error occurred."}, status=500)
+
+        payload = self._payload(endpoint, request.query)
+        if payload is None:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        self.weight += 1
+        return web.json_response(payload, headers={"X-MBX-USED-WEIGHT-1M": str(self.weight % 1000)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serves mock Binance market data endpoints.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8999)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockBinanceServer(args.latency, args.jitter, args.error_rate)
+    web.run_app(server.app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
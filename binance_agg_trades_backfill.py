@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import struct
+import time
+
+from binance_rate_limiter import PRIORITY_BACKGROUND
+
+
+# Aggregate tradeId, price, quantity, first tradeId, last tradeId, timestamp, flags
+AGG_TRADE_RECORD = struct.Struct('<qddqqqB')
+FLAG_BUYER_MAKER = 1
+FLAG_BEST_MATCH = 2
+
+
+def read_agg_trades(path):
+    """
+    Iterates over the records of a backfill data file.
+
+    Args:
+        path (str): Path of a <symbol>.aggtrades file.
+
+    Yields:
+        tuple: (aggregate tradeId, price, quantity, first tradeId, last tradeId, timestamp, flags)
+    """
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(AGG_TRADE_RECORD.size * 4096)
+            if not chunk:
+                return
+            usable = len(chunk) - len(chunk) % AGG_TRADE_RECORD.size
+            yield from AGG_TRADE_RECORD.iter_unpack(chunk[:usable])
+
+
+class AggTradesBackfill:
+    """
+    Downloads the aggregate trades of a time range for one or more symbols.
+
+    The start of the range is located once with a startTime/endTime query
+    (at most one hour wide, as required by /aggTrades). From there the
+    engine only chains fromId pages of 1000 trades, which never times out.
+    Trades are appended to <data_dir>/<symbol>.aggtrades as fixed-size
+    binary records (AGG_TRADE_RECORD) and progress is checkpointed after
+    every page, so an interrupted backfill continues where it stopped. A
+    backfill with another start time starts the file over.
+
+    Several symbols run in parallel; they share the weight budget through
+    the rate limiter of the client and are sent at background priority.
+    """
+
+    PAGE_LIMIT = 1000
+    MAX_WINDOW_MS = 60 * 60 * 1000 - 1
+
+    def __init__(self, client, data_dir='agg_trades', max_parallel=4, max_retries=5,
+                 retry_delay=1.0, priority=PRIORITY_BACKGROUND, clock=None) -> None:
+        """
+        Args:
+            client (BinanceMarketDataAsyncRestClient): Client used to fetch the trades.
+            data_dir (str, optional): Directory of the data and checkpoint files. Default: agg_trades.
+            max_parallel (int, optional): Number of symbols downloaded at the same time. Default: 4.
+            max_retries (int, optional): Retries of one request before giving up. Default: 5.
+            retry_delay (float, optional): Initial delay between retries in seconds, doubled each time. Default: 1.
+            priority (int, optional): Rate limiter priority of the requests. Default: PRIORITY_BACKGROUND.
+            clock (BinanceServerClock, optional): Server clock for the default end time. Default: the local clock.
+        """
+        self.client = client
+        self.data_dir = data_dir
+        self.max_parallel = max_parallel
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.priority = priority
+        self.clock = clock
+
+    def _now_ms(self) -> int:
+        return self.clock.server_now_ms() if self.clock else int(time.time() * 1000)
+
+    def data_path(self, symbol) -> str:
+        return os.path.join(self.data_dir, f"{symbol}.aggtrades")
+
+    def checkpoint_path(self, symbol) -> str:
+        return os.path.join(self.data_dir, f"{symbol}.checkpoint.json")
+
+    async def run(self, symbols, start_time, end_time=None) -> dict:
+        """
+        Backfills several symbols in parallel.
+
+        Args:
+            symbols (list): Symbols to download (e.g., ['BTCUSDT', 'ETHUSDT']).
+            start_time (int): Start of the range in ms, INCLUSIVE.
+            end_time (int, optional): End of the range in ms, INCLUSIVE. Defaults to now.
+
+        Returns:
+            dict: Symbol to the number of trades written, or to the exception that stopped it.
+        """
+        if end_time is None:
+            end_time = self._now_ms()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def run_one(symbol):
+            async with semaphore:
+                return await self.backfill(symbol, start_time, end_time)
+
+        results = await asyncio.gather(*(run_one(symbol) for symbol in symbols), return_exceptions=True)
+        return dict(zip(symbols, results))
+
+    async def backfill(self, symbol, start_time, end_time=None) -> int:
+        """
+        Backfills one symbol, resuming from its checkpoint if there is one.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            start_time (int): Start of the range in ms, INCLUSIVE.
+            end_time (int, optional): End of the range in ms, INCLUSIVE. Defaults to now.
+
+        Returns:
+            int: Number of trades written by this call.
+        """
+        if end_time is None:
+            end_time = self._now_ms()
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        checkpoint = await asyncio.to_thread(self._load_checkpoint, symbol)
+        if checkpoint and checkpoint.get('start_time') == start_time:
+            from_id = checkpoint['last_id'] + 1
+            records = checkpoint['records']
+            if checkpoint['last_time'] >= end_time:
+                return 0
+        else:
+            if checkpoint:
+                print(f"Discarding {checkpoint.get('records', 0)} aggregate trades of {symbol} backfilled from "
+                      f"{checkpoint.get('start_time')}, the new start time is {start_time}")
+                # A stale checkpoint must not outlive the file it describes
+                await asyncio.to_thread(os.remove, self.checkpoint_path(symbol))
+            from_id = await self._seek(symbol, start_time, end_time)
+            records = 0
+            checkpoint = {'start_time': start_time}
+        # Drop whatever was appended after the last checkpoint
+        await asyncio.to_thread(self._truncate, symbol, records)
+
+        written = 0
+        while from_id is not None:
+            trades = await self._request(symbol, fromId=from_id, limit=self.PAGE_LIMIT)
+            in_range = [trade for trade in trades if trade['T'] <= end_time]
+            if in_range:
+                records += len(in_range)
+                written += len(in_range)
+                checkpoint.update(last_id=in_range[-1]['a'], last_time=in_range[-1]['T'], records=records)
+                await asyncio.to_thread(self._append, symbol, in_range, checkpoint)
+            if len(in_range) < self.PAGE_LIMIT:
+                break
+            from_id = in_range[-1]['a'] + 1
+        return written
+
+    async def _seek(self, symbol, start_time, end_time):
+        # Find the first aggregate tradeId of the range one hour window at a time
+        window_start = start_time
+        while window_start <= end_time:
+            window_end = min(window_start + self.MAX_WINDOW_MS, end_time)
+            trades = await self._request(symbol, startTime=window_start, endTime=window_end, limit=1)
+            if trades:
+                return trades[0]['a']
+            window_start = window_end + 1
+        return None
+
+    async def _request(self, symbol, **params) -> list:
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            trades = await self.client.get_aggregate_trades(symbol, priority=self.priority, **params)
+            if trades is not None:
+                return trades
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+        raise ConnectionError(f"Failed to download aggregate trades of {symbol} ({params})")
+
+    def _load_checkpoint(self, symbol):
+        try:
+            with open(self.checkpoint_path(symbol), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _truncate(self, symbol, records) -> None:
+        with open(self.data_path(symbol), 'ab') as f:
+            f.truncate(records * AGG_TRADE_RECORD.size)
+
+    def _append(self, symbol, trades, checkpoint) -> None:
+        pack = AGG_TRADE_RECORD.pack
+        data = b''.join(
+            pack(trade['a'], float(trade['p']), float(trade['q']), trade['f'], trade['l'], trade['T'],
+                 (FLAG_BUYER_MAKER if trade['m'] else 0) | (FLAG_BEST_MATCH if trade['M'] else 0))
+            for trade in trades
+        )
+        with open(self.data_path(symbol), 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # The checkpoint is only moved once the trades it covers are on disk
+        tmp_path = f"{self.checkpoint_path(symbol)}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path(symbol))
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN
+from typing import NamedTuple
+
+from binance_rate_limiter import PRIORITY_BACKGROUND
+
+
+class SymbolInfo(NamedTuple):
+    symbol: str
+    status: str
+    base_asset: str
+    quote_asset: str
+    tick_size: str
+    step_size: str
+    min_qty: str
+    min_notional: str
+
+
+class ExchangeInfoCache:
+    """
+    A persistent, indexed copy of the exchangeInfo trading rules.
+
+    Only the fields the bot uses are kept: timezone, rate limits and one
+    compact row per symbol (status, base/quote asset, tickSize, stepSize,
+    minQty, minNotional). The rows are stored on disk as a small JSON file
+    that loads in milliseconds on startup; a background task refreshes it
+    from Binance and only rewrites the file when a row actually changed.
+
+    Symbol validation and price/quantity formatting use the in-memory index
+    and never touch the network.
+
+    When several processes share one cache file, only one of them downloads
+    (e.g. market_data_feeder.py); the others are created with download=False
+    and reload the file whenever it changes.
+    """
+
+    CACHE_VERSION = 1
+    DEFAULT_PATH = 'exchange_info_cache.json'
+
+    def __init__(self, client, path=DEFAULT_PATH, refresh_interval=3600.0, download=True,
+                 reload_interval=60.0) -> None:
+        """
+        Args:
+            client (BinanceMarketDataAsyncRestClient): Client used to download exchangeInfo.
+            path (str, optional): Location of the cache file. Default: exchange_info_cache.json.
+            refresh_interval (float, optional): Seconds between background refreshes. Default: 3600.
+            download (bool, optional): Whether the background task downloads exchangeInfo. If False it
+                only reloads the file written by another process. Default: True.
+            reload_interval (float, optional): Seconds between two checks of the file when download
+                is False. Default: 60.
+        """
+        self.client = client
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.download = download
+        self.reload_interval = reload_interval
+        self.timezone = None
+        self.server_time = None
+        self.rate_limits = []
+        self.updated_at = None
+        self._symbols = {}
+        self._by_base_asset = {}
+        self._by_quote_asset = {}
+        self._loaded_mtime = None
+        self._task = None
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def load(self) -> bool:
+        """
+        Loads the cache file from disk.
+
+        Returns:
+            bool: True if a valid cache file was loaded.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"Error: failed to read {self.path}: {e}")
+            return False
+
+        self._loaded_mtime = mtime
+        if data.get('version') != self.CACHE_VERSION:
+            return False
+
+        self.timezone = data.get('timezone')
+        self.server_time = data.get('serverTime')
+        self.rate_limits = data.get('rateLimits', [])
+        self.updated_at = data.get('updatedAt')
+        self._set_symbols({row[0]: SymbolInfo(*row) for row in data.get('symbols', [])})
+        self._configure_rate_limiter()
+        return True
+
+    def start(self) -> None:
+        """
+        Starts the background refresh task on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the background refresh task.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self) -> bool:
+        """
+        Downloads exchangeInfo, applies the changed symbols and saves the cache if anything changed.
+
+        Returns:
+            bool: True if exchangeInfo was received.
+        """
+        exchange_info = await self.client.get_exchange_info(priority=PRIORITY_BACKGROUND)
+        if not exchange_info:
+            return False
+
+        symbols = {}
+        for item in exchange_info.get('symbols') or exchange_info.get('optionSymbols') or []:
+            info = self._parse_symbol(item)
+            symbols[info.symbol] = info
+
+        changed = symbols != self._symbols or exchange_info.get('rateLimits', []) != self.rate_limits
+        if symbols != self._symbols:
+            added = symbols.keys() - self._symbols.keys()
+            removed = self._symbols.keys() - symbols.keys()
+            modified = sum(1 for name, info in symbols.items() if name in self._symbols and self._symbols[name] != info)
+            print(f"Exchange info updated: {len(added)} added, {len(removed)} removed, {modified} changed symbols")
+            self._set_symbols(symbols)
+
+        self.timezone = exchange_info.get('timezone')
+        self.server_time = exchange_info.get('serverTime')
+        self.rate_limits = exchange_info.get('rateLimits', [])
+        self.updated_at = time.time()
+
+        if changed or not os.path.exists(self.path):
+            await asyncio.to_thread(self._save)
+        return True
+
+    def get_symbol(self, symbol) -> SymbolInfo:
+        """
+        Returns the trading rules of a symbol, or None if the symbol is unknown.
+        """
+        return self._symbols.get(symbol.upper())
+
+    def is_valid_symbol(self, symbol) -> bool:
+        """
+        Returns True if the symbol exists and is currently trading.
+        """
+        info = self._symbols.get(symbol.upper())
+        return info is not None and info.status in ('TRADING', '')
+
+    def symbols_by_base_asset(self, asset) -> list:
+        return self._by_base_asset.get(asset.upper(), [])
+
+    def symbols_by_quote_asset(self, asset) -> list:
+        return self._by_quote_asset.get(asset.upper(), [])
+
+    def all_symbols(self) -> list:
+        return list(self._symbols.values())
+
+    def format_price(self, symbol, price) -> str:
+        """
+        Rounds a price down to the tickSize of the symbol and formats it without trailing zeros.
+        """
+        info = self.get_symbol(symbol)
+        return self._format_step(price, info.tick_size if info else '')
+
+    def format_quantity(self, symbol, quantity) -> str:
+        """
+        Rounds a quantity down to the stepSize of the symbol and formats it without trailing zeros.
+        """
+        info = self.get_symbol(symbol)
+        return self._format_step(quantity, info.step_size if info else '')
+
+    def _set_symbols(self, symbols) -> None:
+        by_base_asset = {}
+        by_quote_asset = {}
+        for info in symbols.values():
+            by_base_asset.setdefault(info.base_asset, []).append(info.symbol)
+            by_quote_asset.setdefault(info.quote_asset, []).append(info.symbol)
+        self._symbols = symbols
+        self._by_base_asset = by_base_asset
+        self._by_quote_asset = by_quote_asset
+
+    def _configure_rate_limiter(self) -> None:
+        rate_limiter = getattr(self.client, 'rate_limiter', None)
+        if rate_limiter is not None and self.rate_limits:
+            rate_limiter.configure(self.rate_limits)
+
+    def _save(self) -> None:
+        data = {
+            'version': self.CACHE_VERSION,
+            'timezone': self.timezone,
+            'serverTime': self.server_time,
+            'rateLimits': self.rate_limits,
+            'updatedAt': self.updated_at,
+            'symbols': [list(info) for info in self._symbols.values()],
+        }
+        # Write to a temporary file first so a crash never leaves a truncated cache behind. Saves
+        # can overlap (a manual refresh during the background one), each gets its own file
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error: failed to write {self.path}: {e}")
+
+    async def _run(self) -> None:
+        if not self.download:
+            await self._follow()
+            return
+        if self.updated_at is not None:
+            # A cache file loaded from a recent run is current, the next download is due when it expires
+            age = time.time() - self.updated_at
+            if 0 <= age < self.refresh_interval:
+                await asyncio.sleep(self.refresh_interval - age)
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Failed to refresh the exchange info: {e!r}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _follow(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                continue
+            if mtime != self._loaded_mtime:
+                await asyncio.to_thread(self.load)
+
+    @staticmethod
+    def _parse_symbol(item) -> SymbolInfo:
+        filters = {f.get('filterType'): f for f in item.get('filters', [])}
+        price_filter = filters.get('PRICE_FILTER', {})
+        lot_size = filters.get('LOT_SIZE', {})
+        notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+        return SymbolInfo(
+            symbol=item['symbol'],
+            status=item.get('status', ''),
+            base_asset=item.get('baseAsset', ''),
+            quote_asset=item.get('quoteAsset', ''),
+            tick_size=price_filter.get('tickSize', ''),
+            step_size=lot_size.get('stepSize', item.get('minQty', '')),
+            min_qty=lot_size.get('minQty', item.get('minQty', '')),
+            min_notional=notional.get('minNotional', ''),
+        )
+
+    @staticmethod
+    def _format_step(value, step) -> str:
+        value = Decimal(str(value))
+        if step and Decimal(step) > 0:
+            step = Decimal(step).normalize()
+            value = (value / step).to_integral_value(rounding=ROUND_DOWN) * step
+        return f"{value.normalize():f}"
@@ -0,0 +1,162 @@
+import random
+import time
+from collections import deque
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Stops traffic to a host after consecutive failures.
+
+    After failure_threshold failures in a row the breaker opens and the host
+    is skipped for reset_timeout seconds. Then one trial request is let
+    through (half-open): a success closes the breaker, a failure opens it
+    again for twice as long, up to max_reset_timeout.
+    """
+
+    __slots__ = ('failure_threshold', 'reset_timeout', 'max_reset_timeout', 'state', 'failures',
+                 'opened_at', 'open_for', '_trial_in_flight')
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, max_reset_timeout=300.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_for = reset_timeout
+        self._trial_in_flight = False
+
+    def available(self, now=None) -> bool:
+        """
+        Returns True if a request may be sent to the host now.
+        """
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic() if now is None else now
+        if self.state == OPEN and now - self.opened_at >= self.open_for:
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        return self.state == HALF_OPEN and not self._trial_in_flight
+
+    def on_request(self) -> None:
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = True
+
+    def on_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.open_for = self.reset_timeout
+        self._trial_in_flight = False
+
+    def on_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.open_for = min(self.open_for * 2, self.max_reset_timeout)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def on_cancel(self) -> None:
+        # A cancelled trial (e.g. the losing side of a hedge) says nothing about the host
+        self._trial_in_flight = False
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class _Host:
+    __slots__ = ('url', 'breaker', 'latencies', 'samples', '_p95', '_p95_samples')
+
+    def __init__(self, url, breaker) -> None:
+        self.url = url
+        self.breaker = breaker
+        self.latencies = deque(maxlen=256)
+        self.samples = 0
+        self._p95 = None
+        self._p95_samples = 0
+
+    def p95(self):
+        # Recomputed every 32 samples, so the sort is amortized over many requests
+        if len(self.latencies) < 20:
+            return None
+        if self._p95 is None or self.samples - self._p95_samples >= 32:
+            ordered = sorted(self.latencies)
+            self._p95 = ordered[int(len(ordered) * 0.95) - 1]
+            self._p95_samples = self.samples
+        return self._p95
+
+
+class BinanceHostPool:
+    """
+    A list of equivalent Binance hosts with one circuit breaker each.
+
+    pick() returns the first available host in preference order, skipping
+    hosts whose breaker is open and the hosts already tried for the current
+    request, so retries and hedges go to a different host. Successful
+    request latencies are tracked per host to derive the hedging delay.
+    """
+
+    def __init__(self, urls, failure_threshold=5, reset_timeout=30.0, max_reset_timeout=300.0) -> None:
+        """
+        Args:
+            urls (list): Base URLs in preference order.
+            failure_threshold (int, optional): Consecutive failures that open a breaker. Default: 5.
+            reset_timeout (float, optional): Seconds a breaker stays open at first. Default: 30.
+            max_reset_timeout (float, optional): Upper bound of the open period in seconds. Default: 300.
+        """
+        if not urls:
+            raise ValueError('At least one base URL is required')
+        self.hosts = [_Host(url, CircuitBreaker(failure_threshold, reset_timeout, max_reset_timeout))
+                      for url in urls]
+        self._by_url = {host.url: host for host in self.hosts}
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def pick(self, exclude=()):
+        """
+        Returns the base URL to use, or None if every host is unavailable or excluded.
+        """
+        now = time.monotonic()
+        for host in self.hosts:
+            if host.url not in exclude and host.breaker.available(now):
+                host.breaker.on_request()
+                return host.url
+        return None
+
+    def on_success(self, url, latency) -> None:
+        host = self._by_url[url]
+        host.breaker.on_success()
+        host.latencies.append(latency)
+        host.samples += 1
+
+    def on_failure(self, url) -> None:
+        self._by_url[url].breaker.on_failure()
+
+    def on_cancel(self, url) -> None:
+        self._by_url[url].breaker.on_cancel()
+
+    def hedge_delay(self, url, minimum=0.05):
+        """
+        Returns how long to wait for a request to the host before hedging it, or None
+        if not enough latencies were observed yet.
+        """
+        p95 = self._by_url[url].p95()
+        return None if p95 is None else max(p95, minimum)
+
+    def states(self) -> dict:
+        return {host.url: host.breaker.state for host in self.hosts}
+
+
+def backoff_delay(attempt, base=0.2, cap=5.0) -> float:
+    """
+    Exponential backoff with full jitter: a random delay in [0, min(cap, base * 2**attempt)].
+    """
+    return random.uniform(0.0, min(cap, base * 2 ** attempt))
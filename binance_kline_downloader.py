@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+
+from binance_rate_limiter import PRIORITY_BACKGROUND
+
+
+# Length of every fixed kline interval in milliseconds ('1M' has no fixed length)
+INTERVAL_MILLISECONDS = {
+    '1s': 1000,
+    '1m': 60 * 1000,
+    '3m': 3 * 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '30m': 30 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '2h': 2 * 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+    '6h': 6 * 60 * 60 * 1000,
+    '8h': 8 * 60 * 60 * 1000,
+    '12h': 12 * 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000,
+    '3d': 3 * 24 * 60 * 60 * 1000,
+    '1w': 7 * 24 * 60 * 60 * 1000,
+}
+
+
+class KlineDownloadError(Exception):
+    """
+    Raised when a page could not be downloaded after all retries.
+
+    Attributes:
+        resume_time (int): Open time in ms to pass as start_time to continue the download.
+    """
+
+    def __init__(self, message, resume_time) -> None:
+        super().__init__(message)
+        self.resume_time = resume_time
+
+
+class KlineRangeDownloader:
+    """
+    Downloads klines of an arbitrary time range page by page.
+
+    The range is split into windows of page_size candles that are fetched
+    concurrently (up to max_concurrency pages ahead), while the rows are
+    yielded strictly in open time order. Weight budgeting is left to the
+    rate limiter of the client, requests are sent at background priority.
+    """
+
+    def __init__(self, client, page_size=1000, max_concurrency=4, max_retries=3,
+                 retry_delay=1.0, priority=PRIORITY_BACKGROUND, clock=None) -> None:
+        """
+        Args:
+            client (BinanceMarketDataAsyncRestClient): Client used to fetch the pages.
+            page_size (int, optional): Klines per request, max 1000. Default: 1000.
+            max_concurrency (int, optional): Number of pages fetched ahead in parallel. Default: 4.
+            max_retries (int, optional): Retries of one page before giving up. Default: 3.
+            retry_delay (float, optional): Initial delay between retries in seconds, doubled each time. Default: 1.
+            priority (int, optional): Rate limiter priority of the requests. Default: PRIORITY_BACKGROUND.
+            clock (BinanceServerClock, optional): Server clock for the default end time. Default: the local clock.
+        """
+        self.client = client
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.priority = priority
+        self.clock = clock
+
+    async def iter_klines(self, symbol, interval, start_time, end_time=None):
+        """
+        Yields the klines of [start_time, end_time] in open time order.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            interval (str): Kline interval (e.g., '1m', '1h').
+            start_time (int): Start of the range in ms, INCLUSIVE.
+            end_time (int, optional): End of the range in ms, INCLUSIVE. Defaults to now.
+
+        Yields:
+            list: One kline row as returned by get_klines.
+
+        Raises:
+            KlineDownloadError: If a page keeps failing. Its resume_time continues the download.
+        """
+        if end_time is None:
+            end_time = self.clock.server_now_ms() if self.clock else int(time.time() * 1000)
+
+        interval_ms = INTERVAL_MILLISECONDS.get(interval)
+        if interval_ms is None:
+            # Calendar months have no fixed length, so pages can only be chained one by one
+            async for row in self._iter_sequential(symbol, interval, start_time, end_time):
+                yield row
+            return
+
+        window_ms = self.page_size * interval_ms
+        windows = ((window_start, min(window_start + window_ms - 1, end_time))
+                   for window_start in range(start_time, end_time + 1, window_ms))
+        pending = deque()
+        resume_time = start_time
+        try:
+            for window in windows:
+                pending.append(asyncio.create_task(self._fetch_page(symbol, interval, *window)))
+                if len(pending) < self.max_concurrency:
+                    continue
+                async for row in self._drain_head(pending):
+                    resume_time = row[0] + interval_ms
+                    yield row
+            while pending:
+                async for row in self._drain_head(pending):
+                    resume_time = row[0] + interval_ms
+                    yield row
+        except KlineDownloadError as e:
+            raise KlineDownloadError(str(e), max(resume_time, e.resume_time)) from e
+        finally:
+            for task in pending:
+                if task.done() and not task.cancelled():
+                    task.exception()  # Mark the failure of a page that was never consumed as retrieved
+                task.cancel()
+
+    async def download(self, symbol, interval, start_time, end_time=None) -> list:
+        """
+        Downloads the whole range into a list, see iter_klines.
+        """
+        return [row async for row in self.iter_klines(symbol, interval, start_time, end_time)]
+
+    async def _drain_head(self, pending):
+        rows = await pending[0]
+        pending.popleft()
+        for row in rows:
+            yield row
+
+    async def _fetch_page(self, symbol, interval, start_time, end_time) -> list:
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            rows = await self.client.get_klines(symbol, interval, startTime=start_time, endTime=end_time,
+                                                limit=self.page_size, priority=self.priority)
+            if rows is not None:
+                return rows
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+        raise KlineDownloadError(f"Failed to download {symbol} {interval} klines from {start_time}", start_time)
+
+    async def _iter_sequential(self, symbol, interval, start_time, end_time):
+        cursor = start_time
+        while cursor <= end_time:
+            rows = await self._fetch_page(symbol, interval, cursor, end_time)
+            for row in rows:
+                yield row
+            if len(rows) < self.page_size:
+                return
+            cursor = rows[-1][0] + 1
@@ -0,0 +1,611 @@
+import asyncio
+import json
+import time
+
+from binance_host_pool import BinanceHostPool, backoff_delay
+from binance_market_data_models import json_loads, parse_agg_trades, parse_klines, parse_trades
+from binance_rate_limiter import (BinanceRateLimiter, PRIORITY_INTERACTIVE, klines_weight, order_book_weight,
+                                  ticker_24hr_weight, ticker_price_weight)
+from metrics import REGISTRY
+
+
+class BinanceMarketDataAsyncRestClient:
+    """
+    An asyncio market data client for interacting with the Binance API.
+    Exposes the same public market data methods as BinanceMarketDataRestClient,
+    but every method is a coroutine and all requests share one pooled
+    keep-alive HTTP session, so concurrent callers do not block each other.
+
+    Requests go to a pool of equivalent hosts. Connection errors, timeouts and
+    5xx answers are retried on the next host with jittered exponential
+    backoff, and a host that keeps failing is skipped by its circuit breaker
+    for a while. With hedging enabled, a GET that takes longer than the p95
+    latency of its host is sent to a second host as well and the first
+    answer wins; the hedge is charged on the rate limiter like any request.
+    """
+
+    BASE_URL = 'https://data-api.binance.vision'
+
+    # Hosts serving the same public market data, in preference order
+    BASE_URLS = (
+        'https://data-api.binance.vision',
+        'https://api-gcp.binance.com',
+        'https://api1.binance.com',
+        'https://api2.binance.com',
+        'https://api3.binance.com',
+        'https://api4.binance.com',
+    )
+
+    def __init__(self, base_url=None, pool_size=20, pool_size_per_host=0,
+                 timeout=10.0, connect_timeout=5.0, keepalive_timeout=30.0, rate_limiter=None,
+                 metrics=REGISTRY, base_urls=None, max_retries=2, retry_delay=0.2, max_retry_delay=5.0,
+                 failure_threshold=5, breaker_reset_timeout=30.0, hedge=False, min_hedge_delay=0.05) -> None:
+        """
+        Args:
+            base_url (str, optional): Use this single host only (e.g. a local stand-in server).
+            pool_size (int, optional): Maximum number of simultaneous connections. Default: 20.
+            pool_size_per_host (int, optional): Per-host connection limit, 0 means no limit. Default: 0.
+            timeout (float, optional): Total timeout of one request in seconds. Default: 10.
+            connect_timeout (float, optional): Timeout of establishing a connection in seconds. Default: 5.
+            keepalive_timeout (float, optional): How long idle connections are kept open in seconds. Default: 30.
+            rate_limiter (BinanceRateLimiter, optional): Limiter to share with other clients.
+                A new one is created if omitted.
+            metrics (MetricsRegistry, optional): Registry receiving the request metrics. Default: REGISTRY.
+            base_urls (list, optional): Equivalent hosts in preference order. Default: BASE_URLS,
+                or only base_url if that is given.
+            max_retries (int, optional): Retries after a connection error, timeout or 5xx. Default: 2.
+            retry_delay (float, optional): Base of the exponential backoff in seconds. Default: 0.2.
+            max_retry_delay (float, optional): Upper bound of one backoff in seconds. Default: 5.
+            failure_threshold (int, optional): Consecutive failures that open a host's breaker. Default: 5.
+            breaker_reset_timeout (float, optional): Seconds before an open breaker lets a trial through. Default: 30.
+            hedge (bool, optional): Send slow GET requests to a second host. Default: False.
+            min_hedge_delay (float, optional): Never hedge earlier than this many seconds. Default: 0.05.
+        """
+        if base_urls is None:
+            base_urls = [base_url] if base_url else list(self.BASE_URLS)
+        self.hosts = BinanceHostPool(base_urls, failure_threshold, breaker_reset_timeout)
+        self.base_url = base_urls[0]
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.rate_limiter = rate_limiter or BinanceRateLimiter()
+        self._session = None
+        self._session_lock = asyncio.Lock()
+        self.metrics = metrics
+        self._recorders = {}
+        metrics.gauge('binance_used_weight', 'Request weight used in the current window',
+                      callback=lambda: self.rate_limiter.used_weight)
+        metrics.gauge('binance_weight_budget', 'Request weight allowed per window',
+                      callback=lambda: self.rate_limiter.budget)
+        metrics.gauge('binance_rate_limiter_queue_depth', 'Requests waiting for weight',
+                      callback=lambda: self.rate_limiter.queue_depth)
+        metrics.gauge('binance_rate_limiter_blocked_seconds', 'Seconds left of a 429/418 ban',
+                      callback=lambda: self.rate_limiter.blocked_for)
+        metrics.gauge('binance_open_circuit_breakers', 'Hosts currently skipped by their circuit breaker',
+                      callback=lambda: sum(state != 'closed' for state in self.hosts.states().values()))
+        self._hedges = metrics.counter('binance_hedged_requests_total', 'Requests sent to a second host')
+        self._retries = metrics.counter('binance_retries_total', 'Requests retried on another host')
+
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """
+        Returns the shared session, creating it on first use.
+
+        The session is created lazily because aiohttp binds it to the running
+        event loop, which does not exist yet when the client is constructed.
+        aiohttp itself is only imported then, so constructing the client is cheap.
+        """
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    import aiohttp
+
+                    connector = aiohttp.TCPConnector(
+                        limit=self.pool_size,
+                        limit_per_host=self.pool_size_per_host,
+                        keepalive_timeout=self.keepalive_timeout,
+                        ttl_dns_cache=300,
+                    )
+                    timeout = aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout)
+                    self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Closes the shared session and all pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _request(self, method, endpoint, params=None, weight=1, priority=PRIORITY_INTERACTIVE):
+        tried = []
+        for attempt in range(self.max_retries + 1):
+            base_url = self.hosts.pick(exclude=tried) or self.hosts.pick()
+            if base_url is None:
+                print(f"An error occurred: no Binance host is available for {endpoint}, all circuit breakers are open")
+                return None
+            tried.append(base_url)
+            if attempt:
+                self._retries.inc()
+
+            if self.hedge and method == 'GET' and len(self.hosts) > 1:
+                result, retryable = await self._hedged_attempt(base_url, tried, method, endpoint, params, weight,
+                                                               priority)
+            else:
+                result, retryable = await self._attempt(base_url, method, endpoint, params, weight, priority)
+            if not retryable or attempt == self.max_retries:
+                return result
+            await asyncio.sleep(backoff_delay(attempt, self.retry_delay, self.max_retry_delay))
+        return None
+
+    async def _attempt(self, base_url, method, endpoint, params, weight, priority, timestamps=None) -> tuple:
+        """
+        Sends one request to one host.
+
+        Args:
+            timestamps (list, optional): If given, the local monotonic clock in ns is appended to it right
+                before the request is sent and when the response headers arrive.
+
+        Returns:
+            tuple: (decoded JSON or None, whether the failure is worth retrying on another host).
+        """
+        import aiohttp
+
+        queued_at = started = time.perf_counter()
+        status = None
+        try:
+            await self.rate_limiter.acquire(weight, priority)
+            started = time.perf_counter()
+            session = await self._get_session()
+            if timestamps is not None:
+                timestamps.append(time.monotonic_ns())
+            async with session.request(method, f"{base_url}{endpoint}", params=params) as response:
+                if timestamps is not None:
+                    timestamps.append(time.monotonic_ns())
+                status = response.status
+                self.rate_limiter.update_from_headers(response.status, response.headers)
+                response.raise_for_status()  # Raise a ClientResponseError for bad responses
+                # Decoded from the raw body with orjson when available, without the str round trip
+                result = json_loads(await response.read())
+            self.hosts.on_success(base_url, time.perf_counter() - started)
+            return result, False
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if status is None:
+                status = type(e).__name__
+            print(f"An error occurred: {e!r}")
+            # 4xx answers (bad parameters, 429/418 bans) would fail the same way on every host
+            retryable = not isinstance(status, int) or status >= 500
+            if retryable:
+                self.hosts.on_failure(base_url)
+            else:
+                self.hosts.on_success(base_url, time.perf_counter() - started)
+            return None, retryable
+        except asyncio.CancelledError:
+            self.hosts.on_cancel(base_url)
+            raise
+        finally:
+            # A request without a status or an exception was cancelled by its caller
+            self._record(endpoint, status if status is not None else 'cancelled', weight, started - queued_at,
+                         time.perf_counter() - started)
+
+    async def _hedged_attempt(self, base_url, tried, method, endpoint, params, weight, priority) -> tuple:
+        first = asyncio.ensure_future(self._attempt(base_url, method, endpoint, params, weight, priority))
+        tasks = {first}
+        try:
+            delay = self.hosts.hedge_delay(base_url, self.min_hedge_delay)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    hedge_url = self.hosts.pick(exclude=tried)
+                    if hedge_url is not None:
+                        tried.append(hedge_url)
+                        self._hedges.inc()
+                        tasks.add(asyncio.ensure_future(
+                            self._attempt(hedge_url, method, endpoint, params, weight, priority)))
+
+            result = (None, True)
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result[0] is not None:
+                        return result
+            return result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _record(self, endpoint, status, weight, wait, latency) -> None:
+        # The metric objects of an (endpoint, status) pair are looked up in the registry only once
+        recorders = self._recorders.get((endpoint, status))
+        if recorders is None:
+            metrics = self.metrics
+            recorders = self._recorders[(endpoint, status)] = (
+                metrics.histogram('binance_request_seconds', 'Binance request latency', endpoint=endpoint),
+                metrics.histogram('binance_rate_limit_wait_seconds', 'Time spent waiting for request weight',
+                                  endpoint=endpoint),
+                metrics.counter('binance_requests_total', 'Binance requests by status',
+                                endpoint=endpoint, status=status),
+                metrics.counter('binance_request_weight_total', 'Request weight consumed', endpoint=endpoint),
+            )
+        latency_histogram, wait_histogram, requests, weights = recorders
+        latency_histogram.observe(latency)
+        wait_histogram.observe(wait)
+        requests.inc()
+        weights.inc(weight)
+
+    async def _get(self, endpoint, params=None, weight=1, priority=PRIORITY_INTERACTIVE) -> dict:
+        """
+        Sends a GET request to the specified endpoint with optional parameters.
+
+        Args:
+            endpoint (str): The API endpoint to send the GET request to.
+            params (dict, optional): A dictionary of query parameters to include in the request.
+            weight (int, optional): Request weight charged on the rate limiter. Default: 1.
+            priority (int, optional): Rate limiter priority, lower is served first. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            dict: The JSON response from the server if the request is successful.
+            None: If an error occurs during the request.
+        """
+        return await self._request('GET', endpoint, params=params, weight=weight, priority=priority)
+
+    async def _post(self, endpoint, params=None, weight=1, priority=PRIORITY_INTERACTIVE) -> dict:
+        """
+        Sends a POST request to the specified endpoint with the provided parameters.
+
+        Args:
+            endpoint (str): The API endpoint to send the request to.
+            params (dict, optional): A dictionary of query parameters to include in the request.
+            weight (int, optional): Request weight charged on the rate limiter. Default: 1.
+            priority (int, optional): Rate limiter priority, lower is served first. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            dict: The JSON response from the server if the request is successful.
+            None: If an error occurs during the request.
+        """
+        return await self._request('POST', endpoint, params=params, weight=weight, priority=priority)
+
+    async def _get_symbols(self, endpoint, symbols, params, weight_function, chunk_size, priority) -> list:
+        """
+        Requests a multi-symbol endpoint with the symbols=[...] parameter, split into chunks.
+
+        The symbols are sent in chunks of chunk_size; if the chunks together would cost
+        more weight than the whole market, the whole market is requested once and filtered
+        instead. On a tie the chunks win, they download far fewer rows.
+
+        Returns:
+            list: The items of all requested symbols, or None if any request failed.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        chunks = [symbols[index:index + chunk_size] for index in range(0, len(symbols), chunk_size)]
+        if sum(weight_function(len(chunk)) for chunk in chunks) > weight_function(None):
+            items = await self._get(endpoint, params=params, weight=weight_function(None), priority=priority)
+            if items is None:
+                return None
+            wanted = set(symbols)
+            return [item for item in items if item['symbol'] in wanted]
+
+        results = await asyncio.gather(*(
+            self._get(endpoint, params={**params, "symbols": json.dumps(chunk, separators=(',', ':'))},
+                      weight=weight_function(len(chunk)), priority=priority)
+            for chunk in chunks
+        ))
+        if any(items is None for items in results):
+            return None
+        return [item for items in results for item in items]
+
+    async def get_coin_price(self, symbol=None, priority=PRIORITY_INTERACTIVE) -> list:
+        """
+        Get the latest price for one symbol or for all symbols.
+
+        Request weight: 2 for one symbol, 4 for all symbols
+
+        Args:
+            symbol (str, optional): Spot pair, e.g. BTCUSDT. All symbols are returned if omitted.
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            list: A list of {"symbol", "price"} items, or a single item if symbol is given.
+        """
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        return await self._get('/api/v3/ticker/price', params=params, weight=ticker_price_weight(1 if symbol else None),
+                               priority=priority)
+
+    async def get_server_time(self, priority=PRIORITY_INTERACTIVE) -> dict:
+        """
+        Test connectivity to the Rest API and get the current server time.
+
+        Request weight: 1
+
+        Args:
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            dict: A dictionary containing the server time, e.g. {"serverTime": 1499827319559}.
+        """
+        return await self._get('/api/v3/time', priority=priority)
+
+    async def get_server_time_sample(self, priority=PRIORITY_INTERACTIVE) -> tuple:
+        """
+        Gets the server time along with the local times the request was sent and answered.
+
+        Unlike get_server_time, the request is sent once to one host, without
+        retries or hedging, and the local timestamps are taken around the HTTP
+        exchange only, after the rate limiter wait. The round trip between them
+        is the network round trip, which clock estimates rely on.
+
+        Request weight: 1
+
+        Args:
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            tuple: ({"serverTime"}, sent monotonic ns, answered monotonic ns), or (None, None, None) on failure.
+        """
+        base_url = self.hosts.pick()
+        if base_url is None:
+            return None, None, None
+        timestamps = []
+        result, _ = await self._attempt(base_url, 'GET', '/api/v3/time', None, 1, priority, timestamps)
+        if result is None or len(timestamps) < 2:
+            return None, None, None
+        return result, timestamps[0], timestamps[1]
+
+    async def get_book_ticker(self, symbol=None, priority=PRIORITY_INTERACTIVE, symbols=None) -> list:
+        """
+        Get the best price/quantity on the order book for one symbol, a list of symbols or all symbols.
+
+        Request weight: 2 for one symbol, 4 for a list of symbols or all symbols
+
+        Args:
+            symbol (str, optional): The symbol to get the book ticker for (e.g., 'BTCUSDT').
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+            symbols (list, optional): Symbols to get in as few requests as possible.
+
+        Returns:
+            list: A list of {"symbol", "bidPrice", "bidQty", "askPrice", "askQty"} items,
+                or a single item if symbol is given.
+        """
+        if symbols is not None:
+            return await self._get_symbols('/api/v3/ticker/bookTicker', symbols, {}, ticker_price_weight, 100,
+                                           priority)
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        return await self._get('/api/v3/ticker/bookTicker', params=params,
+                               weight=ticker_price_weight(1 if symbol else None), priority=priority)
+
+    async def get_ticker_price(self, symbol=None, priority=PRIORITY_INTERACTIVE, symbols=None) -> list:
+        """
+        Get the latest price for one symbol, a list of symbols or all symbols.
+
+        Request weight: 2 for one symbol, 4 for a list of symbols or all symbols
+
+        Args:
+            symbol (str, optional): The symbol for which to get the latest price (e.g., 'BTCUSDT').
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+            symbols (list, optional): Symbols to get in as few requests as possible.
+
+        Returns:
+            list: A list of {"symbol", "price"} items, or a single item if symbol is given.
+        """
+        if symbols is not None:
+            return await self._get_symbols('/api/v3/ticker/price', symbols, {}, ticker_price_weight, 100, priority)
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        return await self._get('/api/v3/ticker/price', params=params, weight=ticker_price_weight(1 if symbol else None),
+                               priority=priority)
+
+    async def get_ticker_24hr(self, symbol=None, priority=PRIORITY_INTERACTIVE, symbols=None, type=None) -> list:
+        """
+        Get 24 hour rolling window price change statistics.
+
+        Request weight
+        Symbols     weight
+        1-20        2
+        21-100      40
+        101+ / all  80
+
+        A symbols list is sent in chunks of 20, which is the cheapest split, unless
+        the whole market costs less.
+
+        Args:
+            symbol (str, optional): The symbol to get the statistics for (e.g., 'BTCUSDT').
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+            symbols (list, optional): Symbols to get in as few requests as possible.
+            type (str, optional): 'FULL' (default) or 'MINI'. MINI items only carry the open,
+                high, low and last prices and the volumes.
+
+        Returns:
+            list: A list containing the 24-hour ticker price change statistics,
+                or a single item if symbol is given.
+        """
+        params = {}
+        if type is not None:
+            params["type"] = type
+        if symbols is not None:
+            return await self._get_symbols('/api/v3/ticker/24hr', symbols, params, ticker_24hr_weight, 20, priority)
+        if symbol:
+            params["symbol"] = symbol
+        return await self._get('/api/v3/ticker/24hr', params=params, weight=ticker_24hr_weight(1 if symbol else None),
+                               priority=priority)
+
+    async def get_avg_price(self, symbol, priority=PRIORITY_INTERACTIVE) -> dict:
+        """
+        Get the current average price for a symbol.
+
+        Args:
+            symbol (str): The symbol to get the average price for.
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            dict: A dictionary containing the average price information,
+                e.g. {"mins": 5, "price": "102778.65236263", "closeTime": 1738175921705}.
+        """
+        params = {"symbol": symbol}
+        return await self._get('/api/v3/avgPrice', params=params, priority=priority)
+
+    async def get_recent_trades(self, symbol, limit=500, priority=PRIORITY_INTERACTIVE, columnar=False, scale=None) -> list:
+        """
+        Get the most recent trades for a given symbol.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            limit (int, optional): The number of recent trades to retrieve. Defaults to 500.
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+            columnar (bool, optional): Return RecordColumns instead of a list of dicts. Default: False.
+            scale (int or dict, optional): With columnar, parse the decimal columns to int64 scaled by
+                10**scale instead of float64 (see binance_market_data_models). Default: None.
+
+        Returns:
+            list: A list containing the recent trades data.
+        """
+        params = {"symbol": symbol, "limit": limit}
+        trades = await self._get('/api/v3/trades', params=params, priority=priority)
+        return parse_trades(trades, scale) if columnar and trades is not None else trades
+
+    async def get_historical_trades(self, symbol, limit=500, priority=PRIORITY_INTERACTIVE, columnar=False, scale=None) -> list:
+        """
+        Get historical trades for a given symbol.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'BTCUSDT').
+            limit (int, optional): The number of historical trades to retrieve. Default is 500.
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+            columnar (bool, optional): Return RecordColumns instead of a list of dicts. Default: False.
+            scale (int or dict, optional): With columnar, parse the decimal columns to int64 scaled by
+                10**scale instead of float64 (see binance_market_data_models). Default: None.
+
+        Returns:
+            list: A list containing the historical trades data.
+        """
+        params = {"symbol": symbol, "limit": limit}
+        trades = await self._get('/api/v3/historicalTrades', params=params, priority=priority)
+        return parse_trades(trades, scale) if columnar and trades is not None else trades
+
+    async def get_aggregate_trades(self, symbol, fromId=None, startTime=None, endTime=None, limit=500, priority=PRIORITY_INTERACTIVE, columnar=False, scale=None) -> list:
+        """
+        Get compressed, aggregate market trades.
+
+        Request weight: 20
+
+        Args:
+            symbol (str): symbol name
+            fromId (long, optional): ID to get aggregate trades from INCLUSIVE.
+            startTime (long, optional): Timestamp in ms to get aggregate trades from INCLUSIVE.
+            endTime (long, optional): Timestamp in ms to get aggregate trades until INCLUSIVE.
+            limit (int, optional) Default 500; max 1000.
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+            columnar (bool, optional): Return RecordColumns instead of a list of dicts. Default: False.
+            scale (int or dict, optional): With columnar, parse the decimal columns to int64 scaled by
+                10**scale instead of float64 (see binance_market_data_models). Default: None.
+
+            If both startTime and endTime are sent, time between startTime and endTime must be less than 1 hour.
+
+            Sending both startTime/endTime and fromId might cause response timeout, please send either fromId or startTime/endTime
+
+        Returns:
+            list: A list containing the aggregate trades data.
+        """
+        params = {"symbol": symbol, "limit": limit}
+        if fromId is not None:
+            params["fromId"] = fromId
+        if startTime is not None:
+            params["startTime"] = startTime
+        if endTime is not None:
+            params["endTime"] = endTime
+        agg_trades = await self._get('/api/v3/aggTrades', params=params, weight=20, priority=priority)
+        return parse_agg_trades(agg_trades, scale) if columnar and agg_trades is not None else agg_trades
+
+    async def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500, priority=PRIORITY_INTERACTIVE, columnar=False, scale=None) -> list:
+        """
+        Get kline/candlestick bars for a symbol. Klines are uniquely identified by their open time
+
+        Request weight based on parameter limit
+        Limit       weight
+        [1,100)     1
+        [100, 500)  2
+        [500, 1000] 5
+        1000        10
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            interval (str): Time interval (e.g., '1m', '5m', '1h')
+            startTime (long, optional): Start Time 1592317127349
+            endTime (long, optional): End Time
+            limit (int, optional): Number of records. Default: 500. Max: 1000
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+            columnar (bool, optional): Return RecordColumns instead of a list of rows. Default: False.
+            scale (int or dict, optional): With columnar, parse the decimal columns to int64 scaled by
+                10**scale instead of float64 (see binance_market_data_models). Default: None.
+
+            If startTime and endTime are not sent, the most recent klines are returned.
+
+        Returns:
+            list: A list containing the candlestick data.
+        """
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if startTime is not None:
+            params["startTime"] = startTime
+        if endTime is not None:
+            params["endTime"] = endTime
+        klines = await self._get('/api/v3/klines', params=params, weight=klines_weight(limit), priority=priority)
+        return parse_klines(klines, scale) if columnar and klines is not None else klines
+
+    async def get_exchange_info(self, priority=PRIORITY_INTERACTIVE) -> dict:
+        """
+        Get current exchange trading rules and symbol information
+
+        Request weight: 1
+
+        Args:
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            dict: A dictionary containing the exchange information.
+
+        The REQUEST_WEIGHT entry of "rateLimits" is applied to the rate limiter.
+        """
+        exchange_info = await self._get('/api/v3/exchangeInfo', priority=priority)
+        if exchange_info:
+            self.rate_limiter.configure(exchange_info.get('rateLimits'))
+        return exchange_info
+
+    async def get_order_book(self, symbol, limit=100, priority=PRIORITY_INTERACTIVE) -> dict:
+        """
+        Check orderbook depth on specific symbol
+
+        Request weight:
+            limit           weight
+            5, 10, 20, 50   2
+            100             5
+            500             10
+            1000            20
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            limit (int, optional): Default:100 Max:1000.Optional value:[10, 20, 50, 100, 500, 1000]
+            priority (int, optional): Rate limiter priority. Default: PRIORITY_INTERACTIVE.
+
+        Returns:
+            dict: A dictionary containing the order book data.
+        """
+        params = {"symbol": symbol, "limit": limit}
+        return await self._get('/api/v3/depth', params=params, weight=order_book_weight(limit), priority=priority)
@@ -0,0 +1,231 @@
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'expires_at', 'stale_until')
+
+    def __init__(self, value, expires_at, stale_until) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class CachedBinanceMarketDataClient:
+    """
+    A caching wrapper around BinanceMarketDataAsyncRestClient.
+
+    Methods listed in the TTL table are served from memory while their result
+    is fresh. Concurrent misses for the same method, arguments and priority
+    share one in-flight request. Any other attribute is forwarded to the
+    wrapped client.
+
+    Stale-while-revalidate is opt-in per caller: the view returned by
+    allow_stale() still returns an expired value (up to max_stale seconds)
+    while a single background refresh runs. It suits interactive handlers;
+    consumers that need current data use the cache itself.
+
+    Entries are dropped once they are too old to be served, and historical
+    ranges (get_klines with startTime or endTime) are never cached, so the
+    memory holds the hot working set only.
+
+    Cached values are shared between callers and must not be modified.
+    """
+
+    # Seconds a response stays fresh, per client method
+    DEFAULT_TTLS = {
+        'get_coin_price': 1.0,
+        'get_ticker_price': 1.0,
+        'get_book_ticker': 1.0,
+        'get_avg_price': 5.0,
+        'get_ticker_24hr': 5.0,
+        'get_order_book': 1.0,
+        'get_klines': 5.0,
+        'get_exchange_info': 300.0,
+    }
+
+    # Calls passing any of these arguments fetch data that is not read again and bypass the cache
+    UNCACHED_ARGUMENTS = {
+        'get_klines': ('startTime', 'endTime'),
+    }
+
+    def __init__(self, client, ttls=None, max_stale=30.0, max_entries=10000, sweep_interval=5.0) -> None:
+        """
+        Args:
+            client (BinanceMarketDataAsyncRestClient): The client to wrap.
+            ttls (dict, optional): Method name to TTL in seconds, merged over DEFAULT_TTLS.
+                A TTL of 0 or None disables caching for that method.
+            max_stale (float, optional): How long past its TTL allow_stale() callers may be served a value. Default: 30.
+            max_entries (int, optional): Maximum number of cached responses. Default: 10000.
+            sweep_interval (float, optional): Seconds between two removals of the expired entries. Default: 5.
+        """
+        self._client = client
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._signatures = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __getattr__(self, name):
+        return self._method(name, allow_stale=False)
+
+    def allow_stale(self) -> 'StaleWhileRevalidateView':
+        """
+        Returns a view of this cache that serves expired values while refreshing them.
+
+        Returns:
+            StaleWhileRevalidateView: Shares the entries, in-flight requests and counters of this cache.
+        """
+        return StaleWhileRevalidateView(self)
+
+    def _method(self, name, allow_stale):
+        attr = getattr(self._client, name)
+        ttl = self.ttls.get(name)
+        if not ttl or not callable(attr):
+            return attr
+
+        async def cached_call(*args, **kwargs):
+            if name in self.UNCACHED_ARGUMENTS and self._bypasses_cache(name, attr, args, kwargs):
+                return await attr(*args, **kwargs)
+            return await self._call(name, ttl, attr, args, kwargs, allow_stale)
+
+        cached_call.__name__ = name
+        cached_call.__doc__ = attr.__doc__
+        return cached_call
+
+    def _bypasses_cache(self, name, method, args, kwargs) -> bool:
+        signature = self._signatures.get(name)
+        if signature is None:
+            signature = self._signatures[name] = inspect.signature(method)
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+        return any(arguments.get(argument) is not None for argument in self.UNCACHED_ARGUMENTS[name])
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters of the cache.
+
+        Returns:
+            dict: Counters and the ratio of requests served without waiting for Binance.
+        """
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'entries': len(self._entries),
+            'in_flight': len(self._in_flight),
+            'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    def invalidate(self, name=None) -> None:
+        """
+        Drops cached responses of one method, or all of them if name is None.
+        """
+        if name is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == name]:
+            del self._entries[key]
+
+    async def _call(self, name, ttl, method, args, kwargs, allow_stale):
+        key = self._make_key(name, args, kwargs)
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            if now < entry.expires_at:
+                self.hits += 1
+                return entry.value
+            if allow_stale and now < entry.stale_until:
+                self.stale_hits += 1
+                self._refresh(key, ttl, method, args, kwargs)
+                return entry.value
+
+        self.misses += 1
+        # Shield the shared request so one cancelled caller does not cancel it for the others
+        return await asyncio.shield(self._refresh(key, ttl, method, args, kwargs, count=True))
+
+    def _refresh(self, key, ttl, method, args, kwargs, count=False) -> asyncio.Task:
+        # Requests only join one of the same priority, an interactive call never waits behind a background one
+        flight_key = (key, kwargs.get('priority'))
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, flight_key, ttl, method, args, kwargs))
+            task.add_done_callback(self._report_refresh_error)
+            self._in_flight[flight_key] = task
+        elif count:
+            self.coalesced += 1
+        return task
+
+    @staticmethod
+    def _report_refresh_error(task) -> None:
+        # Background refreshes have nobody awaiting them, report their errors here
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Failed to refresh a cached response: {task.exception()!r}")
+
+    async def _fetch(self, key, flight_key, ttl, method, args, kwargs):
+        try:
+            value = await method(*args, **kwargs)
+        finally:
+            self._in_flight.pop(flight_key, None)
+
+        # Errors are reported as None by the client and are never cached
+        if value is not None:
+            now = time.monotonic()
+            self._entries[key] = _CacheEntry(value, now + ttl, now + ttl + self.max_stale)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _sweep(self, now) -> None:
+        # Entries past stale_until can never be served again
+        for key in [key for key, entry in self._entries.items() if now >= entry.stale_until]:
+            del self._entries[key]
+        self._next_sweep = now + self.sweep_interval
+
+    @classmethod
+    def _make_key(cls, name, args, kwargs) -> tuple:
+        # The priority only affects scheduling, not the response
+        items = tuple(sorted((k, cls._freeze(v)) for k, v in kwargs.items() if k != 'priority'))
+        return (name, tuple(cls._freeze(arg) for arg in args), items)
+
+    @classmethod
+    def _freeze(cls, value):
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._freeze(item) for item in value)
+        if isinstance(value, dict):
+            return tuple(sorted((key, cls._freeze(item)) for key, item in value.items()))
+        return value
+
+
+class StaleWhileRevalidateView:
+    """
+    A view of a CachedBinanceMarketDataClient for callers that accept expired values.
+
+    Cached methods return an expired value (up to max_stale seconds past its
+    TTL) right away and refresh it in the background. Everything else,
+    including the counters, is the wrapped cache.
+    """
+
+    def __init__(self, cache) -> None:
+        self._cache = cache
+
+    def __getattr__(self, name):
+        if hasattr(type(self._cache), name):
+            return getattr(self._cache, name)
+        return self._cache._method(name, allow_stale=True)
@@ -0,0 +1,198 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional, the standard library decoder is used without it
+    orjson = None
+
+
+# Marks a column of decimal strings, parsed to float64 or to int64 scaled by 10**scale
+DECIMAL = 'decimal'
+
+# (attribute, payload key, dtype) of every column. dtypes are given by name and numpy is only
+# imported by the parsers, so importing this module (and the REST client) stays cheap
+TRADE_FIELDS = (
+    ('id', 'id', 'int64'),
+    ('price', 'price', DECIMAL),
+    ('qty', 'qty', DECIMAL),
+    ('quote_qty', 'quoteQty', DECIMAL),
+    ('time', 'time', 'int64'),
+    ('is_buyer_maker', 'isBuyerMaker', 'bool'),
+    ('is_best_match', 'isBestMatch', 'bool'),
+)
+
+AGG_TRADE_FIELDS = (
+    ('agg_id', 'a', 'int64'),
+    ('price', 'p', DECIMAL),
+    ('qty', 'q', DECIMAL),
+    ('first_id', 'f', 'int64'),
+    ('last_id', 'l', 'int64'),
+    ('time', 'T', 'int64'),
+    ('is_buyer_maker', 'm', 'bool'),
+    ('is_best_match', 'M', 'bool'),
+)
+
+# Column name, dtype and position in a get_klines row
+KLINE_COLUMNS = (
+    ('open_time', 'int64', 0),
+    ('open', 'float64', 1),
+    ('high', 'float64', 2),
+    ('low', 'float64', 3),
+    ('close', 'float64', 4),
+    ('volume', 'float64', 5),
+    ('close_time', 'int64', 6),
+    ('quote_volume', 'float64', 7),
+    ('trades', 'int64', 8),
+    ('taker_buy_base_volume', 'float64', 9),
+    ('taker_buy_quote_volume', 'float64', 10),
+)
+
+# Kline rows are lists, so the payload key is the position in the row
+KLINE_FIELDS = tuple((name, index, DECIMAL if dtype == 'float64' else dtype) for name, dtype, index in KLINE_COLUMNS)
+
+
+def json_loads(data):
+    """
+    Decodes a JSON document (bytes or str), with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decimal_strings_to_int64(strings, scale=8) -> 'np.ndarray':
+    """
+    Parses decimal strings into int64 values scaled by 10**scale, without going through float.
+
+    Digits beyond the scale are truncated. Binance sends 8 decimals, so scale=8
+    is exact for values below about 9.2e10; larger ones, such as the volumes of
+    pairs quoted in millions of units, need a smaller scale.
+
+    Args:
+        strings (list): Decimal strings such as '64123.45000000'.
+        scale (int, optional): Number of decimal digits kept. Default: 8.
+
+    Returns:
+        np.ndarray: int64 array.
+
+    Raises:
+        OverflowError: If a value does not fit in int64 at this scale.
+    """
+    import numpy as np
+
+    values = np.asarray(strings, dtype=np.str_)
+    if not len(values):
+        return np.empty(0, dtype=np.int64)
+    negative = np.char.startswith(values, '-')
+    parts = np.char.partition(np.char.lstrip(values, '-'), '.')
+    try:
+        integer = parts[:, 0].astype(np.int64)
+    except OverflowError:
+        raise OverflowError(f'Decimal value too large for int64 at scale {scale}') from None
+    limit = (np.iinfo(np.int64).max - (10 ** scale - 1)) // 10 ** scale
+    if integer.max() > limit:
+        raise OverflowError(f'Decimal value {values[integer.argmax()]} too large for int64 at scale {scale}, '
+                            f'use a smaller scale for this field')
+    result = integer * 10 ** scale
+    if scale:
+        fraction = np.char.ljust(parts[:, 2], scale, '0').astype(f'<U{scale}')
+        result += fraction.astype(np.int64)
+    return np.where(negative, -result, result)
+
+
+class RecordColumns:
+    """
+    A struct-of-arrays view of a list of records: one numpy array per field.
+
+    Fields are read as attributes (columns.price) or by name (columns['price']).
+    Arrays are read-only because the same instance may be shared through the
+    response cache. scale is the scale the decimal fields were parsed with:
+    None for float64, an int, or a dict of field name to scale.
+    """
+
+    __slots__ = ('names', 'arrays', 'scale')
+
+    def __init__(self, arrays, scale=None) -> None:
+        self.names = tuple(arrays)
+        self.arrays = arrays
+        self.scale = scale
+        for array in arrays.values():
+            array.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.arrays[self.names[0]]) if self.names else 0
+
+    def __getitem__(self, name) -> 'np.ndarray':
+        return self.arrays[name]
+
+    def __getattr__(self, name) -> 'np.ndarray':
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def as_dict(self) -> dict:
+        return dict(self.arrays)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+
+def _columns(rows, fields, scale) -> RecordColumns:
+    import numpy as np
+
+    arrays = {}
+    for name, key, dtype in fields:
+        values = [row[key] for row in rows]
+        field_scale = scale.get(name) if isinstance(scale, dict) else scale
+        if dtype is not DECIMAL:
+            arrays[name] = np.array(values, dtype=dtype)
+        elif field_scale is None:
+            # numpy parses the decimal strings in C
+            arrays[name] = np.array(values, dtype=np.float64)
+        else:
+            arrays[name] = decimal_strings_to_int64(values, field_scale)
+    return RecordColumns(arrays, scale)
+
+
+def parse_trades(trades, scale=None) -> RecordColumns:
+    """
+    Converts a get_recent_trades/get_historical_trades response into columns.
+
+    Args:
+        trades (list): The response rows.
+        scale (int or dict, optional): If set, price, qty and quote_qty become int64 scaled by
+            10**scale instead of float64. A dict sets the scale per field, fields it omits stay float64.
+
+    Returns:
+        RecordColumns: id, price, qty, quote_qty, time, is_buyer_maker, is_best_match.
+    """
+    return _columns(trades, TRADE_FIELDS, scale)
+
+
+def parse_agg_trades(agg_trades, scale=None) -> RecordColumns:
+    """
+    Converts a get_aggregate_trades response into columns.
+
+    Args:
+        agg_trades (list): The response rows.
+        scale (int or dict, optional): See parse_trades.
+
+    Returns:
+        RecordColumns: agg_id, price, qty, first_id, last_id, time, is_buyer_maker, is_best_match.
+    """
+    return _columns(agg_trades, AGG_TRADE_FIELDS, scale)
+
+
+def parse_klines(klines, scale=None) -> RecordColumns:
+    """
+    Converts a get_klines response into columns named after KLINE_COLUMNS.
+
+    Args:
+        klines (list): The response rows.
+        scale (int or dict, optional): See parse_trades. Volumes of low-priced assets can exceed
+            the int64 range at scale 8, e.g. {'open': 8, 'high': 8, 'low': 8, 'close': 8, 'volume': 2}.
+    """
+    return _columns(klines, KLINE_FIELDS, scale)
+
@@ -0,0 +1,337 @@
+import asyncio
+import json
+import time
+
+
+class LocalOrderBook:
+    """
+    An order book kept in sync from a REST snapshot plus diff depth events.
+
+    Follows the procedure documented by Binance: diff events are buffered
+    until a get_order_book snapshot arrives, events already contained in the
+    snapshot (u <= lastUpdateId) are dropped, the first applied event must
+    cover lastUpdateId + 1, and every next event must start right after the
+    previous one (U == previous u + 1). Any gap marks the book out of sync.
+    """
+
+    def __init__(self, symbol) -> None:
+        self.symbol = symbol
+        self.bids = {}
+        self.asks = {}
+        self.last_update_id = None
+        self.synced = False
+        self.updated_at = None
+        self._buffer = []
+
+    def reset(self) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        self.last_update_id = None
+        self.synced = False
+        self._buffer = []
+
+    def apply_snapshot(self, snapshot) -> bool:
+        """
+        Loads a get_order_book response and replays the buffered events on top of it.
+
+        A snapshot older than the buffered events cannot be bridged to them. It
+        is ignored and the events are kept for the next snapshot.
+
+        Returns:
+            bool: True if the book is in sync afterwards.
+        """
+        last_update_id = snapshot['lastUpdateId']
+        buffered = [event for event in self._buffer if event['u'] > last_update_id]
+        if buffered and buffered[0]['U'] > last_update_id + 1:
+            self._buffer = buffered
+            return False
+
+        self.bids = {float(price): float(qty) for price, qty in snapshot['bids']}
+        self.asks = {float(price): float(qty) for price, qty in snapshot['asks']}
+        self.last_update_id = last_update_id
+        self.synced = True
+        self._buffer = []
+        for event in buffered:
+            if not self.apply_event(event):
+                return False
+        return self.synced
+
+    def apply_event(self, event) -> bool:
+        """
+        Applies one depthUpdate event.
+
+        Returns:
+            bool: False if a sequence gap was detected and a new snapshot is needed.
+        """
+        if self.last_update_id is None:
+            self._buffer.append(event)
+            return True
+
+        first_id, final_id = event['U'], event['u']
+        if final_id <= self.last_update_id:
+            return True  # Already contained in the snapshot
+        if first_id > self.last_update_id + 1:
+            self.synced = False
+            return False
+
+        for price, qty in event['b']:
+            self._set_level(self.bids, float(price), float(qty))
+        for price, qty in event['a']:
+            self._set_level(self.asks, float(price), float(qty))
+        self.last_update_id = final_id
+        self.updated_at = time.monotonic()
+        return True
+
+    def top(self, depth=10) -> tuple:
+        """
+        Returns the best levels of each side.
+
+        Returns:
+            tuple: (bids sorted by descending price, asks sorted by ascending price),
+                each a list of (price, qty).
+        """
+        bids = sorted(self.bids.items(), reverse=True)[:depth]
+        asks = sorted(self.asks.items())[:depth]
+        return bids, asks
+
+    @staticmethod
+    def _set_level(levels, price, qty) -> None:
+        if qty == 0.0:
+            levels.pop(price, None)
+        else:
+            levels[price] = qty
+
+
+class BinanceMarketDataStreamClient:
+    """
+    A WebSocket client for the Binance market data streams.
+
+    Subscribes to the trade, bookTicker, kline and diff depth streams of a
+    set of symbols over one combined stream connection and keeps their latest
+    state in memory: last trade price, top of book, current kline per
+    interval and a full local order book per depth symbol. Handlers read this
+    state directly, without any network round trip.
+
+    The connection is re-established with backoff when it drops; order books
+    are resynchronized from a REST snapshot after reconnects and sequence gaps.
+    The base_url can point to a local stand-in server replaying recorded
+    frames (see binance_stream_replay_server.py).
+    """
+
+    BASE_URL = 'wss://data-stream.binance.vision'
+
+    def __init__(self, rest_client, symbols=(), kline_intervals=(), depth_symbols=(), base_url=None,
+                 depth_snapshot_limit=1000, reconnect_delay=1.0, max_reconnect_delay=60.0,
+                 record_path=None) -> None:
+        """
+        Args:
+            rest_client (BinanceMarketDataAsyncRestClient): Client used for order book snapshots, without
+                a response cache: a cached snapshot can be older than the buffered events.
+            symbols (iterable, optional): Symbols whose trade and bookTicker streams are followed.
+            kline_intervals (iterable, optional): Kline intervals followed for every symbol.
+            depth_symbols (iterable, optional): Symbols that get a local order book.
+            base_url (str, optional): Overrides BASE_URL (e.g. a local replay server).
+            depth_snapshot_limit (int, optional): Levels requested for order book snapshots. Default: 1000.
+            reconnect_delay (float, optional): Initial delay before reconnecting in seconds. Default: 1.
+            max_reconnect_delay (float, optional): Upper bound of the reconnect delay in seconds. Default: 60.
+            record_path (str, optional): If set, every received frame is appended to this JSONL file
+                so that it can be replayed later by binance_stream_replay_server.py.
+        """
+        self.rest_client = rest_client
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.kline_intervals = list(kline_intervals)
+        self.depth_symbols = [symbol.upper() for symbol in depth_symbols]
+        self.base_url = base_url or self.BASE_URL
+        self.depth_snapshot_limit = depth_snapshot_limit
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.record_path = record_path
+
+        self.last_prices = {}
+        self.book_tickers = {}
+        self.klines = {}
+        self.order_books = {symbol: LocalOrderBook(symbol) for symbol in self.depth_symbols}
+        self.connected = False
+        self.messages_received = 0
+        self._resyncs = {}
+        self._task = None
+
+    def streams(self) -> list:
+        streams = []
+        for symbol in self.symbols:
+            name = symbol.lower()
+            streams += [f"{name}@trade", f"{name}@bookTicker"]
+            streams += [f"{name}@kline_{interval}" for interval in self.kline_intervals]
+        streams += [f"{symbol.lower()}@depth@100ms" for symbol in self.depth_symbols]
+        return streams
+
+    def url(self) -> str:
+        return f"{self.base_url}/stream?streams={'/'.join(self.streams())}"
+
+    def start(self) -> None:
+        """
+        Starts the connection task on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Closes the connection and stops all tasks.
+        """
+        tasks = [task for task in [self._task, *self._resyncs.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._resyncs.clear()
+
+    def price(self, symbol):
+        """
+        Returns the price of the last trade as a float, or None if unknown or disconnected.
+        """
+        if not self.connected:
+            return None
+        return self.last_prices.get(symbol.upper())
+
+    def get_ticker_price(self, symbol) -> dict:
+        """
+        Same as BinanceMarketDataAsyncRestClient.get_ticker_price(symbol), served from the stream.
+
+        Returns:
+            dict: {"symbol", "price"}, or None if no trade was received or the stream is down.
+        """
+        price = self.price(symbol)
+        if price is None:
+            return None
+        return {"symbol": symbol.upper(), "price": f"{price:.8f}"}
+
+    get_coin_price = get_ticker_price
+
+    def get_book_ticker(self, symbol) -> dict:
+        """
+        Same as BinanceMarketDataAsyncRestClient.get_book_ticker(symbol), served from the stream.
+
+        Returns:
+            dict: {"symbol", "bidPrice", "bidQty", "askPrice", "askQty"}, or None if no
+                bookTicker event was received or the stream is down.
+        """
+        if not self.connected:
+            return None
+        return self.book_tickers.get(symbol.upper())
+
+    def get_kline(self, symbol, interval) -> list:
+        """
+        Returns the current kline in the get_klines row shape, or None.
+        """
+        if not self.connected:
+            return None
+        return self.klines.get((symbol.upper(), interval))
+
+    def get_order_book(self, symbol):
+        """
+        Returns the LocalOrderBook of the symbol if it is in sync, otherwise None.
+        """
+        book = self.order_books.get(symbol.upper())
+        return book if book is not None and book.synced else None
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        record = open(self.record_path, 'a') if self.record_path else None
+        try:
+            while True:
+                if await self._connect(record):
+                    delay = self.reconnect_delay
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            if record is not None:
+                record.close()
+
+    async def _connect(self, record) -> bool:
+        # Returns True if the connection was established, so the backoff starts over
+        import aiohttp
+
+        connected = False
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.ws_connect(self.url(), heartbeat=30.0) as ws:
+                    self.connected = connected = True
+                    for symbol in self.depth_symbols:
+                        self._resync(symbol)
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            if record is not None:
+                                record.write(message.data + '\n')
+                            self.handle_message(message.data)
+                        elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Market data stream error: {e!r}")
+        finally:
+            self.connected = False
+            for book in self.order_books.values():
+                book.reset()
+        return connected
+
+    def handle_message(self, raw) -> None:
+        """
+        Applies one frame of the combined stream ({"stream": ..., "data": ...}).
+        """
+        try:
+            message = json.loads(raw)
+            data = message.get('data', message)
+            self._apply(data)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Invalid market data stream frame: {e!r}")
+            return
+        self.messages_received += 1
+
+    def _apply(self, data) -> None:
+        event_type = data.get('e')
+
+        if event_type == 'trade':
+            self.last_prices[data['s']] = float(data['p'])
+        elif event_type == 'kline':
+            k = data['k']
+            self.klines[(data['s'], k['i'])] = [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'],
+                                                k['q'], k['n'], k['V'], k['Q'], k.get('B', '0')]
+        elif event_type == 'depthUpdate':
+            book = self.order_books.get(data['s'])
+            if book is not None and not book.apply_event(data):
+                print(f"Order book gap detected for {data['s']}, resynchronizing")
+                book.reset()
+                self._resync(data['s'])
+        elif 'b' in data and 'a' in data and 'u' in data:
+            # bookTicker payloads carry no event type
+            self.book_tickers[data['s']] = {
+                "symbol": data['s'],
+                "bidPrice": data['b'],
+                "bidQty": data['B'],
+                "askPrice": data['a'],
+                "askQty": data['A'],
+            }
+
+    def _resync(self, symbol) -> None:
+        task = self._resyncs.get(symbol)
+        if task is None or task.done():
+            self._resyncs[symbol] = asyncio.create_task(self._load_snapshot(symbol))
+
+    async def _load_snapshot(self, symbol) -> None:
+        # Give the stream a moment to buffer events before taking the snapshot
+        await asyncio.sleep(0.5)
+        while self.connected:
+            snapshot = await self.rest_client.get_order_book(symbol, limit=self.depth_snapshot_limit)
+            book = self.order_books[symbol]
+            if not self.connected:
+                return
+            if snapshot and book.apply_snapshot(snapshot):
+                return
+            if book.last_update_id is not None:
+                # A gap between the buffered events, buffer again from scratch
+                book.reset()
+            await asyncio.sleep(self.reconnect_delay)
@@ -0,0 +1,231 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BACKGROUND = 10
+
+
+class BinanceRateLimiter:
+    """
+    A request weight limiter shared by every call of a Binance REST client.
+
+    Each request is charged its weight against the REQUEST_WEIGHT budget of the
+    current window before it is sent. Requests that do not fit are queued by
+    priority (then FIFO) and released when the window rolls over, so
+    interactive requests always go ahead of background work.
+
+    The local estimate is corrected from the X-MBX-USED-WEIGHT-* response
+    headers, and a 429/418 response blocks every request until Retry-After.
+    """
+
+    # Keep a little headroom for requests that are in flight but not yet
+    # reflected in the used weight reported by the server.
+    DEFAULT_SAFETY_MARGIN = 0.9
+
+    INTERVAL_SECONDS = {'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400}
+
+    def __init__(self, limit=6000, interval_seconds=60, safety_margin=DEFAULT_SAFETY_MARGIN) -> None:
+        """
+        Args:
+            limit (int, optional): REQUEST_WEIGHT budget per window. Default: 6000.
+            interval_seconds (int, optional): Window length in seconds. Default: 60.
+            safety_margin (float, optional): Fraction of the budget that may be used. Default: 0.9.
+        """
+        self.limit = limit
+        self.interval_seconds = interval_seconds
+        self.safety_margin = safety_margin
+        self._used = 0
+        self._window = self._current_window()
+        self._blocked_until = 0.0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._timer = None
+
+    @property
+    def budget(self) -> int:
+        return int(self.limit * self.safety_margin)
+
+    @property
+    def used_weight(self) -> int:
+        self._roll_window()
+        return self._used
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter[3].done())
+
+    @property
+    def blocked_for(self) -> float:
+        return max(0.0, self._blocked_until - time.time())
+
+    def configure(self, rate_limits) -> None:
+        """
+        Applies the REQUEST_WEIGHT limit from the "rateLimits" section of exchangeInfo.
+
+        Args:
+            rate_limits (list): The "rateLimits" list returned by get_exchange_info.
+        """
+        for rate_limit in rate_limits or []:
+            if rate_limit.get('rateLimitType') != 'REQUEST_WEIGHT':
+                continue
+            unit = self.INTERVAL_SECONDS.get(rate_limit.get('interval'))
+            if unit is None:
+                continue
+            self.limit = int(rate_limit['limit'])
+            self.interval_seconds = unit * int(rate_limit.get('intervalNum', 1))
+            self._window = self._current_window()
+            break
+        self._dispatch()
+
+    async def acquire(self, weight=1, priority=PRIORITY_DEFAULT) -> None:
+        """
+        Waits until the request weight can be spent in the current window.
+
+        Args:
+            weight (int, optional): Request weight of the call. Default: 1.
+            priority (int, optional): Lower values are served first. Default: PRIORITY_DEFAULT.
+        """
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), weight, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The weight was granted just before the cancellation
+                self._used = max(0, self._used - weight)
+            raise
+
+    def update_from_headers(self, status, headers) -> None:
+        """
+        Synchronizes the limiter with a response received from Binance.
+
+        Args:
+            status (int): HTTP status code of the response.
+            headers (Mapping): Response headers.
+        """
+        used_weight = self._used_weight_from_headers(headers)
+        if used_weight is not None:
+            self._roll_window()
+            # The header only covers requests the server has already seen,
+            # so never lower the local estimate within the same window.
+            self._used = max(self._used, used_weight)
+
+        if status in (418, 429):
+            retry_after = headers.get('Retry-After')
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = self._seconds_until_next_window()
+            self._blocked_until = max(self._blocked_until, time.time() + delay)
+            print(f"Binance rate limit hit (HTTP {status}), pausing requests for {delay:.0f}s")
+
+        self._dispatch()
+
+    def _used_weight_from_headers(self, headers):
+        window_header = f"X-MBX-USED-WEIGHT-{self._interval_header_suffix()}"
+        for name in (window_header, 'X-MBX-USED-WEIGHT'):
+            value = headers.get(name)
+            if value is not None:
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    def _interval_header_suffix(self) -> str:
+        for letter, unit in (('D', 86400), ('H', 3600), ('M', 60), ('S', 1)):
+            if self.interval_seconds % unit == 0:
+                return f"{self.interval_seconds // unit}{letter}"
+        return f"{self.interval_seconds}S"
+
+    def _current_window(self) -> int:
+        return int(time.time() // self.interval_seconds)
+
+    def _seconds_until_next_window(self) -> float:
+        return (self._current_window() + 1) * self.interval_seconds - time.time()
+
+    def _roll_window(self) -> None:
+        window = self._current_window()
+        if window != self._window:
+            self._window = window
+            self._used = 0
+
+    def _dispatch(self) -> None:
+        self._roll_window()
+        now = time.time()
+        while self._waiters:
+            priority, _, weight, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if now < self._blocked_until:
+                break
+            # A single request heavier than the budget is let through on an
+            # empty window, otherwise it would wait forever.
+            if self._used + weight > self.budget and self._used > 0:
+                break
+            heapq.heappop(self._waiters)
+            self._used += weight
+            future.set_result(None)
+
+        if self._waiters and self._timer is None:
+            if time.time() < self._blocked_until:
+                delay = self._blocked_until - time.time()
+            else:
+                delay = self._seconds_until_next_window()
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(max(delay, 0.001), self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+
+def klines_weight(limit) -> int:
+    """
+    Request weight of get_klines for the given limit.
+    """
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit < 1000:
+        return 5
+    return 10
+
+
+def ticker_24hr_weight(symbol_count=None) -> int:
+    """
+    Request weight of get_ticker_24hr for a number of symbols, or for the whole market if None.
+    """
+    if symbol_count is None or symbol_count > 100:
+        return 80
+    if symbol_count > 20:
+        return 40
+    return 2
+
+
+def ticker_price_weight(symbol_count=None) -> int:
+    """
+    Request weight of get_ticker_price/get_book_ticker for a number of symbols, or for the whole market if None.
+    """
+    return 2 if symbol_count == 1 else 4
+
+
+def order_book_weight(limit) -> int:
+    """
+    Request weight of get_order_book for the given limit.
+    """
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+
+from aiohttp import web
+
+
+class BinanceStreamReplayServer:
+    """
+    A local stand-in for the Binance market data WebSocket endpoint.
+
+    Serves /stream and /ws and replays frames recorded by
+    BinanceMarketDataStreamClient (record_path) or written by hand, one JSON
+    frame per line. Frames are sent to every connecting client regardless of
+    the requested streams, so a test can point the stream client's base_url
+    to ws://127.0.0.1:<port> and get a deterministic feed.
+
+    A line may also be {"delay": seconds} to pause the replay, e.g. to
+    simulate a quiet market or to let a REST snapshot be taken.
+    """
+
+    def __init__(self, frames, interval=0.0, loop_forever=False) -> None:
+        """
+        Args:
+            frames (list): Raw frames (str) or {"delay": seconds} dicts, in replay order.
+            interval (float, optional): Pause between two frames in seconds. Default: 0.
+            loop_forever (bool, optional): Restart from the first frame when the end is reached. Default: False.
+        """
+        self.frames = frames
+        self.interval = interval
+        self.loop_forever = loop_forever
+        self.app = web.Application()
+        self.app.router.add_get('/stream', self._handle)
+        self.app.router.add_get('/ws', self._handle)
+        self.app.router.add_get('/ws/{streams}', self._handle)
+        self._runner = None
+
+    @classmethod
+    def from_file(cls, path, interval=0.0, loop_forever=False) -> 'BinanceStreamReplayServer':
+        """
+        Loads the frames of a JSONL file.
+        """
+        frames = []
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                frame = json.loads(line)
+                frames.append(frame if isinstance(frame, dict) and set(frame) == {'delay'} else line)
+        return cls(frames, interval, loop_forever)
+
+    async def start(self, host='127.0.0.1', port=0) -> int:
+        """
+        Starts serving in the running event loop.
+
+        Returns:
+            int: The port the server listens on (useful with port=0).
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        while True:
+            for frame in self.frames:
+                if ws.closed:
+                    return ws
+                if isinstance(frame, dict):
+                    if await self._pause(ws, frame['delay']):
+                        return ws
+                    continue
+                await ws.send_str(frame)
+                if self.interval:
+                    await asyncio.sleep(self.interval)
+            if not self.loop_forever:
+                break
+        await ws.close()
+        return ws
+
+    @staticmethod
+    async def _pause(ws, delay) -> bool:
+        # Waits on the socket rather than sleeping, so a client going away ends the pause
+        # and stop() is not held up. Returns True if the client is gone.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + delay
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                message = await asyncio.wait_for(ws.receive(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            if message.type in (web.WSMsgType.CLOSE, web.WSMsgType.CLOSING, web.WSMsgType.CLOSED,
+                                web.WSMsgType.ERROR):
+                return True
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replays recorded Binance market data stream frames.')
+    parser.add_argument('path', help='JSONL file with one frame per line')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9443)
+    parser.add_argument('--interval', type=float, default=0.0, help='Seconds between two frames')
+    parser.add_argument('--loop', action='store_true', help='Replay the file forever')
+    args = parser.parse_args()
+
+    server = BinanceStreamReplayServer.from_file(args.path, args.interval, args.loop)
+    web.run_app(server.app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+import asyncio
+import math
+import time
+from array import array
+
+from binance_rate_limiter import PRIORITY_BACKGROUND
+
+
+class BinanceTickerSnapshot:
+    """
+    Keeps the latest price and book ticker of every symbol in memory.
+
+    A background task pulls the all-symbols /ticker/price and /ticker/bookTicker
+    lists on a fixed cadence, which costs about as much as two single-symbol
+    calls. Values are stored in parallel float arrays addressed through a
+    symbol-to-slot dict, so a lookup is a dict hit plus an array index.
+
+    The get_ticker_price/get_coin_price/get_book_ticker lookups return the same
+    shape as the REST client, or None when the symbol is unknown, missing
+    from the latest lists (e.g. delisted) or the snapshot is older than
+    max_age, in which case callers should fall back to the REST client.
+
+    The client must not sit behind a response cache: a cached list would be
+    applied again as if it were new and keep stale prices looking fresh.
+
+    Listeners registered with add_listener are awaited after every successful
+    refresh, e.g. to evaluate price alerts once per cycle.
+    """
+
+    def __init__(self, client, refresh_interval=2.0, max_age=10.0) -> None:
+        """
+        Args:
+            client (BinanceMarketDataAsyncRestClient): Client used to pull the full lists, not a cached client.
+            refresh_interval (float, optional): Seconds between two refreshes. Default: 2.
+            max_age (float, optional): Seconds after which the snapshot is considered stale. Default: 10.
+        """
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.slots = {}
+        self.symbols = []
+        self.prices = array('d')
+        self.bid_prices = array('d')
+        self.bid_qtys = array('d')
+        self.ask_prices = array('d')
+        self.ask_qtys = array('d')
+        # Incremented whenever slots are added, so precomputed slot indexes can be rebuilt
+        self.generation = 0
+        self.updated_at = None
+        self._listeners = []
+        self._task = None
+
+    def start(self) -> None:
+        """
+        Starts the background refresh task on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the background refresh task.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add_listener(self, listener) -> None:
+        """
+        Registers a coroutine function called with the snapshot after every successful refresh.
+        """
+        self._listeners.append(listener)
+
+    def is_fresh(self) -> bool:
+        return self.updated_at is not None and time.monotonic() - self.updated_at <= self.max_age
+
+    def slot(self, symbol):
+        """
+        Returns the array index of the symbol, or None if it is unknown.
+        """
+        return self.slots.get(symbol)
+
+    def price(self, symbol):
+        """
+        Returns the last price of the symbol as a float, or None if unknown or stale.
+        """
+        slot = self.slots.get(symbol)
+        if slot is None or not self.is_fresh():
+            return None
+        price = self.prices[slot]
+        return None if math.isnan(price) else price
+
+    def read_prices(self, slots):
+        """
+        Returns the prices of many slots as a numpy array in the shape of slots.
+        """
+        import numpy as np
+
+        # A temporary view: the array cannot grow while a buffer export is alive
+        prices = np.frombuffer(self.prices, dtype=np.float64)
+        values = prices[np.asarray(slots, dtype=np.intp)]
+        del prices
+        return values
+
+    def get_ticker_price(self, symbol) -> dict:
+        """
+        Same as BinanceMarketDataAsyncRestClient.get_ticker_price(symbol), served from memory.
+
+        Returns:
+            dict: {"symbol", "price"}, or None if the symbol is unknown or the snapshot is stale.
+        """
+        price = self.price(symbol)
+        if price is None:
+            return None
+        return {"symbol": symbol, "price": self._format(price)}
+
+    get_coin_price = get_ticker_price
+
+    def get_book_ticker(self, symbol) -> dict:
+        """
+        Same as BinanceMarketDataAsyncRestClient.get_book_ticker(symbol), served from memory.
+
+        Returns:
+            dict: {"symbol", "bidPrice", "bidQty", "askPrice", "askQty"}, or None if the
+                symbol is unknown or the snapshot is stale.
+        """
+        slot = self.slots.get(symbol)
+        if slot is None or not self.is_fresh() or math.isnan(self.bid_prices[slot]):
+            return None
+        return {
+            "symbol": symbol,
+            "bidPrice": self._format(self.bid_prices[slot]),
+            "bidQty": self._format(self.bid_qtys[slot]),
+            "askPrice": self._format(self.ask_prices[slot]),
+            "askQty": self._format(self.ask_qtys[slot]),
+        }
+
+    async def refresh(self) -> bool:
+        """
+        Pulls the full price and book ticker lists once.
+
+        Returns:
+            bool: True if both lists were received anew and applied.
+        """
+        prices, book_tickers = await asyncio.gather(
+            self.client.get_ticker_price(priority=PRIORITY_BACKGROUND),
+            self.client.get_book_ticker(priority=PRIORITY_BACKGROUND),
+        )
+        if not prices or not book_tickers:
+            return False
+
+        # Symbols left out of a list (delisted or halted) must not keep their last values
+        for column in (self.prices, self.bid_prices, self.bid_qtys, self.ask_prices, self.ask_qtys):
+            column[:] = array('d', [math.nan]) * len(column)
+        for item in prices:
+            self.prices[self._slot_for(item['symbol'])] = float(item['price'])
+        for item in book_tickers:
+            slot = self._slot_for(item['symbol'])
+            self.bid_prices[slot] = float(item['bidPrice'])
+            self.bid_qtys[slot] = float(item['bidQty'])
+            self.ask_prices[slot] = float(item['askPrice'])
+            self.ask_qtys[slot] = float(item['askQty'])
+        self.updated_at = time.monotonic()
+        return True
+
+    def _slot_for(self, symbol) -> int:
+        slot = self.slots.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            self.slots[symbol] = slot
+            self.symbols.append(symbol)
+            for column in (self.prices, self.bid_prices, self.bid_qtys, self.ask_prices, self.ask_qtys):
+                column.append(math.nan)
+            self.generation += 1
+        return slot
+
+    async def _run(self) -> None:
+        if self.is_fresh():
+            # Already filled by a refresh() before start(), e.g. during the startup warm-up
+            await asyncio.sleep(self.refresh_interval)
+        while True:
+            started = time.monotonic()
+            try:
+                if await self.refresh():
+                    for listener in self._listeners:
+                        await listener(self)
+            except Exception as e:
+                print(f"Failed to refresh the ticker snapshot: {e!r}")
+            await asyncio.sleep(max(0.0, self.refresh_interval - (time.monotonic() - started)))
+
+    @staticmethod
+    def _format(value) -> str:
+        # Binance encodes prices and quantities with 8 decimals
+        return f"{value:.8f}"
@@ -0,0 +1,165 @@
+import asyncio
+import io
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+
+def render_candlestick_png(title, open_time, open_, high, low, close, volume) -> bytes:
+    """
+    Draws a candlestick chart with a volume panel and returns it as PNG data.
+
+    Runs in the worker processes, so matplotlib is only imported there.
+    """
+    import numpy as np
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+
+    x = np.arange(len(open_time))
+    rising = close >= open_
+    colors = np.where(rising, '#26a69a', '#ef5350')
+
+    figure, (price_axis, volume_axis) = plt.subplots(
+        2, 1, sharex=True, figsize=(10, 6), dpi=100, gridspec_kw={'height_ratios': (3, 1)})
+    try:
+        price_axis.vlines(x, low, high, colors=colors, linewidth=1)
+        price_axis.bar(x, np.maximum(np.abs(close - open_), (high - low) * 1e-3 + 1e-12),
+                       bottom=np.minimum(open_, close), color=colors, width=0.7)
+        price_axis.set_title(title)
+        price_axis.grid(alpha=0.2)
+        price_axis.yaxis.tick_right()
+        volume_axis.bar(x, volume, color=colors, width=0.7)
+        volume_axis.grid(alpha=0.2)
+        volume_axis.yaxis.tick_right()
+
+        ticks = np.linspace(0, len(x) - 1, min(len(x), 6)).astype(int)
+        volume_axis.set_xticks(ticks)
+        volume_axis.set_xticklabels([np.datetime_as_string(np.datetime64(int(open_time[tick]), 'ms'), unit='m')
+                                     .replace('T', ' ') for tick in ticks], fontsize=8)
+        figure.tight_layout()
+
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png')
+        return buffer.getvalue()
+    finally:
+        plt.close(figure)
+
+
+class ChartImage:
+    """
+    A rendered chart and, once it was uploaded, its Telegram file_id.
+    """
+
+    __slots__ = ('png', 'file_id', 'uploading')
+
+    def __init__(self, png) -> None:
+        self.png = png
+        self.file_id = None
+        self.uploading = None
+
+
+class ChartRenderer:
+    """
+    Renders kline charts in a process pool and caches them per candle.
+
+    Charts are keyed by (symbol, interval, open time of the last closed
+    candle), so everybody asking for the same chart during one candle gets
+    the same image, and concurrent requests for a chart that is being
+    rendered wait for that render. The first upload of an image records its
+    file_id; later sends reuse it instead of uploading the PNG again.
+    """
+
+    def __init__(self, max_workers=2, max_entries=256) -> None:
+        """
+        Args:
+            max_workers (int, optional): Renderer processes. Default: 2.
+            max_entries (int, optional): Charts kept in the cache. Default: 256.
+        """
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self.renders = 0
+        self.hits = 0
+        self._charts = OrderedDict()
+        self._pending = {}
+        self._executor = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            # Forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, symbol, interval, columns) -> ChartImage:
+        """
+        Returns the chart of kline columns, rendering it unless the same candle was rendered already.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            interval (str): Kline interval (e.g., '1h').
+            columns (dict): Kline columns as returned by KlineStore.query, ending with the last closed candle.
+        """
+        if not len(columns['open_time']):
+            raise ValueError(f'No klines available for {symbol} {interval}')
+        key = (symbol, interval, int(columns['open_time'][-1]))
+        chart = self._charts.get(key)
+        if chart is not None:
+            self._charts.move_to_end(key)
+            self.hits += 1
+            return chart
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+        else:
+            pending = self._pending[key] = asyncio.create_task(self._render(key, columns))
+        # Shielded, so a waiter that gives up does not cancel the render for the others
+        return await asyncio.shield(pending)
+
+    async def _render(self, key, columns) -> ChartImage:
+        import numpy as np
+
+        symbol, interval, _ = key
+        self.start()
+        try:
+            # Plain arrays are pickled to the worker, memory maps of the kline store are copied first
+            png = await asyncio.get_running_loop().run_in_executor(
+                self._executor, render_candlestick_png, f'{symbol} {interval}',
+                *(np.array(columns[name]) for name in ('open_time', 'open', 'high', 'low', 'close', 'volume')))
+        finally:
+            self._pending.pop(key, None)
+        chart = self._charts[key] = ChartImage(png)
+        self.renders += 1
+        while len(self._charts) > self.max_entries:
+            self._charts.popitem(last=False)
+        return chart
+
+    @staticmethod
+    async def send(chart, send_photo):
+        """
+        Sends a chart through send_photo(photo), uploading the PNG only if Telegram does not have it yet.
+
+        Returns:
+            telegram.Message: The sent message.
+        """
+        while chart.file_id is None and chart.uploading is not None:
+            # Another chat is uploading the same image, wait for its file_id. If that upload
+            # failed, one of the waiters uploads next and the others wait for it in turn
+            await asyncio.shield(chart.uploading)
+        if chart.file_id is not None:
+            return await send_photo(chart.file_id)
+
+        uploading = chart.uploading = asyncio.get_running_loop().create_future()
+        try:
+            message = await send_photo(chart.png)
+            if message is not None and message.photo:
+                chart.file_id = message.photo[-1].file_id
+            return message
+        finally:
+            uploading.set_result(None)
+            if chart.uploading is uploading:
+                chart.uploading = None
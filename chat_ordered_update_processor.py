@@ -0,0 +1,63 @@
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates concurrently while keeping the updates of one chat in order.
+
+    The application starts one task per update in arrival order. Each task
+    first waits for the lock of its chat and only then for one of the
+    max_concurrent_updates worker slots, so a slow handler delays later
+    updates of its own chat only, and queued updates of a busy chat never
+    hold a worker slot that another chat could use. asyncio.Lock wakes its
+    waiters first in, first out, which preserves the arrival order.
+
+    Locks are reference counted and dropped as soon as a chat has no update
+    in flight, so memory does not grow with the number of chats ever seen.
+    """
+
+    __slots__ = ('_chat_locks',)
+
+    def __init__(self, max_concurrent_updates=32) -> None:
+        """
+        Args:
+            max_concurrent_updates (int, optional): Number of updates handled at the same time. Default: 32.
+        """
+        super().__init__(max_concurrent_updates)
+        self._chat_locks = {}
+
+    async def process_update(self, update, coroutine) -> None:
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            await super().process_update(update, coroutine)
+            return
+
+        entry = self._chat_locks.get(chat_id)
+        if entry is None:
+            entry = self._chat_locks[chat_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await super().process_update(update, coroutine)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chat_locks[chat_id]
+
+    async def do_process_update(self, update, coroutine) -> None:
+        await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @staticmethod
+    def _chat_id(update):
+        if isinstance(update, Update) and update.effective_chat is not None:
+            return update.effective_chat.id
+        return None
@@ -8,10 +8,14 @@ class KeyManager:
     # File containing the Binance API secret key
     BINANCE_API_SECRET_KEY_FILE = 'binance_api_secret.txt'
 
+    # File containing the Telegram user ids allowed to use admin commands, separated by commas or whitespace
+    TELEGRAM_ADMIN_IDS_FILE = 'telegram_admin_ids.txt'
+
     def __init__(self):
         self.telegram_api_key = None
         self.binance_api_key = None
         self.binance_api_secret = None
+        self.telegram_admin_ids = []
         self._load_keys()
 
     def _load_keys(self):
@@ -36,6 +40,16 @@ class KeyManager:
             print(f"Error: {self.BINANCE_API_SECRET_KEY_FILE} not found")
             self.binance_api_secret = None
 
+        try:
+            with open(self.TELEGRAM_ADMIN_IDS_FILE, 'r') as f:
+                self.telegram_admin_ids = [int(admin_id) for admin_id in f.read().replace(',', ' ').split()]
+        except FileNotFoundError as e:
+            print(f"Warning: {self.TELEGRAM_ADMIN_IDS_FILE} not found, admin commands are disabled")
+            self.telegram_admin_ids = []
+        except ValueError as e:
+            print(f"Error: {self.TELEGRAM_ADMIN_IDS_FILE} must contain numeric user ids: {e}")
+            self.telegram_admin_ids = []
+
     def get_telegram_api_key(self):
         return self.telegram_api_key
 
@@ -44,3 +58,6 @@ class KeyManager:
 
     def get_binance_api_secret(self):
         return self.binance_api_secret
+
+    def get_telegram_admin_ids(self):
+        return self.telegram_admin_ids
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import time
+
+from binance_kline_downloader import INTERVAL_MILLISECONDS, KlineDownloadError, KlineRangeDownloader
+from binance_market_data_models import KLINE_COLUMNS, parse_klines
+from binance_rate_limiter import PRIORITY_BACKGROUND
+
+# numpy is imported by the functions that use it, so the store can be created
+# at startup without delaying the bot until numpy is loaded
+
+
+class KlineStore:
+    """
+    A local columnar store of klines, one directory per (symbol, interval).
+
+    Every column is a fixed-width little-endian file (<column>.bin) that is
+    memory-mapped for reads, so queries return numpy views of the files
+    without copying. New candles are appended from the last stored one; the
+    last candle is rewritten in place while it is still open. Time range
+    queries use a binary search on the open_time column.
+    """
+
+    def __init__(self, root_dir='klines', clock=None) -> None:
+        """
+        Args:
+            root_dir (str, optional): Directory holding the column files. Default: klines.
+            clock (BinanceServerClock, optional): Server clock bounding the downloads. Default: the local clock.
+        """
+        self.root_dir = root_dir
+        self.clock = clock
+        self._maps = {}
+        self._syncs = {}
+
+    def _dir(self, symbol, interval) -> str:
+        return os.path.join(self.root_dir, symbol.upper(), interval)
+
+    def _column_path(self, symbol, interval, name) -> str:
+        return os.path.join(self._dir(symbol, interval), f"{name}.bin")
+
+    def count(self, symbol, interval) -> int:
+        return len(self.columns(symbol, interval)['open_time'])
+
+    def columns(self, symbol, interval) -> dict:
+        """
+        Returns every column of a (symbol, interval) as read-only memory-mapped arrays.
+
+        Returns:
+            dict: Column name to numpy array. Empty arrays if nothing is stored yet.
+        """
+        key = (symbol.upper(), interval)
+        columns = self._maps.get(key)
+        if columns is None:
+            columns = self._open(symbol, interval)
+            self._maps[key] = columns
+        return columns
+
+    def last_open_time(self, symbol, interval):
+        """
+        Returns the open time of the last stored candle, or None if nothing is stored.
+        """
+        open_time = self.columns(symbol, interval)['open_time']
+        return int(open_time[-1]) if len(open_time) else None
+
+    def query(self, symbol, interval, start_time=None, end_time=None, limit=None) -> dict:
+        """
+        Returns the candles with start_time <= open_time <= end_time.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            interval (str): Kline interval (e.g., '1m').
+            start_time (int, optional): INCLUSIVE lower bound in ms. Defaults to the first candle.
+            end_time (int, optional): INCLUSIVE upper bound in ms. Defaults to the last candle.
+            limit (int, optional): Only return the most recent candles of the range.
+
+        Returns:
+            dict: Column name to a zero-copy numpy view.
+        """
+        import numpy as np
+
+        columns = self.columns(symbol, interval)
+        open_time = columns['open_time']
+        first = 0 if start_time is None else int(np.searchsorted(open_time, start_time, side='left'))
+        last = len(open_time) if end_time is None else int(np.searchsorted(open_time, end_time, side='right'))
+        if limit is not None:
+            first = max(first, last - limit)
+        return {name: column[first:last] for name, column in columns.items()}
+
+    def append(self, symbol, interval, klines) -> int:
+        """
+        Stores get_klines rows. Rows older than the last stored candle are ignored and a
+        row with the same open time as the last stored candle replaces it.
+
+        The column files are written synchronously, sync() calls this in a thread.
+
+        Returns:
+            int: Number of new candles appended.
+        """
+        import numpy as np
+
+        if not len(klines):
+            return 0
+        new = parse_klines(klines).as_dict()
+        stored = self.columns(symbol, interval)
+        count = len(stored['open_time'])
+        last_open_time = int(stored['open_time'][-1]) if count else None
+
+        open_time = new['open_time']
+        first = 0
+        if last_open_time is not None:
+            first = int(np.searchsorted(open_time, last_open_time, side='left'))
+            if first < len(open_time) and open_time[first] == last_open_time:
+                # The last candle was still open when it was stored, overwrite it
+                self._write(symbol, interval, {name: column[first:first + 1] for name, column in new.items()}, count - 1)
+                first += 1
+        appended = len(open_time) - first
+        if appended > 0:
+            self._write(symbol, interval, {name: column[first:] for name, column in new.items()}, count)
+        self._maps.pop((symbol.upper(), interval), None)
+        return max(appended, 0)
+
+    async def sync(self, client, symbol, interval, start_time=None, priority=PRIORITY_BACKGROUND) -> int:
+        """
+        Downloads the candles after the last stored one (or from start_time) and appends them.
+
+        A sync of a series that is already being synced joins the one in flight:
+        it returns the same count, or raises the same exception, instead of
+        downloading the same tail again.
+
+        Args:
+            client (BinanceMarketDataAsyncRestClient): Client used to download the klines.
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            interval (str): Kline interval (e.g., '1m').
+            start_time (int, optional): Where to start when nothing is stored yet.
+                Defaults to the most recent 1000 candles.
+            priority (int, optional): Rate limiter priority of the requests. Default: PRIORITY_BACKGROUND.
+
+        Returns:
+            int: Number of new candles appended by this sync or the one it joined.
+        """
+        key = (symbol.upper(), interval)
+        task = self._syncs.get(key)
+        if task is None:
+            task = self._syncs[key] = asyncio.ensure_future(self._sync(client, symbol, interval, start_time, priority))
+            task.add_done_callback(lambda done: self._syncs.pop(key) if self._syncs.get(key) is done else None)
+        # Shielded, so one cancelled caller does not cancel the download for the others
+        return await asyncio.shield(task)
+
+    async def _sync(self, client, symbol, interval, start_time, priority) -> int:
+        # Appends write the column files, they run in a thread so the event loop keeps serving
+        last_open_time = self.last_open_time(symbol, interval)
+        if last_open_time is None and start_time is None:
+            klines = await client.get_klines(symbol, interval, limit=1000, priority=priority)
+            return await asyncio.to_thread(self.append, symbol, interval, klines or [])
+
+        interval_ms = INTERVAL_MILLISECONDS.get(interval)
+        if last_open_time is not None and interval_ms is not None:
+            now = self.clock.server_now_ms() if self.clock else int(time.time() * 1000)
+            # The stored last candle is fetched again since it may have been open, plus one for clock error
+            limit = max(0, now - last_open_time) // interval_ms + 2
+            if limit <= 1000:
+                # A short tail is one request sized to it, weight 1 below 100 candles instead of 10 for a full page
+                klines = await client.get_klines(symbol, interval, startTime=last_open_time, limit=limit,
+                                                 priority=priority)
+                if klines is None:
+                    raise KlineDownloadError(f'Failed to download the {symbol} {interval} klines', last_open_time)
+                return await asyncio.to_thread(self.append, symbol, interval, klines)
+
+        downloader = KlineRangeDownloader(client, priority=priority, clock=self.clock)
+        since = last_open_time if last_open_time is not None else start_time
+        appended = 0
+        batch = []
+        async for row in downloader.iter_klines(symbol, interval, since):
+            batch.append(row)
+            if len(batch) >= 10000:
+                appended += await asyncio.to_thread(self.append, symbol, interval, batch)
+                batch = []
+        appended += await asyncio.to_thread(self.append, symbol, interval, batch)
+        return appended
+
+    def _open(self, symbol, interval) -> dict:
+        import numpy as np
+
+        paths = {name: self._column_path(symbol, interval, name) for name, _, _ in KLINE_COLUMNS}
+        counts = [os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0
+                  for (name, dtype, _), path in zip(KLINE_COLUMNS, paths.values())]
+        # A crash between two column writes can leave columns of different lengths
+        count = min(counts)
+        columns = {}
+        for name, dtype, _ in KLINE_COLUMNS:
+            if count == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(paths[name], dtype=np.dtype(dtype).newbyteorder('<'), mode='r', shape=(count,))
+        return columns
+
+    def _write(self, symbol, interval, columns, offset) -> None:
+        import numpy as np
+
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+        for name, dtype, _ in KLINE_COLUMNS:
+            path = self._column_path(symbol, interval, name)
+            data = np.ascontiguousarray(columns[name], dtype=np.dtype(dtype).newbyteorder('<'))
+            # Files are never shrunk: readers may still hold maps of the old length
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                f.seek(offset * data.itemsize)
+                f.write(data.tobytes())
+
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from binance_exchange_info_cache import ExchangeInfoCache
+from binance_market_data_async_rest_client import BinanceMarketDataAsyncRestClient
+from binance_rate_limiter import PRIORITY_BACKGROUND
+from binance_ticker_snapshot import BinanceTickerSnapshot
+from server_clock import BinanceServerClock
+from shared_price_table import SharedPriceTable
+
+
+class MarketDataFeeder:
+    """
+    Pulls the all-symbols tickers from Binance and publishes them to a SharedPriceTable.
+
+    Prices and book tickers come from a BinanceTickerSnapshot and are copied
+    to the table after every refresh; the MINI 24hr statistics of all symbols
+    are pulled on a slower cadence. However many bot processes read the
+    table, Binance sees the traffic of this one process.
+
+    The feeder also syncs the server clock and publishes the estimate in the
+    table header, and keeps the exchange info cache file current; the bot
+    processes read both instead of polling Binance themselves.
+    """
+
+    def __init__(self, client, table, price_interval=2.0, ticker_24hr_interval=30.0, exchange_info=None,
+                 server_clock=None) -> None:
+        """
+        Args:
+            client (BinanceMarketDataAsyncRestClient): Client used to pull the tickers.
+            table (SharedPriceTable): The table to write, created by this process.
+            price_interval (float, optional): Seconds between two price refreshes. Default: 2.
+            ticker_24hr_interval (float, optional): Seconds between two 24hr refreshes. Default: 30.
+            exchange_info (ExchangeInfoCache, optional): Cache whose file the bot processes reload.
+            server_clock (BinanceServerClock, optional): Clock published in the table header.
+        """
+        self.client = client
+        self.table = table
+        self.ticker_24hr_interval = ticker_24hr_interval
+        self.exchange_info = exchange_info
+        self.server_clock = server_clock
+        self.snapshot = BinanceTickerSnapshot(client, refresh_interval=price_interval)
+        self.snapshot.add_listener(self._publish_prices)
+
+    async def run(self) -> None:
+        """
+        Feeds the table until cancelled.
+        """
+        self.snapshot.start()
+        if self.exchange_info is not None:
+            await asyncio.to_thread(self.exchange_info.load)
+            self.exchange_info.start()
+        clock_task = asyncio.create_task(self._run_clock()) if self.server_clock is not None else None
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    await self.refresh_ticker_24hr()
+                except Exception as e:
+                    print(f"Failed to refresh the 24hr tickers: {e!r}")
+                await asyncio.sleep(max(0.0, self.ticker_24hr_interval - (time.monotonic() - started)))
+        finally:
+            await self.snapshot.stop()
+            if clock_task is not None:
+                clock_task.cancel()
+                try:
+                    await clock_task
+                except asyncio.CancelledError:
+                    pass
+            if self.exchange_info is not None:
+                await self.exchange_info.stop()
+
+    async def refresh_ticker_24hr(self) -> bool:
+        tickers = await self.client.get_ticker_24hr(priority=PRIORITY_BACKGROUND, type='MINI')
+        if not tickers:
+            return False
+        self.table.write(
+            [ticker['symbol'] for ticker in tickers],
+            {field: np.array([ticker[key] for ticker in tickers], dtype=np.float64)
+             for field, key in (('open_price', 'openPrice'), ('high_price', 'highPrice'), ('low_price', 'lowPrice'),
+                                ('volume', 'volume'), ('quote_volume', 'quoteVolume'))},
+            ticker_24hr=True,
+        )
+        return True
+
+    async def _run_clock(self) -> None:
+        while True:
+            try:
+                if await self.server_clock.sync():
+                    self.table.write_clock(self.server_clock)
+            except Exception as e:
+                print(f"Failed to sync the server clock: {e!r}")
+            await asyncio.sleep(self.server_clock.sync_interval)
+
+    async def _publish_prices(self, snapshot) -> None:
+        columns = {'price': snapshot.prices, 'bid_price': snapshot.bid_prices, 'bid_qty': snapshot.bid_qtys,
+                   'ask_price': snapshot.ask_prices, 'ask_qty': snapshot.ask_qtys}
+        self.table.write(snapshot.symbols, {field: np.array(values) for field, values in columns.items()})
+
+
+async def _main(args) -> None:
+    table = SharedPriceTable.create(args.name, args.capacity)
+    client = BinanceMarketDataAsyncRestClient(pool_size=4, hedge=args.hedge)
+    print(f"Publishing prices to shared memory {table.name}")
+    try:
+        await MarketDataFeeder(client, table, args.price_interval, args.ticker_24hr_interval,
+                               exchange_info=ExchangeInfoCache(client, args.exchange_info_path),
+                               server_clock=BinanceServerClock(client)).run()
+    finally:
+        await client.close()
+        table.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publishes Binance tickers to shared memory for the bot processes.')
+    parser.add_argument('--name', default='binance_prices', help='Name of the shared memory segment')
+    parser.add_argument('--capacity', type=int, default=8192, help='Maximum number of symbols')
+    parser.add_argument('--price-interval', type=float, default=2.0, help='Seconds between two price refreshes')
+    parser.add_argument('--ticker-24hr-interval', type=float, default=30.0,
+                        help='Seconds between two 24hr statistics refreshes')
+    parser.add_argument('--exchange-info-path', default=ExchangeInfoCache.DEFAULT_PATH,
+                        help='Exchange info cache file the bot processes reload')
+    parser.add_argument('--hedge', action='store_true', help='Send slow Binance requests to a second host as well')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+import math
+import time
+from bisect import bisect_left
+
+
+# Upper bounds in seconds, from 1 ms to 30 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount=1.0) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """
+    A value that is set directly, or computed by a callback when the metrics are read.
+    """
+
+    __slots__ = ('value', 'callback')
+
+    def __init__(self, callback=None) -> None:
+        self.value = 0.0
+        self.callback = callback
+
+    def set(self, value) -> None:
+        self.value = value
+
+    def get(self) -> float:
+        if self.callback is not None:
+            try:
+                return float(self.callback())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class Histogram:
+    """
+    Counts observations into fixed buckets; recording is one bisect and two additions.
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q) -> float:
+        """
+        Estimates a quantile by linear interpolation inside its bucket, like Prometheus does.
+        """
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process and renders them in the Prometheus text format.
+
+    Metrics are identified by name and label values. The first call with a
+    given combination creates the metric and later calls return the same
+    object, so hot paths can look it up every time or keep a reference.
+    """
+
+    def __init__(self) -> None:
+        self._metrics = {}
+        self._help = {}
+        self._types = {}
+        self.started_at = time.time()
+
+    def _get(self, kind, factory, name, help_text, labels):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            metric = self._metrics[key] = factory()
+            self._help.setdefault(name, help_text)
+            self._types.setdefault(name, kind)
+        return metric
+
+    def counter(self, name, help_text='', **labels) -> Counter:
+        return self._get('counter', Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text='', callback=None, **labels) -> Gauge:
+        gauge = self._get('gauge', Gauge, name, help_text, labels)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name, help_text='', buckets=LATENCY_BUCKETS, **labels) -> Histogram:
+        return self._get('histogram', lambda: Histogram(buckets), name, help_text, labels)
+
+    def collect(self, name) -> list:
+        """
+        Returns the (labels dict, metric) pairs registered under a name.
+        """
+        return [(dict(labels), metric) for (metric_name, labels), metric in self._metrics.items()
+                if metric_name == name]
+
+    def render(self) -> str:
+        """
+        Returns all metrics in the Prometheus text exposition format.
+        """
+        by_name = {}
+        for (name, labels), metric in self._metrics.items():
+            by_name.setdefault(name, []).append((labels, metric))
+
+        lines = []
+        for name in sorted(by_name):
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {self._types[name]}")
+            for labels, metric in by_name[name]:
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, bucket_count in zip(metric.buckets, metric.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {metric.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {metric.sum}")
+                    lines.append(f"{name}_count{_labels(labels)} {metric.count}")
+                elif isinstance(metric, Gauge):
+                    lines.append(f"{name}{_labels(labels)} {metric.get()}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {metric.value}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+# The registry used by the client, the bot and the metrics server unless told otherwise
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """
+    Serves the registry as text on /metrics for Prometheus to scrape.
+    """
+
+    def __init__(self, registry=REGISTRY, host='127.0.0.1', port=9108) -> None:
+        """
+        Args:
+            registry (MetricsRegistry, optional): The metrics to serve. Default: REGISTRY.
+            host (str, optional): Address to bind to. Default: 127.0.0.1.
+            port (int, optional): Port to listen on. Default: 9108.
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self) -> None:
+        # Imported here so processes without a metrics server do not load the aiohttp server at startup
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        return web.Response(text=self.registry.render(), content_type='text/plain', charset='utf-8',
+                            headers={'X-Content-Type-Options': 'nosniff'})
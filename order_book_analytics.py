@@ -0,0 +1,137 @@
+import numpy as np
+
+
+BUY = 'BUY'
+SELL = 'SELL'
+
+
+class OrderBookArrays:
+    """
+    An order book snapshot held as four float arrays.
+
+    Bids are sorted by descending price and asks by ascending price, as
+    returned by /api/v3/depth, so index 0 is always the top of the book.
+    """
+
+    __slots__ = ('bid_prices', 'bid_qtys', 'ask_prices', 'ask_qtys', 'last_update_id')
+
+    def __init__(self, bid_prices, bid_qtys, ask_prices, ask_qtys, last_update_id=None) -> None:
+        self.bid_prices = bid_prices
+        self.bid_qtys = bid_qtys
+        self.ask_prices = ask_prices
+        self.ask_qtys = ask_qtys
+        self.last_update_id = last_update_id
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.bid_prices[0]) if len(self.bid_prices) else float('nan')
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.ask_prices[0]) if len(self.ask_prices) else float('nan')
+
+    @property
+    def mid_price(self) -> float:
+        return (self.best_bid + self.best_ask) / 2.0
+
+    def side(self, side) -> tuple:
+        """
+        Returns the (prices, quantities) a market order of the given side consumes.
+        """
+        return (self.ask_prices, self.ask_qtys) if side == BUY else (self.bid_prices, self.bid_qtys)
+
+
+def _levels(levels) -> np.ndarray:
+    # numpy parses the [price, qty] decimal strings in C, no per-level objects are kept
+    array = np.array(levels, dtype=np.float64)
+    return array.reshape(-1, 2)
+
+
+def parse_order_book(order_book) -> OrderBookArrays:
+    """
+    Converts a get_order_book response into OrderBookArrays.
+    """
+    bids = _levels(order_book.get('bids', []))
+    asks = _levels(order_book.get('asks', []))
+    return OrderBookArrays(bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1],
+                           order_book.get('lastUpdateId', order_book.get('u')))
+
+
+def cumulative_depth(prices, qtys) -> tuple:
+    """
+    Cumulative quantity and quote notional from the top of the book outwards.
+
+    Returns:
+        tuple: (cumulative quantity, cumulative notional) arrays.
+    """
+    return np.cumsum(qtys), np.cumsum(prices * qtys)
+
+
+def spread(book) -> tuple:
+    """
+    Returns:
+        tuple: (absolute spread, spread in basis points of the mid price).
+    """
+    absolute = book.best_ask - book.best_bid
+    return absolute, absolute / book.mid_price * 1e4
+
+
+def fill_price(book, side, notional) -> tuple:
+    """
+    Average price of a market order that spends the given quote notional.
+
+    Args:
+        book (OrderBookArrays): The order book.
+        side (str): BUY walks the asks, SELL walks the bids.
+        notional (float): Quote amount of the order (e.g. USDT).
+
+    Returns:
+        tuple: (average fill price, filled notional, number of levels touched).
+            The filled notional is lower than requested if the book is too thin.
+    """
+    prices, qtys = book.side(side)
+    if not len(prices):
+        return float('nan'), 0.0, 0
+    cum_qty, cum_notional = cumulative_depth(prices, qtys)
+    level = int(np.searchsorted(cum_notional, notional, side='left'))
+    if level >= len(prices):
+        return float(cum_notional[-1] / cum_qty[-1]), float(cum_notional[-1]), len(prices)
+
+    # Fully consumed levels plus the part of the last level that is needed
+    filled_notional = cum_notional[level - 1] if level else 0.0
+    filled_qty = cum_qty[level - 1] if level else 0.0
+    filled_qty += (notional - filled_notional) / prices[level]
+    return float(notional / filled_qty), float(notional), level + 1
+
+
+def slippage(book, side, notional) -> float:
+    """
+    Slippage of a market order against the top of the book, in basis points (always >= 0).
+    """
+    average, _, _ = fill_price(book, side, notional)
+    best = book.best_ask if side == BUY else book.best_bid
+    return abs(average - best) / best * 1e4
+
+
+def depth_within(book, percent) -> tuple:
+    """
+    Quote notional resting within +-percent of the mid price.
+
+    Returns:
+        tuple: (bid notional, ask notional).
+    """
+    mid = book.mid_price
+    bid_levels = int(np.searchsorted(-book.bid_prices, -mid * (1 - percent / 100.0), side='right'))
+    ask_levels = int(np.searchsorted(book.ask_prices, mid * (1 + percent / 100.0), side='right'))
+    bid_notional = float(np.dot(book.bid_prices[:bid_levels], book.bid_qtys[:bid_levels]))
+    ask_notional = float(np.dot(book.ask_prices[:ask_levels], book.ask_qtys[:ask_levels]))
+    return bid_notional, ask_notional
+
+
+def imbalance(book, percent) -> float:
+    """
+    Bid/ask imbalance within +-percent of the mid price, in [-1, 1]. Positive means more bids.
+    """
+    bid_notional, ask_notional = depth_within(book, percent)
+    total = bid_notional + ask_notional
+    return (bid_notional - ask_notional) / total if total else 0.0
@@ -0,0 +1,183 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Holding(NamedTuple):
+    asset: str
+    quantity: float
+    price: float
+    value: float
+
+
+class PortfolioValuation(NamedTuple):
+    quote: str
+    total: float
+    holdings: list
+    unpriced: list
+
+
+class _Graph:
+    """
+    Assets of the tradable symbols and the symbols linking them.
+    """
+
+    __slots__ = ('assets', 'index', 'edges', 'key')
+
+    def __init__(self, key) -> None:
+        self.assets = []
+        self.index = {}
+        # Asset index to a list of (neighbour index, price slot, exponent); the exponent is 1
+        # when the asset is the base of the symbol and -1 when it is the quote
+        self.edges = []
+        self.key = key
+
+    def add_asset(self, asset) -> int:
+        index = self.index.get(asset)
+        if index is None:
+            index = self.index[asset] = len(self.assets)
+            self.assets.append(asset)
+            self.edges.append([])
+        return index
+
+
+class _Plan:
+    """
+    The conversion path of every asset to one quote asset, as padded slot and exponent arrays.
+
+    The rate of asset i is prod(prices[slots[i]] ** exponents[i]); unused hops have exponent 0.
+    """
+
+    __slots__ = ('slots', 'exponents', 'reachable')
+
+    def __init__(self, slots, exponents, reachable) -> None:
+        self.slots = slots
+        self.exponents = exponents
+        self.reachable = reachable
+
+
+class PortfolioValuator:
+    """
+    Values portfolios in a quote asset from the prices of a BinanceTickerSnapshot.
+
+    The exchangeInfo symbols form an undirected graph of assets. For every
+    quote asset that is asked for, a breadth-first search from the quote
+    finds the shortest conversion path of each asset (ties go through the
+    best connected asset, e.g. BTC or USDT), and the paths are stored as
+    arrays of snapshot slots and exponents. Valuing a portfolio is then one
+    gather from the snapshot price array and a product along the paths,
+    without any request to Binance.
+
+    The graph and the paths are rebuilt when the exchange info is refreshed
+    or the snapshot adds symbols.
+    """
+
+    def __init__(self, exchange_info, ticker_snapshot, max_hops=3) -> None:
+        """
+        Args:
+            exchange_info (ExchangeInfoCache): Source of the symbols and their base/quote assets.
+            ticker_snapshot (BinanceTickerSnapshot): Source of the prices, or a SharedTickerSnapshot.
+            max_hops (int, optional): Longest conversion path, in symbols. Default: 3.
+        """
+        self.exchange_info = exchange_info
+        self.ticker_snapshot = ticker_snapshot
+        self.max_hops = max_hops
+        self._graph = None
+        self._plans = {}
+
+    def __contains__(self, asset) -> bool:
+        return asset.upper() in self._compile().index
+
+    def value(self, holdings, quote='USDT') -> PortfolioValuation:
+        """
+        Values the holdings at the current snapshot prices.
+
+        Args:
+            holdings (dict): Asset to quantity, e.g. {'BTC': 0.5, 'ETH': 2}.
+            quote (str, optional): Asset the values are expressed in. Default: USDT.
+
+        Returns:
+            PortfolioValuation: The total, the priced holdings by descending value and the
+                assets that could not be priced.
+        """
+        graph = self._compile()
+        quote = quote.upper()
+        if quote not in graph.index:
+            raise ValueError(f'Unknown quote asset {quote}')
+        plan = self._plans.get(quote)
+        if plan is None:
+            plan = self._plans[quote] = self._plan(graph, quote)
+
+        assets, quantities, unpriced = [], [], []
+        for asset, quantity in holdings.items():
+            asset = asset.upper()
+            if asset in graph.index:
+                assets.append(asset)
+                quantities.append(quantity)
+            else:
+                unpriced.append(asset)
+        if not assets:
+            return PortfolioValuation(quote, 0.0, [], unpriced)
+
+        index = np.fromiter((graph.index[asset] for asset in assets), dtype=np.intp, count=len(assets))
+        # Gathered by the snapshot, a shared table copies every price under its seqlock
+        prices = self.ticker_snapshot.read_prices(plan.slots[index])
+        rates = np.prod(prices ** plan.exponents[index], axis=1)
+        rates[~plan.reachable[index]] = np.nan
+        values = np.asarray(quantities, dtype=np.float64) * rates
+
+        priced = []
+        for asset, quantity, rate, value in zip(assets, quantities, rates.tolist(), values.tolist()):
+            if math.isnan(value):
+                unpriced.append(asset)
+            else:
+                priced.append(Holding(asset, quantity, rate, value))
+        priced.sort(key=lambda holding: -holding.value)
+        return PortfolioValuation(quote, math.fsum(holding.value for holding in priced), priced, unpriced)
+
+    def _compile(self) -> _Graph:
+        snapshot = self.ticker_snapshot
+        key = (self.exchange_info.updated_at, len(self.exchange_info), snapshot.generation)
+        if self._graph is not None and self._graph.key == key:
+            return self._graph
+
+        graph = _Graph(key)
+        for info in self.exchange_info.all_symbols():
+            slot = snapshot.slot(info.symbol)
+            if info.status != 'TRADING' or slot is None:
+                continue
+            base = graph.add_asset(info.base_asset)
+            quote = graph.add_asset(info.quote_asset)
+            graph.edges[base].append((quote, slot, 1.0))
+            graph.edges[quote].append((base, slot, -1.0))
+        self._graph = graph
+        self._plans = {}
+        return graph
+
+    def _plan(self, graph, quote) -> _Plan:
+        count = len(graph.assets)
+        slots = np.zeros((count, self.max_hops), dtype=np.intp)
+        exponents = np.zeros((count, self.max_hops), dtype=np.float64)
+        reachable = np.zeros(count, dtype=bool)
+        paths = {graph.index[quote]: []}
+        reachable[graph.index[quote]] = True
+
+        level = [graph.index[quote]]
+        for _ in range(self.max_hops):
+            # The best connected assets are expanded first, so equal length paths go through hubs
+            level.sort(key=lambda node: -len(graph.edges[node]))
+            next_level = []
+            for node in level:
+                for neighbour, slot, exponent in graph.edges[node]:
+                    if neighbour in paths:
+                        continue
+                    # The edge leads from node to neighbour; converting neighbour into node inverts it
+                    path = paths[neighbour] = [(slot, -exponent)] + paths[node]
+                    for hop, (hop_slot, hop_exponent) in enumerate(path):
+                        slots[neighbour, hop] = hop_slot
+                        exponents[neighbour, hop] = hop_exponent
+                    reachable[neighbour] = True
+                    next_level.append(neighbour)
+            level = next_level
+        return _Plan(slots, exponents, reachable)
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+
+ABOVE = 'above'
+BELOW = 'below'
+
+
+class PriceAlert(NamedTuple):
+    alert_id: int
+    chat_id: int
+    symbol: str
+    direction: str
+    threshold: float
+    created_at: float
+
+
+class _SymbolAlerts:
+    """
+    Sorted thresholds of one symbol with the alert ids in parallel lists.
+    """
+
+    __slots__ = ('above_thresholds', 'above_ids', 'below_thresholds', 'below_ids')
+
+    def __init__(self) -> None:
+        self.above_thresholds = []
+        self.above_ids = []
+        self.below_thresholds = []
+        self.below_ids = []
+
+    def __len__(self) -> int:
+        return len(self.above_ids) + len(self.below_ids)
+
+    def lists(self, direction) -> tuple:
+        if direction == ABOVE:
+            return self.above_thresholds, self.above_ids
+        return self.below_thresholds, self.below_ids
+
+
+class PriceAlertEngine:
+    """
+    Price alerts of many chats on many symbols.
+
+    Every symbol keeps two threshold lists sorted ascending, one for
+    "crosses above" and one for "crosses below" alerts. For a new price the
+    triggered "above" alerts are the prefix with threshold <= price and the
+    triggered "below" alerts are the suffix with threshold >= price, so each
+    tick costs one bisect per list plus the number of triggered alerts.
+
+    Prices come from a BinanceTickerSnapshot (one bulk ticker poll per cycle)
+    through attach(). Triggered alerts are removed and passed to the notify
+    coroutine. Alerts are saved to a JSON file and survive restarts.
+    """
+
+    DEFAULT_PATH = 'alerts.json'
+
+    def __init__(self, path=DEFAULT_PATH, notify=None) -> None:
+        """
+        Args:
+            path (str, optional): Location of the alerts file. Default: alerts.json.
+            notify (coroutine function, optional): Called with the list of triggered
+                (PriceAlert, price) pairs after every price update.
+        """
+        self.path = path
+        self.notify = notify
+        self._alerts = {}
+        self._by_symbol = {}
+        self._by_chat = {}
+        self._next_id = 1
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def add(self, chat_id, symbol, direction, threshold) -> PriceAlert:
+        """
+        Registers an alert.
+
+        Args:
+            chat_id (int): Chat to notify.
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            direction (str): ABOVE or BELOW.
+            threshold (float): Price that triggers the alert.
+
+        Returns:
+            PriceAlert: The new alert.
+        """
+        if direction not in (ABOVE, BELOW):
+            raise ValueError(f"Unknown alert direction {direction}")
+        alert = PriceAlert(self._next_id, chat_id, symbol.upper(), direction, float(threshold), time.time())
+        self._next_id += 1
+        self._insert(alert)
+        self._dirty = True
+        return alert
+
+    def remove(self, alert_id, chat_id=None) -> bool:
+        """
+        Deletes an alert. If chat_id is given, only an alert of that chat is deleted.
+
+        Returns:
+            bool: True if the alert existed and was deleted.
+        """
+        alert = self._alerts.get(alert_id)
+        if alert is None or (chat_id is not None and alert.chat_id != chat_id):
+            return False
+
+        thresholds, ids = self._by_symbol[alert.symbol].lists(alert.direction)
+        index = bisect_left(thresholds, alert.threshold)
+        while ids[index] != alert_id:
+            index += 1
+        del thresholds[index]
+        del ids[index]
+        self._forget(alert)
+        self._dirty = True
+        return True
+
+    def alerts_for_chat(self, chat_id) -> list:
+        return sorted((self._alerts[alert_id] for alert_id in self._by_chat.get(chat_id, ())),
+                      key=lambda alert: alert.alert_id)
+
+    def symbols(self) -> list:
+        return list(self._by_symbol)
+
+    def check(self, symbol, price) -> list:
+        """
+        Removes and returns the alerts of a symbol that the price triggers.
+
+        Returns:
+            list: Triggered PriceAlert objects.
+        """
+        symbol_alerts = self._by_symbol.get(symbol)
+        if symbol_alerts is None:
+            return []
+
+        triggered_ids = []
+        count = bisect_right(symbol_alerts.above_thresholds, price)
+        if count:
+            triggered_ids += symbol_alerts.above_ids[:count]
+            del symbol_alerts.above_thresholds[:count]
+            del symbol_alerts.above_ids[:count]
+        first = bisect_left(symbol_alerts.below_thresholds, price)
+        if first < len(symbol_alerts.below_ids):
+            triggered_ids += symbol_alerts.below_ids[first:]
+            del symbol_alerts.below_thresholds[first:]
+            del symbol_alerts.below_ids[first:]
+
+        triggered = [self._alerts[alert_id] for alert_id in triggered_ids]
+        for alert in triggered:
+            self._forget(alert)
+        if triggered:
+            self._dirty = True
+        return triggered
+
+    def attach(self, ticker_snapshot) -> None:
+        """
+        Checks the alerts after every refresh of the ticker snapshot.
+        """
+        ticker_snapshot.add_listener(self.on_snapshot)
+
+    async def on_snapshot(self, ticker_snapshot) -> None:
+        triggered = []
+        for symbol in list(self._by_symbol):
+            price = ticker_snapshot.price(symbol)
+            if price is not None:
+                triggered += [(alert, price) for alert in self.check(symbol, price)]
+
+        if triggered and self.notify is not None:
+            try:
+                await self.notify(triggered)
+            except Exception as e:
+                print(f"Failed to send price alerts: {e!r}")
+        await self.flush()
+
+    def load(self) -> bool:
+        """
+        Loads the alerts file.
+
+        Returns:
+            bool: True if the file was loaded.
+        """
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"Error: failed to read {self.path}: {e}")
+            return False
+
+        for row in data.get('alerts', []):
+            self._insert(PriceAlert(*row))
+        self._next_id = max(data.get('next_id', 1), max(self._alerts, default=0) + 1)
+        return True
+
+    async def flush(self) -> None:
+        """
+        Writes the alerts file if anything changed since the last write.
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = {'next_id': self._next_id, 'alerts': [list(alert) for alert in self._alerts.values()]}
+        try:
+            await asyncio.to_thread(self._save, data)
+        except OSError as e:
+            self._dirty = True
+            print(f"Error: failed to write {self.path}: {e}")
+
+    def _save(self, data) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def _insert(self, alert) -> None:
+        symbol_alerts = self._by_symbol.get(alert.symbol)
+        if symbol_alerts is None:
+            symbol_alerts = self._by_symbol[alert.symbol] = _SymbolAlerts()
+        thresholds, ids = symbol_alerts.lists(alert.direction)
+        index = bisect_right(thresholds, alert.threshold)
+        thresholds.insert(index, alert.threshold)
+        ids.insert(index, alert.alert_id)
+        self._alerts[alert.alert_id] = alert
+        self._by_chat.setdefault(alert.chat_id, set()).add(alert.alert_id)
+
+    def _forget(self, alert) -> None:
+        del self._alerts[alert.alert_id]
+        chat_alerts = self._by_chat[alert.chat_id]
+        chat_alerts.discard(alert.alert_id)
+        if not chat_alerts:
+            del self._by_chat[alert.chat_id]
+        # check() forgets a batch of alerts after taking them all out, the first one may drop the symbol
+        symbol_alerts = self._by_symbol.get(alert.symbol)
+        if symbol_alerts is not None and not len(symbol_alerts):
+            del self._by_symbol[alert.symbol]
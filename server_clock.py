@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import deque
+from typing import NamedTuple
+
+from binance_rate_limiter import PRIORITY_BACKGROUND
+
+
+class ClockSample(NamedTuple):
+    local_ns: int
+    offset_ns: int
+    rtt_ns: int
+
+
+class BinanceServerClock:
+    """
+    Estimates the Binance server clock from periodic /api/v3/time samples.
+
+    Every sync sends a short burst of requests and keeps the one with the
+    lowest round trip time, the least disturbed by network queuing. The round
+    trip is timed by the client around the HTTP exchange alone, so rate limiter
+    waits, retries and failover never make it asymmetric. Like NTP, the
+    server time is assumed to be read halfway through the round trip, so
+    the offset of a sample is serverTime minus the local midpoint.
+
+    Offsets are measured against the local monotonic clock, which wall clock
+    adjustments do not move. Once the samples span drift_min_span seconds, a
+    least squares line through them (weighted by 1 / rtt^2) gives both the
+    current offset and the drift, so server_now_ns() stays accurate between
+    syncs without any request.
+    """
+
+    # Drift estimates beyond this are measurement noise, quartz clocks drift by tens of ppm
+    MAX_DRIFT = 500e-6
+
+    def __init__(self, client, sync_interval=300.0, burst=4, history=16, max_rtt=0.5,
+                 drift_min_span=600.0) -> None:
+        """
+        Args:
+            client (BinanceMarketDataAsyncRestClient): Client used to sample the server time.
+            sync_interval (float, optional): Seconds between two syncs. Default: 300.
+            burst (int, optional): Requests per sync, the fastest one is kept. Default: 4.
+            history (int, optional): Syncs used to estimate the offset and drift. Default: 16.
+            max_rtt (float, optional): Samples with a longer round trip in seconds are ignored. Default: 0.5.
+            drift_min_span (float, optional): Seconds the samples must span before drift is estimated. Default: 600.
+        """
+        self.client = client
+        self.sync_interval = sync_interval
+        self.burst = burst
+        self.max_rtt = max_rtt
+        self.drift_min_span = drift_min_span
+        self.offset_ns = None
+        self.reference_ns = None
+        self.drift = 0.0
+        self.error_ns = None
+        self.synced_at = None
+        self._samples = deque(maxlen=history)
+        self._task = None
+
+    @property
+    def synced(self) -> bool:
+        return self.offset_ns is not None
+
+    def server_now_ns(self) -> int:
+        """
+        Returns the estimated server time in nanoseconds since the epoch, the local clock until the first sync.
+        """
+        if self.offset_ns is None:
+            return time.time_ns()
+        now = time.monotonic_ns()
+        return now + self.offset_ns + int((now - self.reference_ns) * self.drift)
+
+    def server_now_ms(self) -> int:
+        """
+        Returns the estimated server time in milliseconds, the unit of the Binance API.
+        """
+        return self.server_now_ns() // 1_000_000
+
+    def start(self) -> None:
+        """
+        Starts the periodic sync task on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def sync(self) -> bool:
+        """
+        Takes one burst of samples and updates the estimate.
+
+        Returns:
+            bool: True if a usable sample was received.
+        """
+        best = None
+        for _ in range(self.burst):
+            sample = await self._sample()
+            if sample is not None and (best is None or sample.rtt_ns < best.rtt_ns):
+                best = sample
+        if best is None:
+            return False
+        self._samples.append(best)
+        self._estimate()
+        self.synced_at = time.monotonic()
+        return True
+
+    async def _sample(self):
+        response, started, finished = await self.client.get_server_time_sample(priority=PRIORITY_BACKGROUND)
+        if not response:
+            return None
+        rtt = finished - started
+        if rtt > self.max_rtt * 1e9:
+            return None
+        # serverTime is truncated to the millisecond, the middle of that millisecond is the best guess
+        server_ns = response['serverTime'] * 1_000_000 + 500_000
+        local_ns = started + rtt // 2
+        return ClockSample(local_ns, server_ns - local_ns, rtt)
+
+    def _estimate(self) -> None:
+        samples = list(self._samples)
+        latest = samples[-1]
+        reference, offset, drift = latest.local_ns, latest.offset_ns, 0.0
+
+        if len(samples) >= 3 and (latest.local_ns - samples[0].local_ns) / 1e9 >= self.drift_min_span:
+            # Weighted least squares of offset = intercept + drift * (local - reference)
+            weights = [1.0 / max(sample.rtt_ns, 1) ** 2 for sample in samples]
+            total = sum(weights)
+            mean_x = sum(w * (s.local_ns - reference) for w, s in zip(weights, samples)) / total
+            mean_y = sum(w * (s.offset_ns - offset) for w, s in zip(weights, samples)) / total
+            variance = sum(w * (s.local_ns - reference - mean_x) ** 2 for w, s in zip(weights, samples))
+            if variance > 0:
+                covariance = sum(w * (s.local_ns - reference - mean_x) * (s.offset_ns - offset - mean_y)
+                                 for w, s in zip(weights, samples))
+                drift = max(-self.MAX_DRIFT, min(self.MAX_DRIFT, covariance / variance))
+                offset += int(mean_y - drift * mean_x)
+
+        self.reference_ns = reference
+        self.offset_ns = offset
+        self.drift = drift
+        # Half the round trip bounds where in the request the server read its clock
+        self.error_ns = latest.rtt_ns // 2 + 500_000
+
+    async def _run(self) -> None:
+        if self.synced:
+            # Already synced by a sync() before start(), e.g. during the startup warm-up
+            await asyncio.sleep(self.sync_interval)
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Failed to sync the server clock: {e!r}")
+            await asyncio.sleep(self.sync_interval)
@@ -0,0 +1,466 @@
+import asyncio
+import math
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+# Float columns of the table, one contiguous array each
+FIELDS = ('price', 'bid_price', 'bid_qty', 'ask_price', 'ask_qty',
+          'open_price', 'high_price', 'low_price', 'volume', 'quote_volume')
+FIELD_INDEX = {field: index for index, field in enumerate(FIELDS)}
+
+MAGIC = 0x42504932  # "BPI2", the header carries the server clock
+NAME_SIZE = 32
+
+# Header words
+(_MAGIC, _CAPACITY, _FIELDS, _COUNT, _PRICES_AT, _TICKER_24HR_AT, _WRITER_PID,
+ _CLOCK_SEQ, _CLOCK_OFFSET, _CLOCK_REFERENCE, _CLOCK_DRIFT, _CLOCK_ERROR) = range(12)
+_HEADER_WORDS = 16
+
+
+class SharedPriceTable:
+    """
+    Latest prices, book tickers and 24hr statistics of every symbol in shared memory.
+
+    One feeder process creates the table and writes it; any number of bot
+    processes attach to it by name and read it without locks. The segment
+    holds a header, a fixed-size name per slot, one sequence number per slot
+    and one float64 column per field, so a column of all symbols is a
+    contiguous array.
+
+    Every slot is protected by a seqlock: the writer makes the sequence
+    number odd, writes the fields and makes it even again. A reader copies
+    the fields between two reads of the sequence number and retries if it
+    changed or was odd. Slots are only ever appended, and the slot count in
+    the header is published after the name of a new slot is written.
+
+    The header also carries the server clock estimate of the feeder, under
+    a seqlock of its own, so the bot processes need no clock sync requests.
+    """
+
+    def __init__(self, shm, owner) -> None:
+        self._shm = shm
+        self.owner = owner
+        header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        if int(header[_MAGIC]) != MAGIC or int(header[_FIELDS]) != len(FIELDS):
+            raise ValueError(f'{shm.name} is not a shared price table of this version')
+        self.capacity = int(header[_CAPACITY])
+        offset = header.nbytes
+        self.names = np.ndarray((self.capacity,), dtype=f'S{NAME_SIZE}', buffer=shm.buf, offset=offset)
+        offset += self.names.nbytes
+        self.seqs = np.ndarray((self.capacity,), dtype=np.uint64, buffer=shm.buf, offset=offset)
+        offset += self.seqs.nbytes
+        self.columns = np.ndarray((len(FIELDS), self.capacity), dtype=np.float64, buffer=shm.buf, offset=offset)
+        self.header = header
+        self._slots = {}
+        self._full = False
+
+    @classmethod
+    def create(cls, name, capacity=8192) -> 'SharedPriceTable':
+        """
+        Creates the shared memory segment. The creating process is the only writer.
+
+        Args:
+            name (str): Name of the segment, passed to the bot processes.
+            capacity (int, optional): Maximum number of symbols. Default: 8192.
+        """
+        size = 8 * _HEADER_WORDS + capacity * (NAME_SIZE + 8 + 8 * len(FIELDS))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        header[_FIELDS] = len(FIELDS)
+        header[_WRITER_PID] = os.getpid()
+        header[_MAGIC] = MAGIC
+        del header
+        table = cls(shm, owner=True)
+        table.columns[:] = math.nan
+        return table
+
+    @classmethod
+    def attach(cls, name) -> 'SharedPriceTable':
+        """
+        Attaches to a table created by another process, for reading.
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 every attached segment is tracked and unlinked when the process exits
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def count(self) -> int:
+        return int(self.header[_COUNT])
+
+    @property
+    def prices_updated_at(self):
+        """
+        Wall clock time of the last price write in seconds, or None if nothing was written yet.
+        """
+        value = int(self.header[_PRICES_AT])
+        return value / 1e9 if value else None
+
+    @property
+    def ticker_24hr_updated_at(self):
+        value = int(self.header[_TICKER_24HR_AT])
+        return value / 1e9 if value else None
+
+    def column(self, field) -> np.ndarray:
+        """
+        Returns a field of all slots as a contiguous array. Values may change while it is read,
+        use read_column for a consistent copy.
+        """
+        return self.columns[FIELD_INDEX[field]]
+
+    def write(self, symbols, columns, ticker_24hr=False) -> None:
+        """
+        Writes fields of many symbols at once. Symbols without a slot are added.
+
+        Args:
+            symbols (list): Symbol names, in the order of the column values.
+            columns (dict): Field name to a sequence of values, one per symbol.
+            ticker_24hr (bool, optional): Whether these are 24hr statistics. Default: False.
+        """
+        slots = [self._slot_for(symbol) for symbol in symbols]
+        keep = [index for index, slot in enumerate(slots) if slot is not None]
+        if len(keep) < len(slots):
+            slots = [slots[index] for index in keep]
+            columns = {field: np.asarray(values)[keep] for field, values in columns.items()}
+        slots = np.asarray(slots, dtype=np.intp)
+
+        seqs = self.seqs
+        seqs[slots] += 1
+        for field, values in columns.items():
+            self.columns[FIELD_INDEX[field], slots] = values
+        seqs[slots] += 1
+        self.header[_TICKER_24HR_AT if ticker_24hr else _PRICES_AT] = time.time_ns()
+
+    def read(self, slot, retries=100):
+        """
+        Returns a consistent copy of all fields of a slot, or None if the writer kept it busy.
+        """
+        seqs = self.seqs
+        for attempt in range(retries):
+            if attempt:
+                # Give the writer the CPU to finish the slot instead of spinning against it
+                time.sleep(0)
+            seq = int(seqs[slot])
+            if seq & 1:
+                continue
+            values = self.columns[:, slot].copy()
+            if int(seqs[slot]) == seq:
+                return values
+        return None
+
+    def read_column(self, field, slots, retries=100) -> np.ndarray:
+        """
+        Returns a consistent copy of one field of many slots, each read under its seqlock.
+
+        Args:
+            field (str): Field name, e.g. 'price'.
+            slots (array-like): Slot indexes, of any shape.
+            retries (int, optional): Reads of a slot before giving up on it. Default: 100.
+
+        Returns:
+            np.ndarray: The values in the shape of slots, NaN for the slots the writer kept busy.
+        """
+        slots = np.asarray(slots, dtype=np.intp)
+        values = np.full(slots.shape, math.nan)
+        pending = np.ones(slots.shape, dtype=bool)
+        column = self.columns[FIELD_INDEX[field]]
+        seqs = self.seqs
+        for attempt in range(retries):
+            if attempt:
+                time.sleep(0)
+            wanted = slots[pending]
+            before = seqs[wanted]
+            read = column[wanted]
+            consistent = ((before & 1) == 0) & (seqs[wanted] == before)
+            done = np.flatnonzero(pending)[consistent]
+            values.flat[done] = read[consistent]
+            pending.flat[done] = False
+            if not pending.any():
+                break
+        return values
+
+    def write_clock(self, clock) -> None:
+        """
+        Publishes the estimate of a synced BinanceServerClock.
+        """
+        header = self.header
+        header[_CLOCK_SEQ] += 1
+        # Signed values are stored as their two's complement bits
+        header[_CLOCK_OFFSET] = np.int64(clock.offset_ns).view(np.uint64)
+        header[_CLOCK_REFERENCE] = np.int64(clock.reference_ns).view(np.uint64)
+        header[_CLOCK_DRIFT] = np.float64(clock.drift).view(np.uint64)
+        header[_CLOCK_ERROR] = clock.error_ns
+        header[_CLOCK_SEQ] += 1
+
+    def read_clock(self, retries=100):
+        """
+        Returns the published clock estimate, or None if the feeder has not synced yet.
+
+        Returns:
+            tuple: (offset_ns, reference_ns, drift, error_ns), see BinanceServerClock.
+        """
+        header = self.header
+        for attempt in range(retries):
+            if attempt:
+                time.sleep(0)
+            seq = int(header[_CLOCK_SEQ])
+            if seq & 1:
+                continue
+            words = header[_CLOCK_OFFSET:_CLOCK_ERROR + 1].copy()
+            if int(header[_CLOCK_SEQ]) == seq:
+                if seq == 0:
+                    return None
+                offset, reference = words[:2].view(np.int64).tolist()
+                return offset, reference, float(words[2:3].view(np.float64)[0]), int(words[3])
+        return None
+
+    def new_names(self, known) -> list:
+        """
+        Returns the symbols of the slots after the first known ones.
+        """
+        return [name.decode('ascii') for name in self.names[known:self.count]]
+
+    def close(self) -> None:
+        """
+        Detaches from the segment, and removes it if this process created it.
+        """
+        # The buffer cannot be released while arrays still point into it
+        self.header = self.names = self.seqs = self.columns = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def _slot_for(self, symbol):
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = int(self.header[_COUNT])
+            if slot >= self.capacity:
+                if not self._full:
+                    print(f"The shared price table is full, {symbol} and later symbols are not published")
+                    self._full = True
+                return None
+            self.names[slot] = symbol.encode('ascii')
+            self.header[_COUNT] = slot + 1
+            self._slots[symbol] = slot
+        return slot
+
+
+class SharedTickerSnapshot:
+    """
+    A BinanceTickerSnapshot look-alike that reads a SharedPriceTable instead of polling Binance.
+
+    Lookups are served from the shared table and return None when the feeder
+    stopped writing for longer than max_age, so callers fall back to the
+    REST client like they do with a stale snapshot. A background task polls
+    the table header and calls the listeners after every feeder cycle.
+    """
+
+    def __init__(self, table, max_age=10.0, max_24hr_age=120.0, poll_interval=0.5) -> None:
+        """
+        Args:
+            table (SharedPriceTable): The attached table.
+            max_age (float, optional): Seconds after which prices are considered stale. Default: 10.
+            max_24hr_age (float, optional): Seconds after which 24hr statistics are considered stale. Default: 120.
+            poll_interval (float, optional): Seconds between two checks for a new feeder cycle. Default: 0.5.
+        """
+        self.table = table
+        self.max_age = max_age
+        self.max_24hr_age = max_24hr_age
+        self.poll_interval = poll_interval
+        self.slots = {}
+        self.symbols = []
+        self.generation = 0
+        self._listeners = []
+        self._task = None
+        self._sync()
+
+    @property
+    def updated_at(self):
+        # Kept on the monotonic clock like BinanceTickerSnapshot.updated_at
+        updated_at = self.table.prices_updated_at
+        return None if updated_at is None else time.monotonic() - (time.time() - updated_at)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def is_fresh(self) -> bool:
+        updated_at = self.table.prices_updated_at
+        return updated_at is not None and time.time() - updated_at <= self.max_age
+
+    async def refresh(self) -> bool:
+        """
+        Picks up the symbols added by the feeder. Prices are never pulled from Binance here.
+
+        Returns:
+            bool: True if the feeder wrote recently.
+        """
+        self._sync()
+        return self.is_fresh()
+
+    def slot(self, symbol):
+        slot = self.slots.get(symbol)
+        if slot is None and self.table.count > len(self.symbols):
+            self._sync()
+            slot = self.slots.get(symbol)
+        return slot
+
+    def read_prices(self, slots) -> np.ndarray:
+        """
+        Returns the prices of many slots, read under their seqlocks so no row is torn.
+        """
+        return self.table.read_column('price', slots)
+
+    def price(self, symbol):
+        slot = self.slot(symbol)
+        if slot is None or not self.is_fresh():
+            return None
+        values = self.table.read(slot)
+        if values is None or math.isnan(values[FIELD_INDEX['price']]):
+            return None
+        return float(values[FIELD_INDEX['price']])
+
+    def get_ticker_price(self, symbol) -> dict:
+        price = self.price(symbol)
+        if price is None:
+            return None
+        return {"symbol": symbol, "price": self._format(price)}
+
+    get_coin_price = get_ticker_price
+
+    def get_book_ticker(self, symbol) -> dict:
+        values = self._read(symbol, self.is_fresh(), 'bid_price')
+        if values is None:
+            return None
+        return {
+            "symbol": symbol,
+            "bidPrice": self._format(values[FIELD_INDEX['bid_price']]),
+            "bidQty": self._format(values[FIELD_INDEX['bid_qty']]),
+            "askPrice": self._format(values[FIELD_INDEX['ask_price']]),
+            "askQty": self._format(values[FIELD_INDEX['ask_qty']]),
+        }
+
+    def get_ticker_24hr(self, symbol) -> dict:
+        """
+        Same as a MINI BinanceMarketDataAsyncRestClient.get_ticker_24hr(symbol) item, served from memory.
+
+        Returns:
+            dict: {"symbol", "lastPrice", "openPrice", "highPrice", "lowPrice", "volume", "quoteVolume"},
+                or None if the symbol is unknown or the statistics are stale.
+        """
+        updated_at = self.table.ticker_24hr_updated_at
+        fresh = updated_at is not None and time.time() - updated_at <= self.max_24hr_age
+        values = self._read(symbol, fresh and self.is_fresh(), 'open_price')
+        if values is None:
+            return None
+        return {
+            "symbol": symbol,
+            "lastPrice": self._format(values[FIELD_INDEX['price']]),
+            "openPrice": self._format(values[FIELD_INDEX['open_price']]),
+            "highPrice": self._format(values[FIELD_INDEX['high_price']]),
+            "lowPrice": self._format(values[FIELD_INDEX['low_price']]),
+            "volume": self._format(values[FIELD_INDEX['volume']]),
+            "quoteVolume": self._format(values[FIELD_INDEX['quote_volume']]),
+        }
+
+    def _read(self, symbol, fresh, required):
+        slot = self.slot(symbol)
+        if slot is None or not fresh:
+            return None
+        values = self.table.read(slot)
+        if values is None or math.isnan(values[FIELD_INDEX[required]]):
+            return None
+        return values
+
+    def _sync(self) -> None:
+        for name in self.table.new_names(len(self.symbols)):
+            self.slots[name] = len(self.symbols)
+            self.symbols.append(name)
+            self.generation += 1
+
+    async def _run(self) -> None:
+        last_seen = self.table.prices_updated_at
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            updated_at = self.table.prices_updated_at
+            if updated_at == last_seen:
+                continue
+            last_seen = updated_at
+            self._sync()
+            try:
+                for listener in self._listeners:
+                    await listener(self)
+            except Exception as e:
+                print(f"Failed to process the shared price table update: {e!r}")
+
+    @staticmethod
+    def _format(value) -> str:
+        return f"{value:.8f}"
+
+
+class SharedServerClock:
+    """
+    A BinanceServerClock look-alike that reads the estimate the feeder publishes in a SharedPriceTable.
+
+    The estimate is relative to the monotonic clock, which is system wide,
+    so it holds in every process on the host. Until the feeder has synced,
+    the local clock is used.
+    """
+
+    def __init__(self, table) -> None:
+        self.table = table
+
+    @property
+    def synced(self) -> bool:
+        return self.table.read_clock() is not None
+
+    @property
+    def error_ns(self):
+        estimate = self.table.read_clock()
+        return estimate[3] if estimate is not None else None
+
+    def server_now_ns(self) -> int:
+        estimate = self.table.read_clock()
+        if estimate is None:
+            return time.time_ns()
+        offset, reference, drift, _ = estimate
+        now = time.monotonic_ns()
+        return now + offset + int((now - reference) * drift)
+
+    def server_now_ms(self) -> int:
+        return self.server_now_ns() // 1_000_000
+
+    async def sync(self) -> bool:
+        # The feeder syncs, there is nothing to request here
+        return self.synced
+
+    def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
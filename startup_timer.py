@@ -0,0 +1,38 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Measures the phases of the bot startup and logs how long each one took.
+
+    Phases run inline with phase(); mark() logs a milestone with the time
+    since the timer was created, e.g. when updates start being served.
+    """
+
+    def __init__(self, log=True) -> None:
+        """
+        Args:
+            log (bool, optional): Print every phase and milestone as it completes. Default: True.
+        """
+        self.log = log
+        self.started_at = time.perf_counter()
+        self.phases = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.phases.append((name, seconds))
+            if self.log:
+                print(f"Startup: {name} took {seconds * 1e3:.0f} ms")
+
+    def mark(self, name) -> None:
+        if self.log:
+            print(f"Startup: {name} after {self.elapsed() * 1e3:.0f} ms")
@@ -0,0 +1,280 @@
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from binance_kline_downloader import INTERVAL_MILLISECONDS
+
+
+def ema(values, alpha, initial=None) -> np.ndarray:
+    """
+    Exponential moving average y[i] = alpha * x[i] + (1 - alpha) * y[i - 1].
+
+    The recursion is evaluated in closed form over blocks of values with
+    cumsum, so the only Python loop is over blocks of several hundred rows.
+
+    Args:
+        values (array): Input series.
+        alpha (float): Smoothing factor in (0, 1].
+        initial (float, optional): Value of y[-1]. If omitted the series is seeded with x[0].
+
+    Returns:
+        np.ndarray: The averaged series, same length as values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if not len(values):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+
+    start = 0
+    previous = initial
+    if previous is None:
+        out[0] = previous = values[0]
+        start = 1
+    # decay ** -block must stay far below the float64 range
+    block = max(1, int(500 / -math.log(decay)))
+    for offset in range(start, len(values), block):
+        chunk = values[offset:offset + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        out[offset:offset + len(chunk)] = powers * (previous + alpha * np.cumsum(chunk / powers))
+        previous = out[offset + len(chunk) - 1]
+    return out
+
+
+def wilder(values, period, initial=None) -> np.ndarray:
+    """
+    Wilder's smoothing (an EMA with alpha = 1 / period) as used by RSI and ATR.
+
+    Without an initial value, the first period values are averaged to seed
+    the series and the leading period - 1 outputs are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if initial is not None:
+        return ema(values, 1.0 / period, initial)
+    out = np.full_like(values, np.nan)
+    if len(values) >= period:
+        out[period - 1] = values[:period].mean()
+        out[period:] = ema(values[period:], 1.0 / period, out[period - 1])
+    return out
+
+
+def sma(values, period) -> np.ndarray:
+    """
+    Simple moving average, NaN for the first period - 1 values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full_like(values, np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).mean(axis=1)
+    return out
+
+
+def bollinger_bands(values, period=20, num_std=2.0) -> tuple:
+    """
+    Bollinger bands around the simple moving average.
+
+    Returns:
+        tuple: (middle, upper, lower) arrays, NaN for the first period - 1 values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    middle = np.full_like(values, np.nan)
+    deviation = np.full_like(values, np.nan)
+    if len(values) >= period:
+        windows = sliding_window_view(values, period)
+        middle[period - 1:] = windows.mean(axis=1)
+        deviation[period - 1:] = windows.std(axis=1)
+    return middle, middle + num_std * deviation, middle - num_std * deviation
+
+
+def rsi(close, period=14) -> np.ndarray:
+    """
+    Relative strength index with Wilder's smoothing, NaN until it is seeded.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full_like(close, np.nan)
+    change = np.diff(close)
+    avg_gain = wilder(np.maximum(change, 0.0), period)
+    avg_loss = wilder(np.maximum(-change, 0.0), period)
+    out[1:] = _rsi_from_averages(avg_gain, avg_loss)
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9) -> tuple:
+    """
+    Moving average convergence/divergence.
+
+    Returns:
+        tuple: (macd line, signal line, histogram) arrays.
+    """
+    line = ema(close, 2.0 / (fast + 1)) - ema(close, 2.0 / (slow + 1))
+    signal_line = ema(line, 2.0 / (signal + 1))
+    return line, signal_line, line - signal_line
+
+
+def true_range(high, low, close, previous_close=None) -> np.ndarray:
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    previous = np.empty_like(close)
+    previous[1:] = close[:-1]
+    if len(close):
+        previous[0] = close[0] if previous_close is None else previous_close
+    return np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+
+
+def atr(high, low, close, period=14) -> np.ndarray:
+    """
+    Average true range with Wilder's smoothing, NaN until it is seeded.
+    """
+    return wilder(true_range(high, low, close), period)
+
+
+def vwap(high, low, close, volume) -> np.ndarray:
+    """
+    Cumulative volume weighted average of the typical price (high + low + close) / 3.
+    """
+    typical = (np.asarray(high, dtype=np.float64) + low + close) / 3.0
+    volume = np.asarray(volume, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.cumsum(typical * volume) / np.cumsum(volume)
+
+
+def _rsi_from_averages(avg_gain, avg_loss) -> np.ndarray:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(avg_loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+
+class _IndicatorState:
+    __slots__ = ('last_open_time', 'values', 'close_tail', 'previous_close', 'ema', 'ema_fast', 'ema_slow',
+                 'macd_signal', 'avg_gain', 'avg_loss', 'atr')
+
+    def __init__(self) -> None:
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.close_tail = np.empty(0)
+
+
+class IndicatorEngine:
+    """
+    Computes SMA, EMA, RSI, MACD, Bollinger bands, ATR and VWAP of kline series.
+
+    The first update of a (symbol, interval) processes the whole series with
+    the vectorized functions of this module. Afterwards only the candles newer
+    than the last processed one are computed, continuing from the stored
+    recursion state (EMAs, Wilder averages) and the tail of closes needed by
+    the windowed indicators.
+
+    The new candles must continue the processed ones: the last processed
+    candle has to be in the series, followed by candles at the same spacing.
+    After a gap or a rewritten store the state is dropped and the whole
+    series is processed again. VWAP is anchored to the series passed in,
+    it equals vwap() over the same candles whatever was processed before.
+
+    Only closed candles should be passed in, a candle is never processed twice.
+    """
+
+    def __init__(self, sma_period=20, ema_period=20, rsi_period=14, macd_fast=12, macd_slow=26,
+                 macd_signal=9, bollinger_period=20, bollinger_std=2.0, atr_period=14) -> None:
+        self.sma_period = sma_period
+        self.ema_period = ema_period
+        self.rsi_period = rsi_period
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.bollinger_period = bollinger_period
+        self.bollinger_std = bollinger_std
+        self.atr_period = atr_period
+        self._states = {}
+
+    def reset(self, symbol=None, interval=None) -> None:
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop((symbol, interval), None)
+
+    def update(self, symbol, interval, columns) -> dict:
+        """
+        Processes the candles that are newer than the last update and returns the latest values.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCUSDT').
+            interval (str): Kline interval (e.g., '1h').
+            columns (dict): Arrays 'open_time', 'high', 'low', 'close' and 'volume', e.g. from KlineStore.query.
+
+        Returns:
+            dict: Indicator name to its latest value (NaN while not enough candles are known),
+                or an empty dict if there are no candles at all.
+        """
+        key = (symbol, interval)
+        previous = self._states.get(key)
+        open_time = np.asarray(columns['open_time'])
+        first = 0
+        if previous is not None:
+            first = int(np.searchsorted(open_time, previous.last_open_time, side='right'))
+            if not self._continues(previous, open_time, first, INTERVAL_MILLISECONDS.get(interval)):
+                previous, first = None, 0
+        if first >= len(open_time):
+            return dict(previous.values) if previous is not None else {}
+
+        state = _IndicatorState() if previous is None else previous
+        values = self._compute(state, {name: np.asarray(columns[name][first:], dtype=np.float64)
+                                       for name in ('high', 'low', 'close', 'volume')})
+        values['vwap'] = float(vwap(columns['high'], columns['low'], columns['close'], columns['volume'])[-1])
+        state.last_open_time = int(open_time[-1])
+        state.values = values
+        # Wilder averages need rsi_period + 1 and atr_period candles before they carry state
+        if state.avg_gain is not None and state.atr is not None:
+            self._states[key] = state
+        else:
+            self._states.pop(key, None)
+        return dict(values)
+
+    @staticmethod
+    def _continues(state, open_time, first, interval_ms) -> bool:
+        # The last processed candle must be right before the new ones, and nothing may be missing in between
+        if first == 0 or int(open_time[first - 1]) != state.last_open_time:
+            return False
+        # Calendar months have no fixed length, only the overlap can be checked
+        return interval_ms is None or bool((np.diff(open_time[first - 1:]) == interval_ms).all())
+
+    def _compute(self, state, new) -> dict:
+        close = new['close']
+        values = {}
+
+        window = np.concatenate((state.close_tail, close))
+        values['sma'] = sma(window, self.sma_period)[-1]
+        middle, upper, lower = bollinger_bands(window, self.bollinger_period, self.bollinger_std)
+        values['bollinger_middle'], values['bollinger_upper'], values['bollinger_lower'] = middle[-1], upper[-1], lower[-1]
+        state.close_tail = window[-(max(self.sma_period, self.bollinger_period) - 1):].copy()
+
+        state.ema = ema(close, 2.0 / (self.ema_period + 1), state.ema)[-1]
+        values['ema'] = state.ema
+
+        fast = ema(close, 2.0 / (self.macd_fast + 1), state.ema_fast)
+        slow = ema(close, 2.0 / (self.macd_slow + 1), state.ema_slow)
+        signal = ema(fast - slow, 2.0 / (self.macd_signal + 1), state.macd_signal)
+        state.ema_fast, state.ema_slow, state.macd_signal = fast[-1], slow[-1], signal[-1]
+        values['macd'] = fast[-1] - slow[-1]
+        values['macd_signal'] = signal[-1]
+        values['macd_histogram'] = values['macd'] - signal[-1]
+
+        closes = close if state.previous_close is None else np.concatenate(([state.previous_close], close))
+        change = np.diff(closes)
+        avg_gain = wilder(np.maximum(change, 0.0), self.rsi_period, state.avg_gain)
+        avg_loss = wilder(np.maximum(-change, 0.0), self.rsi_period, state.avg_loss)
+        if len(change) and not np.isnan(avg_gain[-1]):
+            state.avg_gain, state.avg_loss = avg_gain[-1], avg_loss[-1]
+        values['rsi'] = _rsi_from_averages(state.avg_gain, state.avg_loss).item() if state.avg_gain is not None else np.nan
+
+        tr = true_range(new['high'], new['low'], close, state.previous_close)
+        average_true_range = wilder(tr, self.atr_period, state.atr)
+        if not np.isnan(average_true_range[-1]):
+            state.atr = average_true_range[-1]
+        values['atr'] = state.atr if state.atr is not None else np.nan
+
+        state.previous_close = close[-1]
+        return {name: float(value) for name, value in values.items()}
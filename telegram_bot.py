@@ -1,10 +1,30 @@
-from telegram_bot_manager import TelegramBotManager
+import argparse
 
-from binance_market_data_rest_client import BinanceMarketDataRestClient
 from key_manager import KeyManager
+from startup_timer import StartupTimer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Binance market data Telegram bot.')
+    parser.add_argument('--webhook-url', help='Public HTTPS URL of the webhook; long polling is used if omitted')
+    parser.add_argument('--listen', default='0.0.0.0', help='Address of the local webhook server')
+    parser.add_argument('--port', type=int, default=8443, help='Port of the local webhook server')
+    parser.add_argument('--url-path', default='telegram', help='Path of the webhook endpoint')
+    parser.add_argument('--webhook-secret', help='Secret token Telegram sends with every webhook request')
+    parser.add_argument('--workers', type=int, default=32, help='Number of updates processed concurrently')
+    parser.add_argument('--hedge', action='store_true', help='Send slow Binance requests to a second host as well')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this local port')
+    parser.add_argument('--shared-prices', metavar='NAME',
+                        help='Read prices from the shared memory table of market_data_feeder.py instead of polling')
+    parser.add_argument('--primary', action='store_true',
+                        help='With --shared-prices, the one worker that owns the price alerts and the market stream')
+    return parser.parse_args()
 
 
 def main():
+    timer = StartupTimer()
+    args = parse_args()
+
     key_manager = KeyManager()
     TELEGRAM_API_KEY = key_manager.get_telegram_api_key()
 
@@ -12,8 +32,27 @@ def main():
         print("Error: Unable to get Telegram API keys")
         exit(1)
 
+    # The heavy modules are imported after the arguments and keys are checked, so --help
+    # and configuration errors are instant, and the optional ones only when they are enabled
+    with timer.phase('imports'):
+        from telegram_bot_manager import TelegramBotManager
+
+        from binance_market_data_async_rest_client import BinanceMarketDataAsyncRestClient
+        from binance_exchange_info_cache import ExchangeInfoCache
+        from binance_market_data_cache import CachedBinanceMarketDataClient
+        from binance_market_data_stream_client import BinanceMarketDataStreamClient
+        from chart_renderer import ChartRenderer
+        from kline_store import KlineStore
+        from price_alert_engine import PriceAlertEngine
+        from server_clock import BinanceServerClock
+        from user_state_store import UserStateStore
+
     try:
-        binance_marked_data_rest_client = BinanceMarketDataRestClient()
+        # No connection is opened here, the HTTP session is created by the first request
+        binance_rest_client = BinanceMarketDataAsyncRestClient(pool_size=50, timeout=10.0, hedge=args.hedge)
+        binance_marked_data_rest_client = CachedBinanceMarketDataClient(binance_rest_client)
+        # Handlers prefer a slightly old answer over waiting for Binance, background consumers do not
+        interactive_client = binance_marked_data_rest_client.allow_stale()
     except ValueError as e:
         # Raised when there is an issue with the provided API keys
         print(f"Failed to initialize the Binance client due to invalid API keys: {e}")
@@ -27,12 +66,59 @@ def main():
         print(f"Failed to initialize the Binance client: {e}")
         exit(1)
 
-    bot_manager = TelegramBotManager(TELEGRAM_API_KEY, binance_marked_data_rest_client)
+    # Only one process may evaluate the alerts and write their file, and only one needs the stream
+    owner = not args.shared_prices or args.primary
+    market_stream = None
+    price_alerts = None
+    if owner:
+        # Order book snapshots must be newer than the buffered diff events, so they are never cached
+        market_stream = BinanceMarketDataStreamClient(binance_rest_client, symbols=['BTCUSDT'],
+                                                      kline_intervals=['1m'], depth_symbols=['BTCUSDT'])
+
+    if args.shared_prices:
+        from shared_price_table import SharedPriceTable, SharedServerClock, SharedTickerSnapshot
+
+        # Several bot processes share one feeder, which polls prices, syncs the server clock
+        # and downloads exchangeInfo, so Binance traffic does not grow with the workers
+        try:
+            table = SharedPriceTable.attach(args.shared_prices)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Failed to attach to the shared price table {args.shared_prices}: {e}")
+            exit(1)
+        ticker_snapshot = SharedTickerSnapshot(table)
+        server_clock = SharedServerClock(table)
+        exchange_info = ExchangeInfoCache(binance_marked_data_rest_client, download=False)
+    else:
+        from binance_ticker_snapshot import BinanceTickerSnapshot
+
+        # Polled past the cache, a cached list would be the previous cycle's prices
+        ticker_snapshot = BinanceTickerSnapshot(binance_rest_client, refresh_interval=2.0)
+        # Range ends and /server_time are computed locally from the estimated server clock
+        server_clock = BinanceServerClock(binance_rest_client)
+        # The exchange info cache file is loaded by the background warm-up once updates are served
+        exchange_info = ExchangeInfoCache(binance_marked_data_rest_client)
+
+    kline_store = KlineStore('klines', clock=server_clock)
+
+    if owner:
+        # Alerts must be loaded before the first /alert command, which saves the file
+        with timer.phase('alerts load'):
+            price_alerts = PriceAlertEngine('alerts.json')
+            price_alerts.load()
+
+    with timer.phase('bot application'):
+        bot_manager = TelegramBotManager(TELEGRAM_API_KEY, interactive_client, ticker_snapshot,
+                                         exchange_info, kline_store, price_alerts, market_stream, workers=args.workers,
+                                         admin_ids=key_manager.get_telegram_admin_ids(),
+                                         metrics_port=args.metrics_port, chart_renderer=ChartRenderer(max_workers=2),
+                                         user_state=UserStateStore('user_state.db'), startup_timer=timer,
+                                         server_clock=server_clock)
     if bot_manager.app is None:
         print("Error: Failed to initialize the Telegram bot manager")
         exit(1)
     
-    bot_manager.run()
+    bot_manager.run(webhook_url=args.webhook_url, listen=args.listen, port=args.port, url_path=args.url_path,
+                    secret_token=args.webhook_secret)
 
 
 if __name__ == '__main__':
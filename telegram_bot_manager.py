@@ -1,19 +1,262 @@
+import asyncio
+import time
 from datetime import datetime
+
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes, CallbackQueryHandler
 
-from binance_market_data_rest_client import BinanceMarketDataRestClient
+from binance_market_data_async_rest_client import BinanceMarketDataAsyncRestClient
+from binance_market_data_stream_client import BinanceMarketDataStreamClient
+from binance_exchange_info_cache import ExchangeInfoCache
+from binance_market_data_models import parse_klines
+from binance_kline_downloader import INTERVAL_MILLISECONDS
+from binance_rate_limiter import PRIORITY_INTERACTIVE
+from binance_ticker_snapshot import BinanceTickerSnapshot
+from chart_renderer import ChartRenderer
+from chat_ordered_update_processor import ChatOrderedUpdateProcessor
+from kline_store import KlineStore
+from metrics import REGISTRY, MetricsRegistry, MetricsServer
+from price_alert_engine import ABOVE, BELOW, PriceAlertEngine
+from server_clock import BinanceServerClock
+from startup_timer import StartupTimer
+from telegram_send_scheduler import TelegramSendScheduler
+from user_state_store import UserStateStore
 
 
 class TelegramBotManager:
-    def __init__(self, api_key: str, binance_client: BinanceMarketDataRestClient) -> None:
+    def __init__(self, api_key: str, binance_client: BinanceMarketDataAsyncRestClient,
+                 ticker_snapshot: BinanceTickerSnapshot = None, exchange_info: ExchangeInfoCache = None,
+                 kline_store: KlineStore = None, price_alerts: PriceAlertEngine = None,
+                 market_stream: BinanceMarketDataStreamClient = None, workers: int = 32, admin_ids: list = (),
+                 metrics: MetricsRegistry = REGISTRY, metrics_port: int = None,
+                 chart_renderer: ChartRenderer = None, user_state: UserStateStore = None,
+                 startup_timer: StartupTimer = None, server_clock: BinanceServerClock = None) -> None:
         try:
-            self.app = ApplicationBuilder().token(api_key).build()
+            self.app = (
+                ApplicationBuilder()
+                .token(api_key)
+                .concurrent_updates(ChatOrderedUpdateProcessor(workers))
+                .post_init(self._post_init)
+                .post_shutdown(self._post_shutdown)
+                .build()
+            )
+            self.sender = TelegramSendScheduler(self.app.bot)
             self.binance = binance_client
+            self.ticker_snapshot = ticker_snapshot
+            self.exchange_info = exchange_info
+            self.kline_store = kline_store
+            self._indicator_engine = None
+            self.price_alerts = price_alerts
+            self.market_stream = market_stream
+            self.chart_renderer = chart_renderer
+            self.server_clock = server_clock
+            self.admin_ids = set(admin_ids)
+            # Without a database the per-chat settings only live as long as the process
+            self.user_state = user_state if user_state is not None else UserStateStore(':memory:')
+            self._portfolio_valuator = None
+            self.metrics = metrics
+            self.startup_timer = startup_timer if startup_timer is not None else StartupTimer(log=False)
+            self._warm_up_task = None
+            self.metrics_server = MetricsServer(metrics, port=metrics_port) if metrics_port else None
+            if price_alerts is not None:
+                price_alerts.notify = self._send_price_alerts
+                if ticker_snapshot is not None:
+                    price_alerts.attach(ticker_snapshot)
+            self._register_metrics()
         except Exception as e:
             print(f"Failed to initialize the bot: {e}")
             self.app = None
 
+    @property
+    def indicator_engine(self):
+        # The numpy based features are loaded by the warm-up, or by their first command if that comes earlier
+        if self._indicator_engine is None:
+            from technical_indicators import IndicatorEngine
+            self._indicator_engine = IndicatorEngine()
+        return self._indicator_engine
+
+    @property
+    def portfolio_valuator(self):
+        if self._portfolio_valuator is None and self.exchange_info is not None and self.ticker_snapshot is not None:
+            from portfolio_valuation import PortfolioValuator
+            self._portfolio_valuator = PortfolioValuator(self.exchange_info, self.ticker_snapshot)
+        return self._portfolio_valuator
+
+    def _register_metrics(self) -> None:
+        # Gauges are computed when the metrics are read, so they cost nothing in between
+        metrics = self.metrics
+        metrics.gauge('bot_send_queue_depth', 'Outgoing Telegram messages waiting to be sent',
+                      callback=lambda: self.sender.queue_depth)
+        metrics.gauge('bot_messages_sent', 'Telegram messages sent', callback=lambda: self.sender.sent)
+        metrics.gauge('bot_messages_coalesced', 'Telegram messages merged into a queued one',
+                      callback=lambda: self.sender.coalesced)
+        if hasattr(self.binance, 'stats'):
+            for key in ('hit_ratio', 'hits', 'stale_hits', 'misses', 'coalesced', 'entries'):
+                metrics.gauge(f'cache_{key}', f'Response cache {key.replace("_", " ")}',
+                              callback=lambda key=key: self.binance.stats()[key])
+        if self.ticker_snapshot is not None:
+            metrics.gauge('ticker_snapshot_age_seconds', 'Seconds since the last ticker snapshot refresh',
+                          callback=lambda: time.monotonic() - self.ticker_snapshot.updated_at
+                          if self.ticker_snapshot.updated_at is not None else float('nan'))
+        if self.price_alerts is not None:
+            metrics.gauge('price_alerts', 'Active price alerts', callback=lambda: len(self.price_alerts))
+        if self.server_clock is not None:
+            metrics.gauge('server_clock_offset_seconds', 'Binance server time minus the local time',
+                          callback=lambda: (self.server_clock.server_now_ns() - time.time_ns()) / 1e9
+                          if self.server_clock.synced else float('nan'))
+            metrics.gauge('server_clock_error_seconds', 'Uncertainty of the server clock estimate',
+                          callback=lambda: self.server_clock.error_ns / 1e9
+                          if self.server_clock.synced else float('nan'))
+        if self.market_stream is not None:
+            metrics.gauge('market_stream_connected', 'Whether the market data stream is connected',
+                          callback=lambda: self.market_stream.connected)
+            metrics.gauge('market_stream_messages', 'Market data stream frames received',
+                          callback=lambda: self.market_stream.messages_received)
+
+    def _instrument(self, name: str, handler):
+        latency = self.metrics.histogram('bot_handler_seconds', 'Handler latency', handler=name)
+        errors = self.metrics.counter('bot_handler_errors_total', 'Handler exceptions', handler=name)
+
+        async def instrumented(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+            started = time.perf_counter()
+            try:
+                await handler(update, context)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - started)
+
+        return instrumented
+
+    async def _post_init(self, application) -> None:
+        self.sender.start()
+        self.user_state.start()
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+        if self.market_stream is not None:
+            self.market_stream.start()
+        # The caches are filled in the background, handlers fall back to REST until they are
+        self._warm_up_task = asyncio.create_task(self._warm_up())
+        self.startup_timer.mark('serving updates')
+
+    @staticmethod
+    def _import_features() -> None:
+        import aiohttp  # noqa: F401
+        import numpy  # noqa: F401
+        import order_book_analytics  # noqa: F401
+        import portfolio_valuation  # noqa: F401
+        import technical_indicators  # noqa: F401
+
+    async def _warm_up(self) -> None:
+        timer = self.startup_timer
+        # Modules that are not needed to serve updates are loaded now, in a thread, instead of
+        # delaying the startup or the first command that uses them
+        with timer.phase('feature imports'):
+            await asyncio.to_thread(self._import_features)
+        if self.server_clock is not None:
+            with timer.phase('server clock sync'):
+                try:
+                    await self.server_clock.sync()
+                except Exception as e:
+                    print(f"Failed to sync the server clock: {e!r}")
+            self.server_clock.start()
+        if self.exchange_info is not None:
+            with timer.phase('exchange info cache load'):
+                await asyncio.to_thread(self.exchange_info.load)
+            self.exchange_info.start()
+        if self.ticker_snapshot is not None:
+            with timer.phase('price snapshot warm-up'):
+                try:
+                    await self.ticker_snapshot.refresh()
+                except Exception as e:
+                    print(f"Failed to warm up the ticker snapshot: {e!r}")
+            self.ticker_snapshot.start()
+        timer.mark('caches warm')
+
+    async def _post_shutdown(self, application) -> None:
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+        if self.market_stream is not None:
+            await self.market_stream.stop()
+        if self.ticker_snapshot is not None:
+            await self.ticker_snapshot.stop()
+        if self.exchange_info is not None:
+            await self.exchange_info.stop()
+        if self.server_clock is not None:
+            await self.server_clock.stop()
+        if self.price_alerts is not None:
+            await self.price_alerts.flush()
+        if self.chart_renderer is not None:
+            self.chart_renderer.close()
+        await self.user_state.stop()
+        await self.sender.stop()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await self.binance.close()
+
+    def _from_snapshot(self, method: str, symbol: str):
+        # Per-symbol lookups are answered from the live stream, then from the bulk snapshot while it is fresh
+        for source in (self.market_stream, self.ticker_snapshot):
+            if source is not None:
+                result = getattr(source, method)(symbol)
+                if result is not None:
+                    return result
+        return None
+
+    @staticmethod
+    def _require(result, what: str):
+        # The client returns None when no Binance host answered, which the handlers report as an error
+        if result is None:
+            raise ConnectionError(f'Binance did not return the {what}, please try again later')
+        return result
+
+    async def _current_price(self, symbol: str):
+        price = None
+        for source in (self.market_stream, self.ticker_snapshot):
+            if price is None and source is not None:
+                price = source.price(symbol)
+        if price is None:
+            ticker_price = await self.binance.get_ticker_price(symbol)
+            price = float(ticker_price['price']) if ticker_price else None
+        return price
+
+    async def _send_price_alerts(self, triggered: list) -> None:
+        # Queued lines of one chat are merged into a single message by the scheduler
+        for alert, price in triggered:
+            self.sender.send_alert(alert.chat_id,
+                                   f"🔔 {alert.symbol} is {alert.direction} {alert.threshold:g} (now {price:g})")
+
+    async def _reply(self, update: Update, text: str, **kwargs):
+        return await self.sender.send_message(update.effective_chat.id, text, **kwargs)
+
+    async def _edit(self, message, text: str, **kwargs):
+        return await self.sender.edit_message_text(message.chat_id, message.message_id, text, **kwargs)
+
+    def _server_now_ms(self) -> int:
+        # Range ends come from the synced server clock, the local clock may be off by seconds
+        if self.server_clock is not None:
+            return self.server_clock.server_now_ms()
+        return int(time.time() * 1000)
+
+    async def _default_symbol(self, update: Update) -> str:
+        return await self.user_state.get_value(update.effective_chat.id, 'symbol', 'BTCUSDT')
+
+    async def _closed_klines(self, symbol: str, interval: str, limit: int) -> dict:
+        import numpy as np
+
+        # Kline columns of the most recent closed candles, from the local store when there is one
+        if self.kline_store is not None:
+            await self.kline_store.sync(self.binance, symbol, interval, priority=PRIORITY_INTERACTIVE)
+            columns = self.kline_store.query(symbol, interval, limit=limit + 1)
+        else:
+            klines = await self.binance.get_klines(symbol, interval, limit=limit + 1)
+            if klines is None:
+                raise ConnectionError('Binance did not return the klines')
+            columns = parse_klines(klines).as_dict()
+        closed = int(np.searchsorted(columns['close_time'], self._server_now_ms(), side='left'))
+        return {name: column[:closed] for name, column in columns.items()}
+
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         keyboard = [
             [InlineKeyboardButton("📖 Help", callback_data='help')],
@@ -23,9 +266,9 @@ class TelegramBotManager:
         reply_markup = InlineKeyboardMarkup(keyboard)
 
         if update.message:
-            await update.message.reply_text('📌 *Please choose an option:*', reply_markup=reply_markup)
+            await self._reply(update, '📌 *Please choose an option:*', reply_markup=reply_markup)
         elif update.callback_query:
-            await update.callback_query.message.edit_text('📌 *Please choose an option:*', reply_markup=reply_markup)
+            await self._edit(update.callback_query.message, '📌 *Please choose an option:*', reply_markup=reply_markup)
 
     async def market_data_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         keyboard = [
@@ -40,7 +283,7 @@ class TelegramBotManager:
         ]
 
         reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.callback_query.message.edit_text("📊 Market Data:", reply_markup=reply_markup)
+        await self._edit(update.callback_query.message, "📊 Market Data:", reply_markup=reply_markup)
 
     async def button(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         query = update.callback_query
@@ -94,52 +337,72 @@ class TelegramBotManager:
             "/aggregate_trades_btc - Get the aggregate trades for Bitcoin (BTC)\n"
             "/klines_btc - Get the klines for Bitcoin (BTC)\n"
             "/order_book_btc - Get the order book for Bitcoin (BTC)\n"
+            "/symbol [SYMBOL] - Show or set my default symbol for /indicators, /chart and /depth\n"
+            "/indicators SYMBOL INTERVAL - Get SMA, EMA, RSI, MACD, Bollinger bands, ATR and VWAP\n"
+            "/chart SYMBOL INTERVAL - Get a candlestick chart, e.g. /chart ETHUSDT 4h\n"
+            "/depth SYMBOL [notional] - Get spread, depth, imbalance and slippage of the order book\n"
+            "/alert SYMBOL [above|below] PRICE - Notify me when the price crosses a level\n"
+            "/alerts - List my price alerts\n"
+            "/alert_delete ID - Delete a price alert\n"
+            "/watchlist [SYMBOL ...] - Show or set my watchlist with 24h prices and volumes\n"
+            "/portfolio [ASSET=QTY ...] [in QUOTE] - Value my portfolio, e.g. /portfolio BTC=0.5 ETH=2 in EUR\n"
+            "/stats - Show bot and Binance API statistics (administrators only)\n"
         )
 
         keyboard = [[InlineKeyboardButton("🔙 Back to main menu", callback_data='main_menu')]]
         reply_markup = InlineKeyboardMarkup(keyboard)
 
         if update.callback_query:
-            await update.callback_query.message.edit_text(help_message, reply_markup=reply_markup)
+            await self._edit(update.callback_query.message, help_message, reply_markup=reply_markup)
         else:
-            await update.message.reply_text(help_message, reply_markup=reply_markup)
+            await self._reply(update, help_message, reply_markup=reply_markup)
 
     async def server_time(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         try:
-            server_time = self.binance.get_server_time().get('serverTime') / 1000.0
+            if self.server_clock is not None and self.server_clock.synced:
+                server_time = self.server_clock.server_now_ns() / 1e9
+            else:
+                server_time = self._require(await self.binance.get_server_time(), 'server time').get('serverTime') / 1000.0
             date_time = datetime.fromtimestamp(server_time).strftime('%Y-%m-%d %H:%M:%S')
 
             keyboard = [[InlineKeyboardButton("🔙 Back to main menu", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
             
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The current server time is {date_time}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The current server time is {date_time}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The current server time is {date_time}', reply_markup=reply_markup)
+                await self._reply(update, f'The current server time is {date_time}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the server time: {e}')
+            await self._reply(update, f'Failed to get the server time: {e}')
 
     async def get_exchange_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         try:
-            exchange_info = self.binance.get_exchange_info()
-            time_zone = exchange_info.get('timezone')
-            server_time = exchange_info.get('serverTime') / 1000.0
+            if self.exchange_info is not None:
+                if not len(self.exchange_info):
+                    await self.exchange_info.refresh()
+                time_zone = self.exchange_info.timezone
+                server_time = self._require(self.exchange_info.server_time, 'exchange info') / 1000.0
+            else:
+                exchange_info = self._require(await self.binance.get_exchange_info(), 'exchange info')
+                time_zone = exchange_info.get('timezone')
+                server_time = exchange_info.get('serverTime') / 1000.0
             date_time = datetime.fromtimestamp(server_time).strftime('%Y-%m-%d %H:%M:%S')
 
-            keyboard = [[InlineKeyboardButton("🔙 Back to Market data menu", callback_data='marked_data_menu')]]
+            keyboard = [[InlineKeyboardButton("🔙 Back to Market data menu", callback_data='market_data_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The exchange data to date {date_time}({time_zone}) received', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The exchange data to date {date_time}({time_zone}) received', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The exchange data to date {date_time}({time_zone}) received', reply_markup=reply_markup)
+                await self._reply(update, f'The exchange data to date {date_time}({time_zone}) received', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the exchange info: {e}')
+            await self._reply(update, f'Failed to get the exchange info: {e}')
 
     async def price_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            price_struct = self.binance.get_coin_price(symbol)
+            price_struct = self._require(
+                self._from_snapshot('get_coin_price', symbol) or await self.binance.get_coin_price(symbol), 'price')
             symbol = price_struct.get('symbol')
             price = price_struct.get('price')
 
@@ -147,16 +410,16 @@ class TelegramBotManager:
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'{symbol} = {price}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'{symbol} = {price}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'{symbol} = {price}')
+                await self._reply(update, f'{symbol} = {price}')
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the price for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the price for {symbol}: {e}')
 
     async def get_avg_price_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            avg_price_struct = self.binance.get_avg_price(symbol)
+            avg_price_struct = self._require(await self.binance.get_avg_price(symbol), 'average price')
             symbol = avg_price_struct.get('symbol')
             avg_price = avg_price_struct.get('price')
 
@@ -164,150 +427,484 @@ class TelegramBotManager:
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The average price for {symbol} = {avg_price}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The average price for {symbol} = {avg_price}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The average price for {symbol} = {avg_price}', reply_markup=reply_markup)
+                await self._reply(update, f'The average price for {symbol} = {avg_price}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the average price for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the average price for {symbol}: {e}')
 
     async def get_book_ticker_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            book_ticker = self.binance.get_book_ticker(symbol)
+            book_ticker = self._require(
+                self._from_snapshot('get_book_ticker', symbol) or await self.binance.get_book_ticker(symbol), 'book ticker')
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The order book for {symbol} is {book_ticker}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The order book for {symbol} is {book_ticker}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The order book for {symbol} is {book_ticker}', reply_markup=reply_markup)
+                await self._reply(update, f'The order book for {symbol} is {book_ticker}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the order book for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the order book for {symbol}: {e}')
 
     async def get_ticker_price_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            ticker_price = self.binance.get_ticker_price(symbol)
+            ticker_price = self._require(
+                self._from_snapshot('get_ticker_price', symbol) or await self.binance.get_ticker_price(symbol),
+                'ticker price')
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The ticker price for {symbol} is {ticker_price}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The ticker price for {symbol} is {ticker_price}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The ticker price for {symbol} is {ticker_price}', reply_markup=reply_markup)
+                await self._reply(update, f'The ticker price for {symbol} is {ticker_price}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the ticker price for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the ticker price for {symbol}: {e}')
 
     async def get_ticker_24hr_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            ticker_24hr = self.binance.get_ticker_24hr(symbol)
+            ticker_24hr = self._require(await self.binance.get_ticker_24hr(symbol), '24hr ticker')
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The 24hr ticker for {symbol} is {ticker_24hr}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The 24hr ticker for {symbol} is {ticker_24hr}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The 24hr ticker for {symbol} is {ticker_24hr}', reply_markup=reply_markup)
+                await self._reply(update, f'The 24hr ticker for {symbol} is {ticker_24hr}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the 24hr ticker for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the 24hr ticker for {symbol}: {e}')
 
     async def get_recent_trades_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            recent_trades = self.binance.get_recent_trades(symbol)
+            recent_trades = self._require(await self.binance.get_recent_trades(symbol), 'recent trades')
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The recent trades counter of items for {symbol} are {len(recent_trades)}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The recent trades counter of items for {symbol} are {len(recent_trades)}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The downloaded recent trades counter of items for {symbol} are {len(recent_trades)}', reply_markup=reply_markup)
+                await self._reply(update, f'The downloaded recent trades counter of items for {symbol} are {len(recent_trades)}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the recent trades for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the recent trades for {symbol}: {e}')
 
     async def get_historical_trades_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            historical_trades = self.binance.get_historical_trades(symbol)
+            historical_trades = self._require(await self.binance.get_historical_trades(symbol), 'historical trades')
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The historical trades counter of items for {symbol} are {len(historical_trades)}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The historical trades counter of items for {symbol} are {len(historical_trades)}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The downloaded historical trades counter of items for {symbol} are {len(historical_trades)}', reply_markup=reply_markup)
+                await self._reply(update, f'The downloaded historical trades counter of items for {symbol} are {len(historical_trades)}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the historical trades for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the historical trades for {symbol}: {e}')
 
     async def get_aggregate_trades_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            aggregate_trades = self.binance.get_aggregate_trades(symbol)
+            aggregate_trades = self._require(await self.binance.get_aggregate_trades(symbol), 'aggregate trades')
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The aggregate trades counter of items for {symbol} are {len(aggregate_trades)}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The aggregate trades counter of items for {symbol} are {len(aggregate_trades)}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The downloaded aggregate trades counter of items for {symbol} are {len(aggregate_trades)}', reply_markup=reply_markup)
+                await self._reply(update, f'The downloaded aggregate trades counter of items for {symbol} are {len(aggregate_trades)}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the aggregate trades for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the aggregate trades for {symbol}: {e}')
 
     async def get_klines_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         interval = '1m'
         try:
-            klines = self.binance.get_klines(symbol, interval)
+            if self.kline_store is not None:
+                await self.kline_store.sync(self.binance, symbol, interval, priority=PRIORITY_INTERACTIVE)
+                klines = self.kline_store.query(symbol, interval, limit=500)['open_time']
+            else:
+                klines = self._require(await self.binance.get_klines(symbol, interval), 'klines')
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The klines counter of items for {symbol} are {len(klines)}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The klines counter of items for {symbol} are {len(klines)}', reply_markup=reply_markup)
             else:
-                await update.message.reply_text(f'The downloaded klines counter of items for {symbol} are {len(klines)}', reply_markup=reply_markup)
+                await self._reply(update, f'The downloaded klines counter of items for {symbol} are {len(klines)}', reply_markup=reply_markup)
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the klines for {symbol}: {e}')
+            await self._reply(update, f'Failed to get the klines for {symbol}: {e}')
 
     async def get_order_book_btc(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         symbol = 'BTCUSDT'
         try:
-            order_book = self.binance.get_order_book(symbol)
+            order_book = self._require(await self.binance.get_order_book(symbol), 'order book')
             bids_price = order_book.get('bids')[0][0]
 
             keyboard = [[InlineKeyboardButton("🔙 Back", callback_data='main_menu')]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if update.callback_query:
-                await update.callback_query.message.edit_text(f'The order book for {symbol} is {bids_price}', reply_markup=reply_markup)
+                await self._edit(update.callback_query.message, f'The order book for {symbol} is {bids_price}', reply_markup=reply_markup)
+            else:
+                await self._reply(update, f'The order book for {symbol} is {bids_price}', reply_markup=reply_markup)
+        except Exception as e:
+            await self._reply(update, f'Failed to get the order book for {symbol}: {e}')
+
+    async def indicators(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        symbol = args[0].upper() if args else await self._default_symbol(update)
+        interval = args[1] if len(args) > 1 else '1h'
+        try:
+            if interval not in INTERVAL_MILLISECONDS and interval != '1M':
+                await self._reply(update, f'Unknown interval {interval}, use e.g. 1m, 15m, 1h, 4h, 1d')
+                return
+            if self.exchange_info is not None and len(self.exchange_info) and not self.exchange_info.is_valid_symbol(symbol):
+                await self._reply(update, f'Unknown symbol {symbol}')
+                return
+
+            columns = await self._closed_klines(symbol, interval, 1000)
+            values = self.indicator_engine.update(symbol, interval, columns)
+            if not values:
+                await self._reply(update, f'No klines available for {symbol} {interval}')
+                return
+
+            message = (
+                f"{symbol} {interval} indicators:\n"
+                f"SMA(20): {values['sma']:.8g}\n"
+                f"EMA(20): {values['ema']:.8g}\n"
+                f"RSI(14): {values['rsi']:.2f}\n"
+                f"MACD(12,26,9): {values['macd']:.6g} signal {values['macd_signal']:.6g} hist {values['macd_histogram']:.6g}\n"
+                f"Bollinger(20,2): {values['bollinger_lower']:.8g} / {values['bollinger_middle']:.8g} / {values['bollinger_upper']:.8g}\n"
+                f"ATR(14): {values['atr']:.6g}\n"
+                f"VWAP({len(columns['open_time'])}): {values['vwap']:.8g}"
+            )
+            await self._reply(update, message)
+        except Exception as e:
+            await self._reply(update, f'Failed to get the indicators for {symbol}: {e}')
+
+    async def chart(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        symbol = args[0].upper() if args else await self._default_symbol(update)
+        interval = args[1] if len(args) > 1 else '1h'
+        if self.chart_renderer is None:
+            await self._reply(update, 'Charts are not enabled')
+            return
+        try:
+            if interval not in INTERVAL_MILLISECONDS and interval != '1M':
+                await self._reply(update, f'Unknown interval {interval}, use e.g. 1m, 15m, 1h, 4h, 1d')
+                return
+            if self.exchange_info is not None and len(self.exchange_info) and not self.exchange_info.is_valid_symbol(symbol):
+                await self._reply(update, f'Unknown symbol {symbol}')
+                return
+
+            columns = await self._closed_klines(symbol, interval, 120)
+            chart = await self.chart_renderer.render(symbol, interval, columns)
+            caption = f"{symbol} {interval}, last close {float(columns['close'][-1]):.8g}"
+            chat_id = update.effective_chat.id
+            await self.chart_renderer.send(chart, lambda photo: self.sender.send_photo(chat_id, photo, caption=caption))
+        except Exception as e:
+            await self._reply(update, f'Failed to get the chart for {symbol}: {e}')
+
+    async def depth(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        from order_book_analytics import BUY, SELL, depth_within, fill_price, imbalance, parse_order_book, slippage, spread
+
+        args = context.args or []
+        symbol = args[0].upper() if args else await self._default_symbol(update)
+        try:
+            notional = float(args[1]) if len(args) > 1 else 10000.0
+            # Also rejects nan and inf, which float() accepts
+            if not 0 < notional < float('inf'):
+                raise ValueError(notional)
+        except ValueError:
+            await self._reply(update, f'Invalid notional {args[1]}')
+            return
+        try:
+            local_book = self.market_stream.get_order_book(symbol) if self.market_stream is not None else None
+            if local_book is not None:
+                bids, asks = local_book.top(1000)
+                order_book = {'lastUpdateId': local_book.last_update_id, 'bids': bids, 'asks': asks}
             else:
-                await update.message.reply_text(f'The order book for {symbol} is {bids_price}', reply_markup=reply_markup)
+                order_book = await self.binance.get_order_book(symbol, limit=1000)
+            if not order_book:
+                await self._reply(update, f'Failed to get the order book for {symbol}')
+                return
+            book = parse_order_book(order_book)
+
+            spread_abs, spread_bps = spread(book)
+            lines = [
+                f"{symbol} order book ({len(book.bid_prices)} bids / {len(book.ask_prices)} asks):",
+                f"Best bid {book.best_bid:.8g}, best ask {book.best_ask:.8g}",
+                f"Spread {spread_abs:.8g} ({spread_bps:.2f} bps)",
+            ]
+            for percent in (0.1, 1.0):
+                bid_notional, ask_notional = depth_within(book, percent)
+                lines.append(f"Depth ±{percent:g}%: bids {bid_notional:,.0f}, asks {ask_notional:,.0f}, "
+                             f"imbalance {imbalance(book, percent):+.2f}")
+            for side in (BUY, SELL):
+                average, filled, levels = fill_price(book, side, notional)
+                partial = '' if filled >= notional else f' (only {filled:,.0f} available)'
+                lines.append(f"{side.capitalize()} {notional:,.0f}: avg {average:.8g} over {levels} levels, "
+                             f"slippage {slippage(book, side, notional):.2f} bps{partial}")
+            await self._reply(update, '\n'.join(lines))
+        except Exception as e:
+            await self._reply(update, f'Failed to get the depth for {symbol}: {e}')
+
+    async def alert(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        if self.price_alerts is None:
+            await self._reply(update, 'Price alerts are not enabled')
+            return
+        if len(args) not in (2, 3) or (len(args) == 3 and args[1].lower() not in (ABOVE, BELOW)):
+            await self._reply(update, 'Usage: /alert SYMBOL [above|below] PRICE')
+            return
+
+        symbol = args[0].upper()
+        try:
+            threshold = float(args[-1])
+        except ValueError:
+            await self._reply(update, f'Invalid price {args[-1]}')
+            return
+        try:
+            if self.exchange_info is not None and len(self.exchange_info) and not self.exchange_info.is_valid_symbol(symbol):
+                await self._reply(update, f'Unknown symbol {symbol}')
+                return
+            price = await self._current_price(symbol)
+            if price is None:
+                await self._reply(update, f'Failed to get the price for {symbol}')
+                return
+
+            direction = args[1].lower() if len(args) == 3 else (ABOVE if threshold > price else BELOW)
+            if (direction == ABOVE and price >= threshold) or (direction == BELOW and price <= threshold):
+                await self._reply(update, f'{symbol} is already {direction} {threshold:g} (now {price:g})')
+                return
+
+            alert = self.price_alerts.add(update.effective_chat.id, symbol, direction, threshold)
+            await self.price_alerts.flush()
+            await self._reply(update, f'Alert #{alert.alert_id}: {symbol} {direction} {threshold:g} (now {price:g})')
         except Exception as e:
-            await update.message.reply_text(f'Failed to get the order book for {symbol}: {e}')
-
-    def run(self) -> None:
-        self.app.add_handler(CommandHandler("start", self.start))
-        self.app.add_handler(CallbackQueryHandler(self.button))
-
-        self.app.add_handler(CommandHandler("help", self.help))
-        self.app.add_handler(CommandHandler("server_time", self.server_time))
-        self.app.add_handler(CommandHandler("exchange_info", self.get_exchange_info))
-        self.app.add_handler(CommandHandler("price_btc", self.price_btc))
-        self.app.add_handler(CommandHandler("avg_price_btc", self.get_avg_price_btc))
-        self.app.add_handler(CommandHandler("book_ticker_btc", self.get_book_ticker_btc))
-        self.app.add_handler(CommandHandler("ticker_price_btc", self.get_ticker_price_btc))
-        self.app.add_handler(CommandHandler("ticker_24hr_btc", self.get_ticker_24hr_btc))
-        self.app.add_handler(CommandHandler("recent_trades_btc", self.get_recent_trades_btc))
-        self.app.add_handler(CommandHandler("historical_trades_btc", self.get_historical_trades_btc))
-        self.app.add_handler(CommandHandler("aggregate_trades_btc", self.get_aggregate_trades_btc))
-        self.app.add_handler(CommandHandler("klines_btc", self.get_klines_btc))
-        self.app.add_handler(CommandHandler("order_book_btc", self.get_order_book_btc))
-
-        self.app.run_polling()
+            await self._reply(update, f'Failed to set the alert for {symbol}: {e}')
+
+    async def alerts(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if self.price_alerts is None:
+            await self._reply(update, 'Price alerts are not enabled')
+            return
+        chat_alerts = self.price_alerts.alerts_for_chat(update.effective_chat.id)
+        if not chat_alerts:
+            await self._reply(update, 'You have no price alerts')
+            return
+        lines = [f'#{alert.alert_id} {alert.symbol} {alert.direction} {alert.threshold:g}' for alert in chat_alerts]
+        await self._reply(update, 'Your price alerts:\n' + '\n'.join(lines))
+
+    async def alert_delete(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        if self.price_alerts is None:
+            await self._reply(update, 'Price alerts are not enabled')
+            return
+        try:
+            alert_id = int(args[0].lstrip('#'))
+        except (IndexError, ValueError):
+            await self._reply(update, 'Usage: /alert_delete ID')
+            return
+        if self.price_alerts.remove(alert_id, update.effective_chat.id):
+            await self.price_alerts.flush()
+            await self._reply(update, f'Alert #{alert_id} deleted')
+        else:
+            await self._reply(update, f'Alert #{alert_id} not found')
+
+    async def symbol(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        chat_id = update.effective_chat.id
+        if not args:
+            await self._reply(update, f'Your default symbol is {await self._default_symbol(update)}')
+            return
+        symbol = args[0].upper()
+        if self.exchange_info is not None and len(self.exchange_info) and not self.exchange_info.is_valid_symbol(symbol):
+            await self._reply(update, f'Unknown symbol {symbol}')
+            return
+        await self.user_state.update(chat_id, symbol=symbol)
+        await self._reply(update, f'Your default symbol is now {symbol}')
+
+    DEFAULT_WATCHLIST = ('BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT', 'XRPUSDT')
+
+    async def watchlist(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        chat_id = update.effective_chat.id
+        if args:
+            symbols = list(dict.fromkeys(arg.upper() for arg in args))
+            if self.exchange_info is not None and len(self.exchange_info):
+                unknown = [symbol for symbol in symbols if not self.exchange_info.is_valid_symbol(symbol)]
+                if unknown:
+                    await self._reply(update, f'Unknown symbols: {", ".join(unknown)}')
+                    return
+            await self.user_state.update(chat_id, watchlist=symbols)
+        symbols = await self.user_state.get_value(chat_id, 'watchlist', self.DEFAULT_WATCHLIST)
+
+        try:
+            # Served from the shared price table when there is one, else one MINI request for the whole list
+            lookup = getattr(self.ticker_snapshot, 'get_ticker_24hr', None)
+            tickers = [lookup(symbol) for symbol in symbols] if lookup is not None else [None]
+            if None in tickers:
+                tickers = self._require(await self.binance.get_ticker_24hr(symbols=symbols, type='MINI'), 'watchlist')
+            by_symbol = {ticker['symbol']: ticker for ticker in tickers}
+            lines = ['👀 Watchlist (24h):']
+            for symbol in symbols:
+                ticker = by_symbol.get(symbol)
+                if ticker is None:
+                    lines.append(f"{symbol}: no data")
+                    continue
+                last_price, open_price = float(ticker['lastPrice']), float(ticker['openPrice'])
+                change = (last_price / open_price - 1) * 100 if open_price else 0.0
+                lines.append(f"{symbol}: {last_price:.8g} ({change:+.2f}%), "
+                             f"low {float(ticker['lowPrice']):.8g}, high {float(ticker['highPrice']):.8g}, "
+                             f"volume {float(ticker['quoteVolume']):,.0f}")
+            await self._reply(update, '\n'.join(lines))
+        except Exception as e:
+            await self._reply(update, f'Failed to get the watchlist: {e}')
+
+    async def portfolio(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        chat_id = update.effective_chat.id
+        if self.portfolio_valuator is None:
+            await self._reply(update, 'Portfolio valuation is not enabled')
+            return
+
+        quote = 'USDT'
+        if len(args) >= 2 and args[-2].lower() == 'in':
+            quote = args[-1].upper()
+            args = args[:-2]
+        if args:
+            holdings = {}
+            for arg in args:
+                asset, _, quantity = arg.partition('=')
+                try:
+                    holdings[asset.upper()] = holdings.get(asset.upper(), 0.0) + float(quantity)
+                except ValueError:
+                    await self._reply(update, 'Usage: /portfolio ASSET=QTY [ASSET=QTY ...] [in QUOTE]')
+                    return
+            await self.user_state.update(chat_id, portfolio=holdings)
+        holdings = await self.user_state.get_value(chat_id, 'portfolio')
+        if not holdings:
+            await self._reply(update, 'Usage: /portfolio ASSET=QTY [ASSET=QTY ...] [in QUOTE]')
+            return
+
+        try:
+            if not len(self.exchange_info):
+                await self.exchange_info.refresh()
+            if not self.ticker_snapshot.is_fresh() and not await self.ticker_snapshot.refresh():
+                raise ConnectionError('Binance did not return the prices, please try again later')
+            if quote not in self.portfolio_valuator:
+                await self._reply(update, f'Unknown quote asset {quote}')
+                return
+
+            valuation = self.portfolio_valuator.value(holdings, quote)
+            lines = [f"💼 Portfolio: {valuation.total:,.8g} {quote}"]
+            for holding in valuation.holdings:
+                share = holding.value / valuation.total if valuation.total else 0.0
+                lines.append(f"{holding.asset}: {holding.quantity:.8g} × {holding.price:.8g} = "
+                             f"{holding.value:,.8g} {quote} ({share:.1%})")
+            if valuation.unpriced:
+                lines.append(f"No price for {', '.join(valuation.unpriced)}")
+            await self._reply(update, '\n'.join(lines))
+        except Exception as e:
+            await self._reply(update, f'Failed to value the portfolio: {e}')
+
+    async def stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        if update.effective_user is None or update.effective_user.id not in self.admin_ids:
+            await self._reply(update, 'This command is only available to the bot administrators')
+            return
+
+        metrics = self.metrics
+        uptime = int(time.time() - metrics.started_at)
+        lines = [f"Uptime {uptime // 3600}h {uptime % 3600 // 60}m {uptime % 60}s", "", "Binance requests:"]
+
+        totals = {}
+        for labels, counter in metrics.collect('binance_requests_total'):
+            endpoint_totals = totals.setdefault(labels['endpoint'], [0, 0])
+            endpoint_totals[0] += counter.value
+            if labels['status'] != 200:
+                endpoint_totals[1] += counter.value
+        for labels, histogram in sorted(metrics.collect('binance_request_seconds'), key=lambda item: -item[1].count):
+            count, errors = totals.get(labels['endpoint'], (0, 0))
+            lines.append(f"{labels['endpoint']}: {int(count)} calls, {int(errors)} errors, "
+                         f"p50 {histogram.quantile(0.5) * 1e3:.0f} ms, p99 {histogram.quantile(0.99) * 1e3:.0f} ms")
+        weight = sum(counter.value for _, counter in metrics.collect('binance_request_weight_total'))
+        limiter = self.binance.rate_limiter
+        lines.append(f"Weight used {limiter.used_weight}/{limiter.budget} this window, {int(weight)} in total, "
+                     f"{limiter.queue_depth} queued")
+        if hasattr(self.binance, 'stats'):
+            cache_stats = self.binance.stats()
+            lines.append(f"Cache hit ratio {cache_stats['hit_ratio']:.1%} ({cache_stats['entries']} entries, "
+                         f"{cache_stats['coalesced']} coalesced)")
+
+        lines += ["", "Handlers:"]
+        handler_errors = {labels['handler']: counter.value
+                          for labels, counter in metrics.collect('bot_handler_errors_total')}
+        for labels, histogram in sorted(metrics.collect('bot_handler_seconds'), key=lambda item: -item[1].count):
+            if histogram.count:
+                lines.append(f"{labels['handler']}: {histogram.count} updates, "
+                             f"{int(handler_errors.get(labels['handler'], 0))} errors, "
+                             f"p50 {histogram.quantile(0.5) * 1e3:.0f} ms, p99 {histogram.quantile(0.99) * 1e3:.0f} ms")
+        lines.append(f"Send queue {self.sender.queue_depth}, {self.sender.sent} sent, "
+                     f"{self.sender.coalesced} coalesced, {self.sender.retried} retried")
+        await self._reply(update, '\n'.join(lines))
+
+    def run(self, webhook_url: str = None, listen: str = '0.0.0.0', port: int = 8443, url_path: str = 'telegram',
+            secret_token: str = None) -> None:
+        """
+        Registers the handlers and serves updates until the process is stopped.
+
+        Args:
+            webhook_url (str, optional): Public URL Telegram posts updates to. If not set, long polling is used.
+            listen (str, optional): Address the local webhook server binds to. Default: 0.0.0.0.
+            port (int, optional): Port of the local webhook server. Default: 8443.
+            url_path (str, optional): Path of the webhook endpoint on the local server. Default: telegram.
+            secret_token (str, optional): Secret Telegram sends in every webhook request, checked by the server.
+        """
+        commands = (
+            ("start", self.start),
+            ("help", self.help),
+            ("server_time", self.server_time),
+            ("exchange_info", self.get_exchange_info),
+            ("price_btc", self.price_btc),
+            ("avg_price_btc", self.get_avg_price_btc),
+            ("book_ticker_btc", self.get_book_ticker_btc),
+            ("ticker_price_btc", self.get_ticker_price_btc),
+            ("ticker_24hr_btc", self.get_ticker_24hr_btc),
+            ("recent_trades_btc", self.get_recent_trades_btc),
+            ("historical_trades_btc", self.get_historical_trades_btc),
+            ("aggregate_trades_btc", self.get_aggregate_trades_btc),
+            ("klines_btc", self.get_klines_btc),
+            ("order_book_btc", self.get_order_book_btc),
+            ("indicators", self.indicators),
+            ("chart", self.chart),
+            ("depth", self.depth),
+            ("alert", self.alert),
+            ("alerts", self.alerts),
+            ("alert_delete", self.alert_delete),
+            ("symbol", self.symbol),
+            ("watchlist", self.watchlist),
+            ("portfolio", self.portfolio),
+            ("stats", self.stats),
+        )
+        with self.startup_timer.phase('handlers'):
+            self.app.add_handlers([CommandHandler(command, self._instrument(command, callback))
+                                   for command, callback in commands]
+                                  + [CallbackQueryHandler(self._instrument("button", self.button))])
+
+        if webhook_url:
+            self.app.run_webhook(listen=listen, port=port, url_path=url_path, webhook_url=webhook_url,
+                                 secret_token=secret_token)
+        else:
+            self.app.run_polling()
@@ -0,0 +1,391 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from datetime import timedelta
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+
+SEND = 'send'
+EDIT = 'edit'
+ALERT = 'alert'
+PHOTO = 'photo'
+
+# Telegram rejects longer message texts
+MAX_MESSAGE_LENGTH = 4096
+
+
+class _TokenBucket:
+    """
+    A token bucket refilled continuously at rate tokens per second.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'blocked_until')
+
+    def __init__(self, rate, capacity) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now) -> float:
+        """
+        Returns the seconds until a token is available.
+        """
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self, now) -> None:
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def block(self, seconds) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def is_full(self, now) -> bool:
+        return self.delay(now) == 0.0 and self.tokens >= self.capacity
+
+
+class _Job:
+    # text holds the photo (bytes or a Telegram file_id) of a PHOTO job
+    __slots__ = ('kind', 'chat_id', 'message_id', 'text', 'kwargs', 'futures', 'attempts')
+
+    def __init__(self, kind, chat_id, text, message_id=None, kwargs=None) -> None:
+        self.kind = kind
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = text
+        self.kwargs = kwargs or {}
+        self.futures = []
+        self.attempts = 0
+
+
+class TelegramSendScheduler:
+    """
+    Queues outgoing Telegram messages and sends them within the bot API limits.
+
+    Every message takes a token from a global bucket (about 30 messages per
+    second for the whole bot) and from the bucket of its chat (about one per
+    second), so bursts are smoothed instead of being answered with RetryAfter.
+    Messages of one chat are sent in the order they were queued: a chat has at
+    most one message in flight, the next one is only sent once it completed.
+
+    While a message waits in the queue:
+        - a newer edit of the same message replaces the queued one, so only the
+          latest text is sent;
+        - alert lines for the same chat are appended to one pending alert
+          message instead of producing one message each.
+
+    A RetryAfter answer puts the message back at the head of its chat queue
+    and pauses that chat for the requested time. Network errors are retried
+    with exponential backoff, except timeouts of new messages: Telegram may
+    have delivered them already and offers no way to deduplicate a second
+    attempt, so they fail instead of being posted twice. Edits are idempotent
+    and are retried.
+    """
+
+    def __init__(self, bot, global_rate=30.0, global_burst=30, chat_rate=1.0, chat_burst=3, max_retries=3,
+                 retry_delay=1.0) -> None:
+        """
+        Args:
+            bot (telegram.Bot): The bot used to send the messages.
+            global_rate (float, optional): Messages per second for all chats together. Default: 30.
+            global_burst (int, optional): Messages that can be sent at once after an idle period. Default: 30.
+            chat_rate (float, optional): Messages per second for one chat. Default: 1.
+            chat_burst (int, optional): Messages one chat can receive at once after an idle period. Default: 3.
+            max_retries (int, optional): Attempts after a network error before giving up. Default: 3.
+            retry_delay (float, optional): Initial backoff after a network error in seconds. Default: 1.
+        """
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._global_bucket = _TokenBucket(global_rate, global_burst)
+        self._chat_buckets = {}
+        self._queues = {}
+        self._ready = []
+        self._scheduled = set()
+        self._edits = {}
+        self._alerts = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._sending = set()
+        self._in_flight = set()
+        self._task = None
+        self.sent = 0
+        self.coalesced = 0
+        self.retried = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self) -> None:
+        """
+        Starts the dispatcher task on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout=5.0) -> None:
+        """
+        Waits up to timeout seconds for the queue to drain, then stops the dispatcher.
+        """
+        deadline = time.monotonic() + timeout
+        while (self._queues or self._sending) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in self._queues.values():
+            for job in queue:
+                self._resolve(job, exception=ConnectionError('The send scheduler was stopped'))
+        self._queues.clear()
+
+    def send_message(self, chat_id, text, **kwargs) -> asyncio.Future:
+        """
+        Queues a new message.
+
+        Args:
+            chat_id (int): Target chat.
+            text (str): Message text.
+            **kwargs: Passed to Bot.send_message (e.g. reply_markup, parse_mode).
+
+        Returns:
+            asyncio.Future: Resolves to the sent telegram.Message.
+        """
+        job = _Job(SEND, chat_id, text, kwargs=kwargs)
+        self._enqueue(job)
+        return self._future(job)
+
+    def edit_message_text(self, chat_id, message_id, text, **kwargs) -> asyncio.Future:
+        """
+        Queues an edit of a message. A queued edit of the same message is replaced.
+
+        Returns:
+            asyncio.Future: Resolves to the edited telegram.Message, or None if the text did not change.
+        """
+        key = (chat_id, message_id)
+        job = self._edits.get(key)
+        if job is not None:
+            job.text = text
+            job.kwargs = kwargs
+            self.coalesced += 1
+            return self._future(job)
+
+        job = self._edits[key] = _Job(EDIT, chat_id, text, message_id, kwargs)
+        self._enqueue(job)
+        return self._future(job)
+
+    def send_photo(self, chat_id, photo, **kwargs) -> asyncio.Future:
+        """
+        Queues a photo.
+
+        Args:
+            chat_id (int): Target chat.
+            photo (bytes | str): Image data, or the file_id of a photo Telegram already has.
+            **kwargs: Passed to Bot.send_photo (e.g. caption, reply_markup).
+
+        Returns:
+            asyncio.Future: Resolves to the sent telegram.Message.
+        """
+        job = _Job(PHOTO, chat_id, photo, kwargs=kwargs)
+        self._enqueue(job)
+        return self._future(job)
+
+    def send_alert(self, chat_id, line) -> asyncio.Future:
+        """
+        Queues one alert line. Lines queued for the same chat are sent as one message.
+
+        Returns:
+            asyncio.Future: Resolves to the sent telegram.Message.
+        """
+        job = self._alerts.get(chat_id)
+        if job is not None and len(job.text) + len(line) + 1 <= MAX_MESSAGE_LENGTH:
+            job.text = f"{job.text}\n{line}"
+            self.coalesced += 1
+            return self._future(job)
+
+        job = self._alerts[chat_id] = _Job(ALERT, chat_id, line)
+        self._enqueue(job)
+        return self._future(job)
+
+    def _future(self, job) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        job.futures.append(future)
+        return future
+
+    def _enqueue(self, job, first=False) -> None:
+        queue = self._queues.get(job.chat_id)
+        if queue is None:
+            queue = self._queues[job.chat_id] = deque()
+        if first:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+        self._schedule(job.chat_id)
+
+    def _schedule(self, chat_id) -> None:
+        if chat_id in self._scheduled:
+            return
+        bucket = self._chat_bucket(chat_id)
+        now = time.monotonic()
+        heapq.heappush(self._ready, (now + bucket.delay(now), next(self._sequence), chat_id))
+        self._scheduled.add(chat_id)
+        self._wakeup.set()
+
+    def _chat_bucket(self, chat_id) -> _TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = _TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    async def _run(self) -> None:
+        while True:
+            if not self._ready:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            ready_at, _, chat_id = self._ready[0]
+            wait = max(ready_at - now, self._global_bucket.delay(now))
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._ready)
+            self._scheduled.discard(chat_id)
+            if chat_id in self._in_flight:
+                # Rescheduled when the message in flight completes
+                continue
+            bucket = self._chat_bucket(chat_id)
+            if bucket.delay(now) > 0:
+                # The chat was paused by a RetryAfter after it was scheduled
+                self._schedule(chat_id)
+                continue
+
+            queue = self._queues[chat_id]
+            job = queue.popleft()
+            if not queue:
+                del self._queues[chat_id]
+            self._detach(job)
+            bucket.take(now)
+            self._global_bucket.take(now)
+
+            self._in_flight.add(chat_id)
+            task = asyncio.create_task(self._send(job))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+            if chat_id not in self._queues and len(self._chat_buckets) > 1024:
+                self._prune_buckets(now)
+
+    def _detach(self, job) -> None:
+        # From now on the job is in flight and can no longer absorb edits or alert lines
+        if job.kind == EDIT:
+            if self._edits.get((job.chat_id, job.message_id)) is job:
+                del self._edits[(job.chat_id, job.message_id)]
+        elif job.kind == ALERT:
+            if self._alerts.get(job.chat_id) is job:
+                del self._alerts[job.chat_id]
+
+    def _prune_buckets(self, now) -> None:
+        for chat_id in [chat_id for chat_id, bucket in self._chat_buckets.items()
+                        if chat_id not in self._queues and chat_id not in self._in_flight and bucket.is_full(now)]:
+            del self._chat_buckets[chat_id]
+
+    async def _send(self, job) -> None:
+        try:
+            await self._attempt(job)
+        finally:
+            self._in_flight.discard(job.chat_id)
+            if job.chat_id in self._queues:
+                self._schedule(job.chat_id)
+
+    async def _attempt(self, job) -> None:
+        try:
+            if job.kind == EDIT:
+                result = await self.bot.edit_message_text(job.text, chat_id=job.chat_id,
+                                                          message_id=job.message_id, **job.kwargs)
+            elif job.kind == PHOTO:
+                result = await self.bot.send_photo(job.chat_id, job.text, **job.kwargs)
+            else:
+                result = await self.bot.send_message(job.chat_id, job.text, **job.kwargs)
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            self.retried += 1
+            self._chat_bucket(job.chat_id).block(retry_after)
+            self._requeue(job)
+        except BadRequest as e:
+            if job.kind == EDIT and 'not modified' in str(e):
+                self._resolve(job, None)
+            else:
+                self._fail(job, e)
+        except TimedOut as e:
+            if job.kind != EDIT:
+                # The message may have been posted, a retry could post it twice
+                self._fail(job, e)
+                return
+            await self._retry_later(job, e)
+        except NetworkError as e:
+            await self._retry_later(job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            self.sent += 1
+            self._resolve(job, result)
+
+    async def _retry_later(self, job, exception) -> None:
+        # The chat stays in flight during the backoff, so later messages cannot overtake this one
+        job.attempts += 1
+        if job.attempts > self.max_retries:
+            self._fail(job, exception)
+            return
+        self.retried += 1
+        await asyncio.sleep(self.retry_delay * 2 ** (job.attempts - 1))
+        self._requeue(job)
+
+    def _requeue(self, job) -> None:
+        if job.kind == EDIT:
+            newer = self._edits.get((job.chat_id, job.message_id))
+            if newer is not None:
+                # A newer edit is already queued and supersedes this one
+                newer.futures += job.futures
+                return
+            self._edits[(job.chat_id, job.message_id)] = job
+        self._enqueue(job, first=True)
+
+    def _fail(self, job, exception) -> None:
+        print(f"Failed to send a message to chat {job.chat_id}: {exception!r}")
+        self._resolve(job, exception=exception)
+
+    @staticmethod
+    def _resolve(job, result=None, exception=None) -> None:
+        for future in job.futures:
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+                # Alert senders do not wait for the result, the failure is reported here instead
+                future.exception()
+            else:
+                future.set_result(result)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+
+import pytest
+
+from binance_agg_trades_backfill import AGG_TRADE_RECORD, AggTradesBackfill, read_agg_trades
+
+
+def make_trade(trade_id):
+    return {'a': trade_id, 'p': f'{100 + trade_id}.5', 'q': '0.25', 'f': 2 * trade_id, 'l': 2 * trade_id + 1,
+            'T': 1_000_000 + trade_id * 1000, 'm': trade_id % 2 == 0, 'M': True}
+
+
+class AggTradesClient:
+    """
+    /aggTrades over trades 0..count-1, one second apart from 1000000.
+    """
+
+    def __init__(self, count, fail_after=None):
+        self.trades = [make_trade(trade_id) for trade_id in range(count)]
+        self.fail_after = fail_after
+        self.requests = []
+
+    async def get_aggregate_trades(self, symbol, fromId=None, startTime=None, endTime=None, limit=500,
+                                   priority=None):
+        self.requests.append({key: value for key, value in (('fromId', fromId), ('startTime', startTime),
+                                                            ('endTime', endTime)) if value is not None})
+        if self.fail_after is not None and len(self.requests) > self.fail_after:
+            return None
+        if fromId is not None:
+            return self.trades[fromId:fromId + limit]
+        return [trade for trade in self.trades if startTime <= trade['T'] <= endTime][:limit]
+
+
+def make_backfill(client, tmp_path, page_limit=100):
+    backfill = AggTradesBackfill(client, data_dir=str(tmp_path), max_retries=0, retry_delay=0)
+    backfill.PAGE_LIMIT = page_limit
+    return backfill
+
+
+def ids(backfill, symbol='BTCUSDT'):
+    return [record[0] for record in read_agg_trades(backfill.data_path(symbol))]
+
+
+def test_the_range_is_chained_by_from_id(tmp_path):
+    client = AggTradesClient(1000)
+    backfill = make_backfill(client, tmp_path)
+
+    # Trades 50 to 349
+    assert asyncio.run(backfill.backfill('BTCUSDT', 1_050_000, 1_349_500)) == 300
+    assert ids(backfill) == list(range(50, 350))
+    assert client.requests == [{'startTime': 1_050_000, 'endTime': 1_349_500},
+                               {'fromId': 50}, {'fromId': 150}, {'fromId': 250}, {'fromId': 350}]
+
+    record = next(read_agg_trades(backfill.data_path('BTCUSDT')))
+    assert record == (50, 150.5, 0.25, 100, 101, 1_050_000, 1 | 2)
+
+
+def test_the_start_is_searched_one_window_at_a_time(tmp_path):
+    client = AggTradesClient(10)
+    backfill = make_backfill(client, tmp_path)
+    backfill.MAX_WINDOW_MS = 99_999
+
+    # Three empty windows before the first trade
+    assert asyncio.run(backfill.backfill('BTCUSDT', 700_000, 1_100_000)) == 10
+    assert [request['startTime'] for request in client.requests[:4]] == [700_000, 800_000, 900_000, 1_000_000]
+    assert ids(backfill) == list(range(10))
+
+    client.requests.clear()
+    assert asyncio.run(make_backfill(client, tmp_path).backfill('ETHUSDT', 2_000_000, 3_000_000)) == 0
+    assert all('fromId' not in request for request in client.requests)
+
+
+def test_an_interrupted_backfill_resumes_from_its_checkpoint(tmp_path):
+    client = AggTradesClient(1000, fail_after=3)
+    backfill = make_backfill(client, tmp_path)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(backfill.backfill('BTCUSDT', 1_000_000, 1_999_000))
+    assert ids(backfill) == list(range(200))
+    # Written after the last checkpoint, e.g. by a crash before it was saved
+    with open(backfill.data_path('BTCUSDT'), 'ab') as f:
+        f.write(AGG_TRADE_RECORD.pack(999, 1.0, 1.0, 0, 0, 0, 0))
+
+    client.fail_after = None
+    client.requests.clear()
+    assert asyncio.run(backfill.backfill('BTCUSDT', 1_000_000, 1_999_000)) == 800
+    assert ids(backfill) == list(range(1000))
+    assert client.requests[0] == {'fromId': 200}
+
+    # A finished range is not requested again
+    client.requests.clear()
+    assert asyncio.run(backfill.backfill('BTCUSDT', 1_000_000, 1_999_000)) == 0
+    assert client.requests == []
+
+
+def test_another_start_time_starts_the_file_over(tmp_path, capsys):
+    client = AggTradesClient(1000)
+    backfill = make_backfill(client, tmp_path)
+    asyncio.run(backfill.backfill('BTCUSDT', 1_000_000, 1_099_000))
+
+    assert asyncio.run(backfill.backfill('BTCUSDT', 1_500_000, 1_549_000)) == 50
+    assert ids(backfill) == list(range(500, 550))
+    assert 'Discarding 100 aggregate trades of BTCUSDT backfilled from 1000000' in capsys.readouterr().out
+
+    # Without trades in the new range the old checkpoint is gone as well
+    asyncio.run(backfill.backfill('BTCUSDT', 5_000_000, 6_000_000))
+    assert not os.path.exists(backfill.checkpoint_path('BTCUSDT'))
+    assert ids(backfill) == []
+    assert asyncio.run(backfill.backfill('BTCUSDT', 1_000_000, 1_009_000)) == 10
+    assert ids(backfill) == list(range(10))
+
+
+def test_run_reports_every_symbol(tmp_path):
+    client = AggTradesClient(300)
+    backfill = make_backfill(client, tmp_path)
+
+    async def get_aggregate_trades(symbol, **params):
+        if symbol == 'BADUSDT':
+            return None
+        return await AggTradesClient.get_aggregate_trades(client, symbol, **params)
+
+    client.get_aggregate_trades = get_aggregate_trades
+    results = asyncio.run(backfill.run(['BTCUSDT', 'BADUSDT', 'ETHUSDT'], 1_000_000, 1_249_000))
+    assert results['BTCUSDT'] == results['ETHUSDT'] == 250
+    assert isinstance(results['BADUSDT'], ConnectionError)
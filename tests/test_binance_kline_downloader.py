@@ -0,0 +1,107 @@
+import asyncio
+import random
+
+import pytest
+
+from binance_kline_downloader import KlineDownloadError, KlineRangeDownloader
+
+MINUTE = 60_000
+
+
+class PagedClient:
+    """
+    /klines over a fixed list of open times, answering None for the failing page starts.
+    """
+
+    def __init__(self, open_times, failures=None):
+        self.open_times = sorted(open_times)
+        self.failures = dict(failures or {})
+        self.requests = []
+
+    async def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500, priority=None):
+        self.requests.append((startTime, endTime))
+        # Pages run concurrently, let them finish out of order
+        await asyncio.sleep(random.random() / 1000)
+        if self.failures.get(startTime, 0):
+            self.failures[startTime] -= 1
+            return None
+        return [[open_time, '1', '2', '0.5', '1.5', '10', open_time + MINUTE - 1]
+                for open_time in self.open_times if startTime <= open_time <= endTime][:limit]
+
+
+def make_downloader(client, page_size=10, max_retries=1):
+    return KlineRangeDownloader(client, page_size=page_size, max_concurrency=3, max_retries=max_retries,
+                                retry_delay=0)
+
+
+def download(downloader, start_time, end_time, interval='1m'):
+    return asyncio.run(downloader.download('BTCUSDT', interval, start_time, end_time))
+
+
+@pytest.mark.parametrize('start_time, end_time', [
+    (0, 99 * MINUTE),
+    (0, 100 * MINUTE - 1),
+    (0, 100 * MINUTE),
+    (5 * MINUTE, 5 * MINUTE),
+    (5 * MINUTE + 1, 37 * MINUTE + 59_999),
+    (3 * MINUTE, 12 * MINUTE),
+])
+def test_pages_cover_the_range_exactly_once(start_time, end_time):
+    client = PagedClient(range(0, 200 * MINUTE, MINUTE))
+    rows = download(make_downloader(client), start_time, end_time)
+
+    expected = [open_time for open_time in range(0, 200 * MINUTE, MINUTE) if start_time <= open_time <= end_time]
+    assert [row[0] for row in rows] == expected
+    # Windows of ten candles from the start, the last one cut at the end
+    assert sorted(client.requests) == [(window, min(window + 10 * MINUTE - 1, end_time))
+                                       for window in range(start_time, end_time + 1, 10 * MINUTE)]
+
+
+def test_a_page_is_retried():
+    client = PagedClient(range(0, 50 * MINUTE, MINUTE), failures={20 * MINUTE: 1})
+    rows = download(make_downloader(client), 0, 49 * MINUTE)
+    assert [row[0] for row in rows] == list(range(0, 50 * MINUTE, MINUTE))
+    assert client.requests.count((20 * MINUTE, 30 * MINUTE - 1)) == 2
+
+
+@pytest.mark.parametrize('listed, failing, resume_time', [
+    # Rows up to 29 are yielded, the download continues at 30
+    (0, 30, 30),
+    # The first page fails
+    (0, 0, 0),
+    # The symbol was listed later, the pages before the failure are empty
+    (35, 40, 40),
+    # The failing page is partly before the listing
+    (45, 40, 40),
+])
+def test_a_failing_page_reports_where_to_resume(listed, failing, resume_time):
+    open_times = range(listed * MINUTE, 100 * MINUTE, MINUTE)
+    client = PagedClient(open_times, failures={failing * MINUTE: 2})
+    downloader = make_downloader(client)
+    rows = []
+
+    async def main():
+        async for row in downloader.iter_klines('BTCUSDT', '1m', 0, 99 * MINUTE):
+            rows.append(row[0])
+
+    with pytest.raises(KlineDownloadError) as error:
+        asyncio.run(main())
+    assert error.value.resume_time == resume_time * MINUTE
+    assert rows == [open_time for open_time in open_times if open_time < failing * MINUTE]
+
+    # Continuing from resume_time completes the range without a gap or a duplicate
+    rows += [row[0] for row in download(downloader, error.value.resume_time, 99 * MINUTE)]
+    assert rows == list(open_times)
+
+
+def test_monthly_klines_are_chained_page_by_page():
+    # Calendar months, 28 to 31 days apart
+    open_times = [0]
+    for days in [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31] * 2:
+        open_times.append(open_times[-1] + days * 86_400_000)
+    client = PagedClient(open_times)
+
+    rows = download(make_downloader(client), 0, open_times[-1], interval='1M')
+    assert [row[0] for row in rows] == open_times
+    assert client.requests == [(0, open_times[-1]), (open_times[9] + 1, open_times[-1]),
+                               (open_times[19] + 1, open_times[-1])]
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+from binance_market_data_async_rest_client import BinanceMarketDataAsyncRestClient
+
+MARKET = [f'SYM{index}USDT' for index in range(2000)]
+
+
+class RecordingClient(BinanceMarketDataAsyncRestClient):
+    """
+    Answers _get from a fixed market instead of the network and records every request.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    async def _get(self, endpoint, params=None, weight=1, priority=None):
+        self.requests.append((endpoint, dict(params or {}), weight))
+        symbols = json.loads(params['symbols']) if params and 'symbols' in params else MARKET
+        return [{'symbol': symbol, 'price': '1.0'} for symbol in symbols]
+
+
+def request_symbols(client):
+    return [len(json.loads(params['symbols'])) if 'symbols' in params else None for _, params, _ in client.requests]
+
+
+def test_price_list_is_batched_on_a_weight_tie():
+    client = RecordingClient()
+    items = asyncio.run(client.get_ticker_price(symbols=['btcusdt', 'ETHUSDT', 'BTCUSDT']))
+
+    # One symbols=[...] request weighs as much as the whole market, the batch is still preferred
+    assert [item['symbol'] for item in items] == ['BTCUSDT', 'ETHUSDT']
+    assert request_symbols(client) == [2]
+    assert client.requests[0][2] == 4
+
+
+def test_price_list_over_one_chunk_downloads_the_market():
+    client = RecordingClient()
+    symbols = MARKET[:150]
+    items = asyncio.run(client.get_book_ticker(symbols=symbols))
+
+    assert [item['symbol'] for item in items] == symbols
+    assert request_symbols(client) == [None]
+    assert client.requests[0][0] == '/api/v3/ticker/bookTicker'
+
+
+def test_ticker_24hr_is_chunked_until_the_market_is_cheaper():
+    client = RecordingClient()
+    items = asyncio.run(client.get_ticker_24hr(symbols=MARKET[:45], type='MINI'))
+
+    assert len(items) == 45
+    assert request_symbols(client) == [20, 20, 5]
+    assert [weight for _, _, weight in client.requests] == [2, 2, 2]
+    assert all(params['type'] == 'MINI' for _, params, _ in client.requests)
+
+    # 40 chunks weigh 80 like the whole market, 41 weigh more
+    client = RecordingClient()
+    asyncio.run(client.get_ticker_24hr(symbols=MARKET[:800]))
+    assert len(client.requests) == 40
+    client = RecordingClient()
+    items = asyncio.run(client.get_ticker_24hr(symbols=MARKET[:801]))
+    assert request_symbols(client) == [None]
+    assert client.requests[0][2] == 80
+    assert len(items) == 801
+
+
+def test_failed_chunk_fails_the_call():
+    class FailingClient(RecordingClient):
+        async def _get(self, endpoint, params=None, weight=1, priority=None):
+            items = await super()._get(endpoint, params, weight, priority)
+            return None if len(self.requests) == 2 else items
+
+    client = FailingClient()
+    assert asyncio.run(client.get_ticker_24hr(symbols=MARKET[:30])) is None
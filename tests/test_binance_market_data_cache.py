@@ -0,0 +1,138 @@
+import asyncio
+
+from binance_market_data_cache import CachedBinanceMarketDataClient
+from binance_rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+
+class PriceClient:
+    """
+    Returns a new price list on every call, after a short delay.
+    """
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    async def get_ticker_price(self, symbol=None, priority=PRIORITY_INTERACTIVE):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return None
+        return {"symbol": symbol, "price": str(call)}
+
+    async def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500,
+                         priority=PRIORITY_INTERACTIVE):
+        self.calls += 1
+        return [[startTime or 0]]
+
+    async def get_server_time(self, priority=PRIORITY_INTERACTIVE):
+        self.calls += 1
+        return {"serverTime": self.calls}
+
+
+def test_fresh_values_are_served_from_memory():
+    client = PriceClient()
+    cache = CachedBinanceMarketDataClient(client, ttls={'get_ticker_price': 60.0})
+
+    async def run():
+        first = await cache.get_ticker_price('BTCUSDT')
+        second = await cache.get_ticker_price('BTCUSDT')
+        other = await cache.get_ticker_price('ETHUSDT')
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+    assert first is second
+    assert other['symbol'] == 'ETHUSDT'
+    assert client.calls == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_expired_values_are_fetched_again():
+    client = PriceClient(delay=0)
+    cache = CachedBinanceMarketDataClient(client, ttls={'get_ticker_price': 0.05})
+
+    async def run():
+        first = await cache.get_ticker_price('BTCUSDT')
+        await asyncio.sleep(0.08)
+        return first, await cache.get_ticker_price('BTCUSDT')
+
+    first, second = asyncio.run(run())
+    assert (first['price'], second['price']) == ('1', '2')
+
+
+def test_concurrent_misses_share_one_request_per_priority():
+    client = PriceClient()
+    cache = CachedBinanceMarketDataClient(client)
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_ticker_price('BTCUSDT') for _ in range(5)),
+            cache.get_ticker_price('BTCUSDT', priority=PRIORITY_BACKGROUND))
+
+    results = asyncio.run(run())
+    assert all(result is results[0] for result in results[:5])
+    # The background call does not join the interactive request
+    assert client.calls == 2
+    assert cache.stats()['coalesced'] == 4
+
+
+def test_only_the_stale_view_serves_expired_values():
+    client = PriceClient()
+    cache = CachedBinanceMarketDataClient(client, ttls={'get_ticker_price': 0.05}, max_stale=10.0)
+    view = cache.allow_stale()
+
+    async def run():
+        await cache.get_ticker_price('BTCUSDT')
+        await asyncio.sleep(0.08)
+        stale = await view.get_ticker_price('BTCUSDT')
+        assert cache.stats()['in_flight'] == 1  # A background refresh was started
+        await asyncio.sleep(0.05)
+        refreshed = await view.get_ticker_price('BTCUSDT')
+        await asyncio.sleep(0.08)
+        current = await cache.get_ticker_price('BTCUSDT')
+        return stale, refreshed, current
+
+    stale, refreshed, current = asyncio.run(run())
+    assert stale['price'] == '1'
+    assert refreshed['price'] == '2'
+    # The cache itself waits for a new value once the TTL has passed
+    assert current['price'] == '3'
+    assert view.stats()['stale_hits'] == 1
+
+
+def test_errors_and_ranges_are_not_cached():
+    client = PriceClient(delay=0)
+    cache = CachedBinanceMarketDataClient(client)
+
+    async def run():
+        client.fail = True
+        assert await cache.get_ticker_price('BTCUSDT') is None
+        client.fail = False
+        assert (await cache.get_ticker_price('BTCUSDT'))['price'] == '2'
+        await cache.get_klines('BTCUSDT', '1m', startTime=1000)
+        await cache.get_klines('BTCUSDT', '1m', 1000)
+        await cache.get_klines('BTCUSDT', '1m')
+        await cache.get_klines('BTCUSDT', '1m')
+        # Methods without a TTL are forwarded as is
+        await cache.get_server_time()
+        await cache.get_server_time()
+
+    asyncio.run(run())
+    assert client.calls == 2 + 3 + 2
+
+
+def test_entries_past_max_stale_are_swept():
+    client = PriceClient(delay=0)
+    cache = CachedBinanceMarketDataClient(client, ttls={'get_ticker_price': 0.01}, max_stale=0.01,
+                                          sweep_interval=0.0)
+
+    async def run():
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'BNBUSDT'):
+            await cache.get_ticker_price(symbol)
+        await asyncio.sleep(0.05)
+        await cache.get_ticker_price('SOLUSDT')
+
+    asyncio.run(run())
+    assert cache.stats()['entries'] == 1
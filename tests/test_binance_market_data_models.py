@@ -0,0 +1,74 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from binance_market_data_models import decimal_strings_to_int64, parse_agg_trades, parse_klines
+
+
+def test_decimal_strings_are_scaled_exactly():
+    values = decimal_strings_to_int64(['64123.45000000', '5', '5.', '0.1', '0.00000001', '0.29'], 8)
+    assert values.dtype == np.int64
+    assert values.tolist() == [6412345000000, 500000000, 500000000, 10000000, 1, 29000000]
+    # Through float the same string loses the last unit
+    assert int(float('0.29') * 10 ** 8) == 28999999
+
+
+def test_negative_values_keep_their_sign():
+    assert decimal_strings_to_int64(['-1.5', '-0.00000001', '-0', '-12'], 8).tolist() == [-150000000, -1, 0,
+                                                                                          -1200000000]
+
+
+def test_digits_beyond_the_scale_are_truncated():
+    assert decimal_strings_to_int64(['1.123456789', '0.999999999', '-1.999'], 8).tolist() == [112345678, 99999999,
+                                                                                              -199900000]
+    # Toward zero, whatever the sign
+    assert decimal_strings_to_int64(['12.99', '-3.7', '0.5'], 0).tolist() == [12, -3, 0]
+    assert decimal_strings_to_int64(['0.129', '7'], 2).tolist() == [12, 700]
+
+
+def test_random_strings_match_decimal():
+    rng = random.Random(5)
+    strings = []
+    for _ in range(2000):
+        integer = str(rng.randrange(10 ** rng.randrange(1, 11)))
+        fraction = ''.join(rng.choice('0123456789') for _ in range(rng.randrange(0, 13)))
+        strings.append(('-' if rng.random() < 0.3 else '') + integer + ('.' + fraction if fraction else ''))
+    for scale in (0, 2, 8):
+        expected = [int(Decimal(string).scaleb(scale)) for string in strings]
+        assert decimal_strings_to_int64(strings, scale).tolist() == expected
+
+
+def test_values_outside_int64_are_rejected():
+    assert decimal_strings_to_int64(['92233720367.99999999'], 8).tolist() == [9223372036799999999]
+    with pytest.raises(OverflowError):
+        decimal_strings_to_int64(['92233720368'], 8)
+    with pytest.raises(OverflowError):
+        decimal_strings_to_int64(['1' * 20], 0)
+    assert decimal_strings_to_int64(['92233720368'], 2).tolist() == [9223372036800]
+    assert decimal_strings_to_int64([], 8).tolist() == []
+
+
+def test_columns_are_scaled_per_field():
+    agg_trades = [
+        {'a': 1, 'p': '64123.45000000', 'q': '0.00120000', 'f': 10, 'l': 12, 'T': 1000, 'm': True, 'M': True},
+        {'a': 2, 'p': '64123.46000000', 'q': '1.50000000', 'f': 13, 'l': 13, 'T': 1001, 'm': False, 'M': True},
+    ]
+    columns = parse_agg_trades(agg_trades, scale={'price': 8})
+    assert columns.scale == {'price': 8}
+    assert columns.price.tolist() == [6412345000000, 6412346000000]
+    assert columns.qty.dtype == np.float64 and columns.qty.tolist() == [0.0012, 1.5]
+    assert columns.is_buyer_maker.tolist() == [True, False]
+    assert not columns.price.flags.writeable
+
+    scaled = parse_agg_trades(agg_trades, scale=4)
+    assert scaled.price.tolist() == [641234500, 641234600] and scaled.qty.tolist() == [12, 15000]
+    assert len(parse_agg_trades([], scale=8)) == 0
+
+    kline = [0, '1.00000000', '2.50000000', '0.50000000', '1.99999999', '123456789012.34', 59_999, '5.0', 7,
+             '1.0', '2.0']
+    klines = parse_klines([kline], scale={'close': 8, 'volume': 2})
+    assert klines.close.tolist() == [199999999]
+    assert klines.volume.tolist() == [12345678901234]
+    assert klines.high.dtype == np.float64 and klines.trades.dtype == np.int64
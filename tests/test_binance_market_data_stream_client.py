@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+from binance_market_data_stream_client import BinanceMarketDataStreamClient, LocalOrderBook
+from binance_stream_replay_server import BinanceStreamReplayServer
+
+
+def depth_update(first_id, final_id, bids=(), asks=(), symbol='BTCUSDT'):
+    return json.dumps({
+        'stream': f'{symbol.lower()}@depth@100ms',
+        'data': {'e': 'depthUpdate', 's': symbol, 'U': first_id, 'u': final_id,
+                 'b': [[str(price), str(qty)] for price, qty in bids],
+                 'a': [[str(price), str(qty)] for price, qty in asks]},
+    })
+
+
+def snapshot(last_update_id, bids=(), asks=()):
+    return {'lastUpdateId': last_update_id,
+            'bids': [[str(price), str(qty)] for price, qty in bids],
+            'asks': [[str(price), str(qty)] for price, qty in asks]}
+
+
+class SnapshotClient:
+    """
+    Returns the given order book snapshots one by one, the last one from then on.
+    """
+
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+        self.calls = 0
+
+    async def get_order_book(self, symbol, limit=100):
+        self.calls += 1
+        return self.snapshots.pop(0) if len(self.snapshots) > 1 else self.snapshots[0]
+
+
+async def replay(frames, rest_client, last_update_id, timeout=5.0):
+    # Replays the frames until the book reached last_update_id and returns a copy of it,
+    # stopping the stream resets the book
+    server = BinanceStreamReplayServer(frames + [{'delay': 30.0}])
+    port = await server.start()
+    stream = BinanceMarketDataStreamClient(rest_client, depth_symbols=['BTCUSDT'],
+                                           base_url=f'ws://127.0.0.1:{port}', reconnect_delay=0.05)
+    stream.start()
+    try:
+        book = stream.order_books['BTCUSDT']
+        deadline = asyncio.get_running_loop().time() + timeout
+        while book.last_update_id != last_update_id:
+            assert asyncio.get_running_loop().time() < deadline, 'replay did not reach the expected state'
+            await asyncio.sleep(0.01)
+        return book.synced, dict(book.bids), dict(book.asks)
+    finally:
+        await stream.stop()
+        await server.stop()
+
+
+def test_snapshot_bridges_buffered_events():
+    frames = [
+        depth_update(101, 105, bids=[(100, 1)]),
+        depth_update(106, 110, asks=[(101, 2)]),
+        {'delay': 0.8},
+        depth_update(111, 112, bids=[(99, 3)]),
+    ]
+    rest_client = SnapshotClient(snapshot(107, bids=[(100, 5), (98, 1)], asks=[(101, 1), (102, 1)]))
+    synced, bids, asks = asyncio.run(replay(frames, rest_client, 112))
+
+    assert synced
+    # 101-105 is older than the snapshot and dropped, 106-110 and 111-112 are applied on top of it
+    assert bids == {100.0: 5.0, 98.0: 1.0, 99.0: 3.0}
+    assert asks == {101.0: 2.0, 102.0: 1.0}
+
+
+def test_gap_triggers_resync():
+    frames = [
+        depth_update(101, 110, bids=[(100, 1)]),
+        {'delay': 0.8},
+        depth_update(111, 115, bids=[(100, 2)]),
+        depth_update(120, 125, bids=[(100, 9)]),  # 116-119 missing
+        depth_update(126, 132, bids=[(97, 4)], asks=[(103, 1)]),
+        {'delay': 0.8},
+        depth_update(133, 135, asks=[(103, 0)]),
+    ]
+    rest_client = SnapshotClient(snapshot(105, bids=[(100, 1)], asks=[(101, 1)]),
+                                 snapshot(130, bids=[(100, 7)], asks=[(101, 1)]))
+    synced, bids, asks = asyncio.run(replay(frames, rest_client, 135))
+
+    assert rest_client.calls == 2
+    assert synced
+    assert bids == {100.0: 7.0, 97.0: 4.0}
+    assert asks == {101.0: 1.0}
+
+
+def test_stale_snapshot_keeps_buffered_events():
+    frames = [
+        depth_update(101, 105, bids=[(100, 1)]),
+        depth_update(106, 110, bids=[(100, 2)]),
+        {'delay': 1.0},
+        depth_update(111, 111, bids=[(99, 1)]),
+    ]
+    # The first snapshot predates everything that was buffered, as a cached one would
+    rest_client = SnapshotClient(snapshot(50, bids=[(100, 9)]), snapshot(103, bids=[(100, 9)]))
+    synced, bids, asks = asyncio.run(replay(frames, rest_client, 111))
+
+    assert rest_client.calls == 2
+    assert bids == {100.0: 2.0, 99.0: 1.0}
+
+
+def test_out_of_sync_book_is_not_served():
+    book = LocalOrderBook('BTCUSDT')
+    book.apply_event({'U': 11, 'u': 12, 'b': [['1', '1']], 'a': []})
+    assert book.apply_snapshot(snapshot(10))
+    assert not book.apply_event({'U': 14, 'u': 15, 'b': [], 'a': []})
+    assert not book.synced
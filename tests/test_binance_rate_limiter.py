@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from binance_rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, BinanceRateLimiter
+
+
+def test_requests_within_the_budget_are_not_delayed():
+    limiter = BinanceRateLimiter(limit=100, interval_seconds=60, safety_margin=0.5)
+
+    async def run():
+        for _ in range(5):
+            await asyncio.wait_for(limiter.acquire(10), 0.1)
+
+    asyncio.run(run())
+    assert limiter.used_weight == 50
+    assert limiter.queue_depth == 0
+
+
+def test_requests_over_the_budget_wait_for_the_next_window():
+    limiter = BinanceRateLimiter(limit=10, interval_seconds=1, safety_margin=1.0)
+    order = []
+
+    async def request(name, weight, priority):
+        await limiter.acquire(weight, priority)
+        order.append(name)
+
+    async def run():
+        # Windows are aligned to the wall clock, start right after a rollover so this one cannot end early
+        await asyncio.sleep(1.0 - time.time() % 1.0 + 0.01)
+        await limiter.acquire(8)
+        tasks = [asyncio.create_task(request('background', 5, PRIORITY_BACKGROUND)),
+                 asyncio.create_task(request('interactive', 5, PRIORITY_INTERACTIVE))]
+        await asyncio.sleep(0.01)
+        assert order == [] and limiter.queue_depth == 2
+        await asyncio.wait_for(asyncio.gather(*tasks), 2.5)
+
+    asyncio.run(run())
+    # Queued interactive requests go ahead of background ones
+    assert order == ['interactive', 'background']
+
+
+def test_headers_raise_the_used_weight():
+    limiter = BinanceRateLimiter(limit=6000, interval_seconds=60)
+    limiter.update_from_headers(200, {'X-MBX-USED-WEIGHT-1M': '1200'})
+    assert limiter.used_weight == 1200
+
+    # A lower value only covers the requests the server has seen, the local estimate is kept
+    limiter.update_from_headers(200, {'X-MBX-USED-WEIGHT-1M': '800'})
+    assert limiter.used_weight == 1200
+
+
+def test_ban_blocks_every_request_until_retry_after():
+    for status in (429, 418):
+        limiter = BinanceRateLimiter(limit=6000, interval_seconds=60)
+
+        async def run():
+            limiter.update_from_headers(status, {'Retry-After': '0.3'})
+            assert limiter.blocked_for > 0.2
+            started = time.monotonic()
+            await asyncio.wait_for(limiter.acquire(1, PRIORITY_INTERACTIVE), 2.0)
+            return time.monotonic() - started
+
+        assert asyncio.run(run()) >= 0.25
+
+
+def test_configure_applies_the_exchange_limit():
+    limiter = BinanceRateLimiter()
+    limiter.configure([{'rateLimitType': 'ORDERS', 'interval': 'SECOND', 'intervalNum': 10, 'limit': 50},
+                       {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1, 'limit': 1200}])
+    assert limiter.limit == 1200
+    assert limiter.interval_seconds == 60
+    assert limiter.budget == int(1200 * BinanceRateLimiter.DEFAULT_SAFETY_MARGIN)
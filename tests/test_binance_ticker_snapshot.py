@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+
+from binance_ticker_snapshot import BinanceTickerSnapshot
+
+
+class TickerClient:
+    def __init__(self):
+        self.prices = {}
+        self.books = {}
+
+    async def get_ticker_price(self, priority=None):
+        return [{'symbol': symbol, 'price': f'{price:.8f}'} for symbol, price in self.prices.items()] or None
+
+    async def get_book_ticker(self, priority=None):
+        return [{'symbol': symbol, 'bidPrice': f'{bid:.8f}', 'bidQty': '1.00000000', 'askPrice': f'{ask:.8f}',
+                 'askQty': '2.00000000'} for symbol, (bid, ask) in self.books.items()] or None
+
+
+def test_refresh_applies_the_lists():
+    client = TickerClient()
+    client.prices = {'BTCUSDT': 60000.0, 'ETHUSDT': 3000.0}
+    client.books = {'BTCUSDT': (59999.0, 60001.0)}
+    snapshot = BinanceTickerSnapshot(client)
+
+    assert asyncio.run(snapshot.refresh())
+    assert snapshot.get_ticker_price('BTCUSDT') == {'symbol': 'BTCUSDT', 'price': '60000.00000000'}
+    assert snapshot.get_book_ticker('BTCUSDT') == {'symbol': 'BTCUSDT', 'bidPrice': '59999.00000000',
+                                                   'bidQty': '1.00000000', 'askPrice': '60001.00000000',
+                                                   'askQty': '2.00000000'}
+    assert snapshot.get_book_ticker('ETHUSDT') is None
+    assert snapshot.price('XRPUSDT') is None
+    assert snapshot.read_prices([snapshot.slot('ETHUSDT'), snapshot.slot('BTCUSDT')]).tolist() == [3000.0, 60000.0]
+    assert snapshot.generation == 2
+
+    # A failed poll keeps the values and does not make them fresher
+    updated_at = snapshot.updated_at
+    client.prices = {}
+    assert not asyncio.run(snapshot.refresh())
+    assert snapshot.updated_at == updated_at and snapshot.price('BTCUSDT') == 60000.0
+
+
+def test_symbols_missing_from_the_latest_lists_have_no_values():
+    client = TickerClient()
+    client.prices = {'BTCUSDT': 60000.0, 'LUNAUSDT': 1.0}
+    client.books = {'BTCUSDT': (59999.0, 60001.0), 'LUNAUSDT': (0.9, 1.1)}
+    snapshot = BinanceTickerSnapshot(client)
+    asyncio.run(snapshot.refresh())
+
+    # Delisted from the price list, still in the book list
+    client.prices = {'BTCUSDT': 61000.0}
+    assert asyncio.run(snapshot.refresh())
+    assert snapshot.price('LUNAUSDT') is None
+    assert snapshot.get_ticker_price('LUNAUSDT') is None
+    assert snapshot.get_book_ticker('LUNAUSDT')['bidPrice'] == '0.90000000'
+    assert np.isnan(snapshot.read_prices([snapshot.slot('LUNAUSDT')])).all()
+
+    client.books = {'BTCUSDT': (60999.0, 61001.0)}
+    asyncio.run(snapshot.refresh())
+    assert snapshot.get_book_ticker('LUNAUSDT') is None
+    assert snapshot.price('BTCUSDT') == 61000.0
+
+    # The slot is kept for the symbol when it trades again
+    client.prices['LUNAUSDT'] = 2.0
+    asyncio.run(snapshot.refresh())
+    assert snapshot.price('LUNAUSDT') == 2.0
+    assert snapshot.generation == 2
+
+
+def test_listeners_run_after_every_refresh():
+    client = TickerClient()
+    client.prices = {'BTCUSDT': 60000.0}
+    client.books = {'BTCUSDT': (59999.0, 60001.0)}
+    snapshot = BinanceTickerSnapshot(client, refresh_interval=0.01)
+    seen = []
+
+    async def listener(updated):
+        seen.append(updated.price('BTCUSDT'))
+        client.prices['BTCUSDT'] += 1
+
+    async def main():
+        snapshot.add_listener(listener)
+        snapshot.start()
+        while len(seen) < 3:
+            await asyncio.sleep(0.01)
+        await snapshot.stop()
+
+    asyncio.run(main())
+    assert seen[:3] == [60000.0, 60001.0, 60002.0]
@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from chart_renderer import ChartImage, ChartRenderer
+
+
+class PhotoChat:
+    """
+    Records the photos sent to it. The first failures uploads raise, the rest return a message with a file_id.
+    """
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.uploads = 0
+        self.sent = []
+
+    async def send_photo(self, photo):
+        await asyncio.sleep(0.01)
+        if isinstance(photo, bytes):
+            self.uploads += 1
+            if self.uploads <= self.failures:
+                raise ConnectionError('upload failed')
+            self.sent.append('png')
+            return SimpleNamespace(photo=[SimpleNamespace(file_id='small'), SimpleNamespace(file_id='large')])
+        self.sent.append(photo)
+        return SimpleNamespace(photo=[])
+
+
+def test_concurrent_sends_upload_once():
+    chart = ChartImage(b'png')
+    chat = PhotoChat()
+
+    async def run():
+        await asyncio.gather(*(ChartRenderer.send(chart, chat.send_photo) for _ in range(5)))
+
+    asyncio.run(run())
+    assert chat.uploads == 1
+    assert sorted(chat.sent) == ['large'] * 4 + ['png']
+    assert chart.file_id == 'large' and chart.uploading is None
+
+
+def test_failed_upload_is_retried_by_one_waiter():
+    chart = ChartImage(b'png')
+    chat = PhotoChat(failures=1)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(
+            *(ChartRenderer.send(chart, chat.send_photo) for _ in range(4)), return_exceptions=True), 2.0)
+
+    results = asyncio.run(run())
+    assert sum(isinstance(result, ConnectionError) for result in results) == 1
+    # One waiter uploads again, the other waiters reuse its file_id
+    assert chat.uploads == 2
+    assert sorted(chat.sent) == ['large'] * 2 + ['png']
+    assert chart.uploading is None
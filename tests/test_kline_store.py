@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from binance_kline_downloader import KlineDownloadError
+from kline_store import KlineStore
+
+MINUTE = 60 * 1000
+
+
+def kline(open_time, close=1.0, volume=1.0):
+    return [open_time, str(close), str(close), str(close), str(close), str(volume), open_time + MINUTE - 1,
+            str(close * volume), 1, '0', '0']
+
+
+class KlineClient:
+    """
+    Serves the klines of a fixed list, optionally failing, and counts the requests.
+    """
+
+    def __init__(self, klines, fail=False):
+        self.klines = klines
+        self.fail = fail
+        self.calls = 0
+        self.limits = []
+
+    async def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500, priority=None):
+        self.calls += 1
+        self.limits.append(limit)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError('Binance is down')
+        rows = [row for row in self.klines if (startTime is None or row[0] >= startTime)
+                and (endTime is None or row[0] <= endTime)]
+        return rows[-limit:] if startTime is None else rows[:limit]
+
+
+def test_concurrent_syncs_share_the_result(tmp_path):
+    store = KlineStore(str(tmp_path))
+    client = KlineClient([kline(i * MINUTE) for i in range(10)])
+
+    async def run():
+        return await asyncio.gather(*(store.sync(client, 'BTCUSDT', '1m') for _ in range(5)))
+
+    assert asyncio.run(run()) == [10] * 5
+    assert client.calls == 1
+    assert store.count('BTCUSDT', '1m') == 10
+
+
+def test_concurrent_syncs_share_the_failure(tmp_path):
+    store = KlineStore(str(tmp_path))
+    client = KlineClient([kline(0)], fail=True)
+
+    async def run():
+        return await asyncio.gather(*(store.sync(client, 'BTCUSDT', '1m') for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert client.calls == 1
+
+    # The failed sync is not remembered, the next one downloads again
+    client.fail = False
+    assert asyncio.run(store.sync(client, 'BTCUSDT', '1m')) == 1
+
+
+def test_append_skips_stored_candles_and_overwrites_the_last(tmp_path):
+    store = KlineStore(str(tmp_path))
+    assert store.append('BTCUSDT', '1m', [kline(i * MINUTE) for i in range(3)]) == 3
+    assert store.last_open_time('BTCUSDT', '1m') == 2 * MINUTE
+
+    # The last stored candle was still open: it is replaced, older rows are ignored
+    rows = [kline(1 * MINUTE, close=9.0), kline(2 * MINUTE, close=5.0, volume=3.0), kline(3 * MINUTE)]
+    assert store.append('BTCUSDT', '1m', rows) == 1
+
+    columns = store.columns('BTCUSDT', '1m')
+    assert columns['open_time'].tolist() == [i * MINUTE for i in range(4)]
+    assert columns['close'].tolist() == [1.0, 1.0, 5.0, 1.0]
+    assert columns['volume'][2] == 3.0
+    assert store.append('BTCUSDT', '1m', [kline(0)]) == 0
+    assert store.append('BTCUSDT', '1m', []) == 0
+
+
+def test_store_is_read_back_from_disk(tmp_path):
+    KlineStore(str(tmp_path)).append('ethusdt', '1h', [kline(i * MINUTE, close=float(i)) for i in range(100)])
+
+    store = KlineStore(str(tmp_path))
+    assert store.count('ETHUSDT', '1h') == 100
+    assert store.count('ETHUSDT', '1m') == 0
+    rows = store.query('ETHUSDT', '1h', start_time=10 * MINUTE, end_time=20 * MINUTE)
+    assert rows['close'].tolist() == [float(i) for i in range(10, 21)]
+    assert store.query('ETHUSDT', '1h', end_time=20 * MINUTE, limit=3)['open_time'].tolist() == \
+        [18 * MINUTE, 19 * MINUTE, 20 * MINUTE]
+
+
+class FixedClock:
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+
+    def server_now_ms(self):
+        return self.now_ms
+
+
+def test_sync_continues_from_the_last_stored_candle(tmp_path):
+    # The clock ends the download range, otherwise it would run from 1970 to today
+    store = KlineStore(str(tmp_path), clock=FixedClock(8 * MINUTE - 1))
+    client = KlineClient([kline(i * MINUTE) for i in range(5)])
+    assert asyncio.run(store.sync(client, 'BTCUSDT', '1m')) == 5
+
+    client.klines[-1] = kline(4 * MINUTE, close=2.0)
+    client.klines += [kline(i * MINUTE) for i in range(5, 8)]
+    assert asyncio.run(store.sync(client, 'BTCUSDT', '1m')) == 3
+    assert store.columns('BTCUSDT', '1m')['close'][4] == 2.0
+    assert store.count('BTCUSDT', '1m') == 8
+    # The tail request is sized to the gap, not a full page
+    assert client.limits[-1] == 5
+
+
+def test_sync_pages_long_gaps(tmp_path):
+    store = KlineStore(str(tmp_path), clock=FixedClock(2500 * MINUTE - 1))
+    client = KlineClient([kline(i * MINUTE) for i in range(2500)])
+    store.append('BTCUSDT', '1m', client.klines[:1])
+
+    assert asyncio.run(store.sync(client, 'BTCUSDT', '1m')) == 2499
+    assert store.columns('BTCUSDT', '1m')['open_time'].tolist() == [i * MINUTE for i in range(2500)]
+    assert max(client.limits) == 1000
+
+
+def test_failed_tail_sync_raises(tmp_path):
+    store = KlineStore(str(tmp_path), clock=FixedClock(10 * MINUTE))
+    store.append('BTCUSDT', '1m', [kline(0)])
+
+    class EmptyClient(KlineClient):
+        async def get_klines(self, *args, **kwargs):
+            return None
+
+    with pytest.raises(KlineDownloadError) as error:
+        asyncio.run(store.sync(EmptyClient([]), 'BTCUSDT', '1m'))
+    assert error.value.resume_time == 0
@@ -0,0 +1,59 @@
+import math
+
+import pytest
+
+from order_book_analytics import BUY, SELL, depth_within, fill_price, imbalance, parse_order_book, slippage, spread
+
+BOOK = {
+    "lastUpdateId": 42,
+    "bids": [["99.00000000", "1.00000000"], ["98.00000000", "2.00000000"], ["97.00000000", "5.00000000"]],
+    "asks": [["101.00000000", "1.00000000"], ["102.00000000", "2.00000000"], ["103.00000000", "5.00000000"]],
+}
+
+
+def test_parse_keeps_the_top_of_the_book_first():
+    book = parse_order_book(BOOK)
+    assert book.last_update_id == 42
+    assert (book.best_bid, book.best_ask, book.mid_price) == (99.0, 101.0, 100.0)
+    assert spread(book) == (2.0, pytest.approx(200.0))
+
+
+def test_fill_within_the_first_level():
+    book = parse_order_book(BOOK)
+    assert fill_price(book, BUY, 50.5) == (101.0, 50.5, 1)
+    assert slippage(book, BUY, 50.5) == 0.0
+
+
+def test_fill_across_levels():
+    book = parse_order_book(BOOK)
+    # 101 buys the first level, the remaining 153 buy 1.5 at 102
+    average, filled, levels = fill_price(book, BUY, 254.0)
+    assert average == pytest.approx(254.0 / 2.5)
+    assert (filled, levels) == (254.0, 2)
+    assert slippage(book, BUY, 254.0) == pytest.approx((254.0 / 2.5 - 101.0) / 101.0 * 1e4)
+
+    # Selling walks the bids downwards: 99 + 196 for the first two levels, then 97 for one more
+    average, filled, levels = fill_price(book, SELL, 392.0)
+    assert average == pytest.approx(392.0 / 4.0)
+    assert (filled, levels) == (392.0, 3)
+    assert slippage(book, SELL, 392.0) == pytest.approx((99.0 - 98.0) / 99.0 * 1e4)
+
+
+def test_fill_larger_than_the_book():
+    book = parse_order_book(BOOK)
+    average, filled, levels = fill_price(book, BUY, 1e6)
+    assert filled == 101.0 + 204.0 + 515.0
+    assert average == pytest.approx(filled / 8.0)
+    assert levels == 3
+
+    empty = parse_order_book({"bids": [], "asks": []})
+    average, filled, levels = fill_price(empty, BUY, 100.0)
+    assert math.isnan(average) and (filled, levels) == (0.0, 0)
+
+
+def test_depth_and_imbalance_around_the_mid_price():
+    book = parse_order_book(BOOK)
+    assert depth_within(book, 1.0) == (99.0, 101.0)
+    assert depth_within(book, 2.0) == (99.0 + 196.0, 101.0 + 204.0)
+    assert imbalance(book, 3.0) == pytest.approx((99.0 + 196.0 + 485.0 - 820.0) / (780.0 + 820.0))
+    assert imbalance(book, 0.5) == 0.0
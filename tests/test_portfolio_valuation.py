@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from binance_exchange_info_cache import SymbolInfo
+from portfolio_valuation import PortfolioValuator
+
+
+class ExchangeInfo:
+    def __init__(self, symbols):
+        self.updated_at = 1.0
+        self.symbols = [SymbolInfo(symbol, status, base, quote, '0.01', '0.01', '0', '0')
+                        for symbol, status, base, quote in symbols]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def all_symbols(self):
+        return list(self.symbols)
+
+
+class PriceSnapshot:
+    def __init__(self, prices):
+        self.generation = 0
+        self.slots = {}
+        self.prices = np.empty(0)
+        self.set_prices(prices)
+
+    def set_prices(self, prices):
+        for symbol, price in prices.items():
+            if symbol not in self.slots:
+                self.slots[symbol] = len(self.prices)
+                self.prices = np.append(self.prices, np.nan)
+            self.prices[self.slots[symbol]] = price
+
+    def slot(self, symbol):
+        return self.slots.get(symbol)
+
+    def read_prices(self, slots):
+        return self.prices[np.asarray(slots, dtype=np.intp)]
+
+
+SYMBOLS = [
+    ('ETHBTC', 'TRADING', 'ETH', 'BTC'),
+    ('BTCUSDT', 'TRADING', 'BTC', 'USDT'),
+    # USDT is the base, converting TRY into USDT divides by the price
+    ('USDTTRY', 'TRADING', 'USDT', 'TRY'),
+    ('XRPETH', 'TRADING', 'XRP', 'ETH'),
+    ('PEPEXRP', 'TRADING', 'PEPE', 'XRP'),
+    ('SOLBTC', 'TRADING', 'SOL', 'BTC'),
+    ('SOLBNB', 'TRADING', 'SOL', 'BNB'),
+    ('BNBUSDT', 'TRADING', 'BNB', 'USDT'),
+    ('ABCDEF', 'TRADING', 'ABC', 'DEF'),
+    ('LUNAUSDT', 'BREAK', 'LUNA', 'USDT'),
+]
+
+PRICES = {
+    'ETHBTC': 0.05, 'BTCUSDT': 60000.0, 'USDTTRY': 30.0, 'XRPETH': 0.0002, 'PEPEXRP': 0.5,
+    'SOLBTC': 0.0025, 'SOLBNB': 1.0, 'BNBUSDT': 500.0, 'ABCDEF': 2.0, 'LUNAUSDT': 1.0,
+}
+
+
+def make_valuator(max_hops=3):
+    return PortfolioValuator(ExchangeInfo(SYMBOLS), PriceSnapshot(PRICES), max_hops=max_hops)
+
+
+def rates(valuation):
+    return {holding.asset: holding.price for holding in valuation.holdings}
+
+
+def test_paths_follow_the_symbols_in_both_directions():
+    valuation = make_valuator().value({'btc': 1, 'ETH': 2, 'TRY': 300, 'XRP': 1000, 'USDT': 5})
+
+    assert rates(valuation) == pytest.approx({'BTC': 60000.0, 'ETH': 3000.0, 'TRY': 1 / 30, 'XRP': 0.6, 'USDT': 1.0})
+    assert [holding.asset for holding in valuation.holdings] == ['BTC', 'ETH', 'XRP', 'TRY', 'USDT']
+    assert valuation.total == pytest.approx(60000 + 6000 + 10 + 600 + 5)
+    assert valuation.unpriced == []
+
+
+def test_another_quote_inverts_the_paths():
+    valuation = make_valuator().value({'BTC': 1, 'USDT': 60}, quote='try')
+
+    assert valuation.quote == 'TRY'
+    assert rates(valuation) == pytest.approx({'BTC': 1_800_000.0, 'USDT': 30.0})
+    with pytest.raises(ValueError):
+        make_valuator().value({'BTC': 1}, quote='LUNA')
+
+
+def test_equal_length_paths_go_through_the_best_connected_asset():
+    # SOL reaches USDT in two hops through BTC (0.0025 * 60000) or BNB (1.0 * 500), BTC has more symbols
+    assert rates(make_valuator().value({'SOL': 1})) == pytest.approx({'SOL': 150.0})
+
+
+def test_unreachable_assets_are_unpriced():
+    valuator = make_valuator()
+    valuation = valuator.value({'BTC': 1, 'PEPE': 10, 'ABC': 1, 'LUNA': 1, 'NOPE': 1})
+
+    # PEPE needs four hops, ABC has no path to USDT, LUNA does not trade and NOPE is unknown
+    assert rates(valuation) == pytest.approx({'BTC': 60000.0})
+    assert sorted(valuation.unpriced) == ['ABC', 'LUNA', 'NOPE', 'PEPE']
+    assert 'ABC' in valuator and 'LUNA' not in valuator
+    assert make_valuator().value({'NOPE': 1}).total == 0.0
+
+    assert rates(make_valuator(max_hops=4).value({'PEPE': 10})) == pytest.approx({'PEPE': 0.3})
+
+
+def test_missing_prices_leave_the_asset_unpriced():
+    valuator = make_valuator()
+    valuator.ticker_snapshot.set_prices({'XRPETH': np.nan})
+    valuation = valuator.value({'XRP': 1, 'ETH': 1})
+
+    assert rates(valuation) == pytest.approx({'ETH': 3000.0})
+    assert valuation.unpriced == ['XRP']
+
+
+def test_plans_are_rebuilt_when_the_symbols_change():
+    valuator = make_valuator()
+    exchange_info, snapshot = valuator.exchange_info, valuator.ticker_snapshot
+    valuator.value({'BTC': 1})
+    plan = valuator._plans['USDT']
+
+    # New prices are read through the same plan
+    snapshot.set_prices({'BTCUSDT': 65000.0})
+    assert rates(valuator.value({'BTC': 1})) == pytest.approx({'BTC': 65000.0})
+    assert valuator._plans['USDT'] is plan
+
+    # A symbol the snapshot adds is used once its generation changes
+    exchange_info.symbols.append(SymbolInfo('DOGEUSDT', 'TRADING', 'DOGE', 'USDT', '0.01', '0.01', '0', '0'))
+    exchange_info.updated_at = 2.0
+    assert valuator.value({'DOGE': 100}).unpriced == ['DOGE']
+    snapshot.set_prices({'DOGEUSDT': 0.1})
+    snapshot.generation += 1
+    assert rates(valuator.value({'DOGE': 100})) == pytest.approx({'DOGE': 0.1})
+    assert valuator._plans['USDT'] is not plan
+
+    # A refreshed exchange info drops the symbols that stopped trading
+    plan = valuator._plans['USDT']
+    exchange_info.symbols = [info._replace(status='BREAK') if info.symbol == 'ETHBTC' else info
+                             for info in exchange_info.symbols]
+    exchange_info.updated_at = 3.0
+    assert valuator.value({'ETH': 1}).unpriced == ['ETH']
+    assert valuator._plans['USDT'] is not plan
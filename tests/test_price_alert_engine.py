@@ -0,0 +1,92 @@
+import asyncio
+import random
+
+import pytest
+
+from price_alert_engine import ABOVE, BELOW, PriceAlertEngine
+
+
+class PriceSnapshot:
+    def __init__(self, prices):
+        self.prices = prices
+
+    def price(self, symbol):
+        return self.prices.get(symbol)
+
+
+def test_check_triggers_the_crossed_thresholds_once(tmp_path):
+    engine = PriceAlertEngine(str(tmp_path / 'alerts.json'))
+    above = [engine.add(1, 'btcusdt', ABOVE, threshold) for threshold in (61000, 62000, 63000)]
+    below = [engine.add(2, 'BTCUSDT', BELOW, threshold) for threshold in (59000, 58000)]
+
+    assert engine.check('BTCUSDT', 60000) == []
+    assert engine.check('BTCUSDT', 62000) == above[:2]
+    assert engine.check('BTCUSDT', 62000) == []
+    assert engine.check('BTCUSDT', 58500) == [below[0]]
+    assert engine.check('ETHUSDT', 1.0) == []
+    assert len(engine) == 2
+    assert [alert.alert_id for alert in engine.alerts_for_chat(1)] == [above[2].alert_id]
+
+
+def test_check_matches_a_linear_scan(tmp_path):
+    rng = random.Random(3)
+    engine = PriceAlertEngine(str(tmp_path / 'alerts.json'))
+    alerts = [engine.add(rng.randrange(5), 'BTCUSDT', rng.choice((ABOVE, BELOW)), rng.choice(range(90, 111)))
+              for _ in range(500)]
+    pending = {alert.alert_id: alert for alert in alerts}
+
+    for _ in range(50):
+        price = rng.uniform(85, 115)
+        expected = {alert_id for alert_id, alert in pending.items()
+                    if (alert.direction == ABOVE and price >= alert.threshold)
+                    or (alert.direction == BELOW and price <= alert.threshold)}
+        assert {alert.alert_id for alert in engine.check('BTCUSDT', price)} == expected
+        for alert_id in expected:
+            del pending[alert_id]
+    assert len(engine) == len(pending)
+
+
+def test_check_triggering_every_alert_of_a_symbol(tmp_path):
+    engine = PriceAlertEngine(str(tmp_path / 'alerts.json'))
+    alerts = [engine.add(1, 'BTCUSDT', ABOVE, 100), engine.add(2, 'BTCUSDT', ABOVE, 101),
+              engine.add(1, 'BTCUSDT', BELOW, 200)]
+
+    assert engine.check('BTCUSDT', 150) == alerts
+    assert len(engine) == 0
+    assert engine.symbols() == []
+
+
+def test_remove_only_deletes_alerts_of_the_chat(tmp_path):
+    engine = PriceAlertEngine(str(tmp_path / 'alerts.json'))
+    first = engine.add(1, 'BTCUSDT', ABOVE, 100)
+    second = engine.add(1, 'BTCUSDT', ABOVE, 100)
+
+    assert not engine.remove(first.alert_id, chat_id=2)
+    assert engine.remove(first.alert_id, chat_id=1)
+    assert not engine.remove(first.alert_id)
+    assert engine.check('BTCUSDT', 100) == [second]
+    assert engine.symbols() == []
+
+    with pytest.raises(ValueError):
+        engine.add(1, 'BTCUSDT', 'sideways', 100)
+
+
+def test_snapshot_updates_notify_and_persist(tmp_path):
+    path = str(tmp_path / 'alerts.json')
+    notified = []
+
+    async def notify(triggered):
+        notified.extend(triggered)
+
+    engine = PriceAlertEngine(path, notify=notify)
+    alert = engine.add(1, 'BTCUSDT', ABOVE, 61000)
+    kept = engine.add(2, 'ETHUSDT', BELOW, 2500)
+
+    asyncio.run(engine.on_snapshot(PriceSnapshot({'BTCUSDT': 61500.0})))
+    assert notified == [(alert, 61500.0)]
+
+    restored = PriceAlertEngine(path)
+    assert restored.load()
+    assert restored.alerts_for_chat(2) == [kept]
+    assert restored.alerts_for_chat(1) == []
+    assert restored.add(1, 'BTCUSDT', ABOVE, 1).alert_id == kept.alert_id + 1
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from server_clock import BinanceServerClock, ClockSample
+
+OFFSET_NS = 1_700_000_000_000_000_000
+
+
+class ClockClient:
+    """
+    Answers server time samples with a fixed offset from the local monotonic clock.
+
+    Each rtts entry is the round trip of one sample; the server reads its clock
+    after delays[i] of it, halfway through by default.
+    """
+
+    def __init__(self, rtts, delays=None):
+        self.rtts = list(rtts)
+        self.delays = list(delays) if delays is not None else [(rtt or 0) // 2 for rtt in self.rtts]
+
+    async def get_server_time_sample(self, priority=None):
+        rtt, delay = self.rtts.pop(0), self.delays.pop(0)
+        if rtt is None:
+            return None, None, None
+        sent = time.monotonic_ns()
+        return {"serverTime": (sent + delay + OFFSET_NS) // 1_000_000}, sent, sent + rtt
+
+
+def test_sync_keeps_the_fastest_sample():
+    # The slow samples read the server clock late in their round trip, only the fast one is symmetric
+    clock = BinanceServerClock(ClockClient([300_000_000, 20_000_000, 200_000_000, None],
+                                           [290_000_000, 10_000_000, 190_000_000, 0]), burst=4)
+
+    assert asyncio.run(clock.sync())
+    assert clock.synced
+    assert abs(clock.offset_ns - OFFSET_NS) <= 1_000_000
+    assert clock.error_ns == 10_000_000 + 500_000
+    assert abs(clock.server_now_ns() - (time.monotonic_ns() + OFFSET_NS)) <= 2_000_000
+
+
+def test_sync_ignores_slow_and_failed_samples():
+    clock = BinanceServerClock(ClockClient([900_000_000, None]), burst=2, max_rtt=0.5)
+
+    assert not asyncio.run(clock.sync())
+    assert not clock.synced
+
+
+def test_estimate_fits_the_drift():
+    clock = BinanceServerClock(ClockClient([]), drift_min_span=600.0)
+    drift = 20e-6
+    for minute in range(0, 60, 5):
+        local_ns = minute * 60 * 1_000_000_000
+        clock._samples.append(ClockSample(local_ns, OFFSET_NS + int(local_ns * drift), 20_000_000))
+    clock._estimate()
+
+    assert abs(clock.drift - drift) < 1e-9
+    assert abs(clock.offset_ns - (OFFSET_NS + int(clock.reference_ns * drift))) <= 1_000
+
+
+def test_estimate_bounds_the_drift():
+    clock = BinanceServerClock(ClockClient([]), drift_min_span=600.0)
+    for minute in (0, 10, 20):
+        local_ns = minute * 60 * 1_000_000_000
+        clock._samples.append(ClockSample(local_ns, OFFSET_NS + local_ns // 100, 20_000_000))
+    clock._estimate()
+
+    assert clock.drift == BinanceServerClock.MAX_DRIFT
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from portfolio_valuation import PortfolioValuator
+from shared_price_table import FIELDS, SharedPriceTable, SharedServerClock, SharedTickerSnapshot
+
+
+def table_name():
+    return f'test_prices_{os.getpid()}_{np.random.randint(1 << 30)}'
+
+
+def write_rows(table, symbols, rounds):
+    # Every write stores the round number in all fields of every symbol, so a torn row mixes two rounds
+    for value in range(1, rounds + 1):
+        table.write(symbols, {field: [float(value)] * len(symbols) for field in FIELDS})
+
+
+def test_reads_never_see_a_torn_row():
+    table = SharedPriceTable.create(table_name(), capacity=16)
+    symbols = [f'SYM{index}USDT' for index in range(8)]
+    try:
+        table.write(symbols, {field: [0.0] * len(symbols) for field in FIELDS})
+        # The forked writer keeps the slots of the table it was forked from
+        writer = multiprocessing.get_context('fork').Process(target=write_rows, args=(table, symbols, 20000))
+        writer.start()
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            for slot in range(len(symbols)):
+                values = table.read(slot)
+                if values is not None:
+                    assert len(set(values.tolist())) == 1
+                    reads += 1
+            column = table.read_column('price', np.arange(len(symbols)))
+            assert not np.isnan(column).all()
+        writer.join()
+        assert table.read(0)[0] == 20000.0
+    finally:
+        table.close()
+
+
+def test_busy_slots_are_not_read():
+    table = SharedPriceTable.create(table_name(), capacity=4)
+    try:
+        table.write(['BTCUSDT', 'ETHUSDT'], {'price': [60000.0, 3000.0]})
+        # The writer stopped halfway through the ETHUSDT slot
+        table.seqs[1] += 1
+
+        assert table.read(1, retries=3) is None
+        values = table.read_column('price', [[0, 1], [1, 0]], retries=3)
+        assert values[0, 0] == values[1, 1] == 60000.0
+        assert np.isnan(values[0, 1]) and np.isnan(values[1, 0])
+
+        table.seqs[1] += 1
+        assert table.read_column('price', [1])[0] == 3000.0
+    finally:
+        table.close()
+
+
+def test_valuation_reads_through_the_seqlock():
+    table = SharedPriceTable.create(table_name(), capacity=4)
+    try:
+        table.write(['BTCUSDT', 'ETHUSDT'], {'price': [60000.0, 3000.0]})
+        snapshot = SharedTickerSnapshot(table)
+        infos = [SimpleNamespace(symbol='BTCUSDT', status='TRADING', base_asset='BTC', quote_asset='USDT'),
+                 SimpleNamespace(symbol='ETHUSDT', status='TRADING', base_asset='ETH', quote_asset='USDT')]
+        exchange_info = type('ExchangeInfo', (), {'updated_at': 1.0, 'all_symbols': lambda self: infos,
+                                                   '__len__': lambda self: len(infos)})()
+        valuator = PortfolioValuator(exchange_info, snapshot)
+
+        valuation = valuator.value({'BTC': 0.5, 'ETH': 2})
+        assert valuation.total == 36000.0
+
+        table.seqs[1] += 1
+        valuation = valuator.value({'BTC': 0.5, 'ETH': 2})
+        assert valuation.total == 30000.0
+        assert valuation.unpriced == ['ETH']
+    finally:
+        table.close()
+
+
+def test_clock_is_published_through_the_header():
+    table = SharedPriceTable.create(table_name(), capacity=4)
+    try:
+        clock = SharedServerClock(table)
+        assert not clock.synced
+        assert clock.error_ns is None
+
+        reference = time.monotonic_ns()
+        table.write_clock(SimpleNamespace(offset_ns=-5_000_000_000, reference_ns=reference, drift=-2e-5,
+                                          error_ns=700_000))
+        assert table.read_clock() == (-5_000_000_000, reference, -2e-5, 700_000)
+        assert clock.synced
+        assert clock.error_ns == 700_000
+        assert abs(clock.server_now_ns() - (time.monotonic_ns() - 5_000_000_000)) < 50_000_000
+    finally:
+        table.close()
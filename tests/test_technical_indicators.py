@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+import pytest
+
+from technical_indicators import IndicatorEngine, atr, bollinger_bands, ema, rsi, sma, vwap
+
+
+def random_klines(count, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    spread = close * rng.uniform(0.001, 0.02, count)
+    return {
+        'open_time': np.arange(count, dtype=np.int64) * 60_000,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.uniform(1, 100, count),
+    }
+
+
+def naive_ema(values, alpha, initial=None):
+    out, previous = [], initial
+    for value in values:
+        previous = value if previous is None else alpha * value + (1 - alpha) * previous
+        out.append(previous)
+    return np.array(out)
+
+
+def test_ema_matches_the_recursion():
+    values = random_klines(5000)['close']
+    for alpha in (2.0 / 21, 1.0 / 14, 0.001, 1.0):
+        np.testing.assert_allclose(ema(values, alpha), naive_ema(values, alpha), rtol=1e-9)
+    np.testing.assert_allclose(ema(values, 0.1, initial=50.0), naive_ema(values, 0.1, initial=50.0), rtol=1e-9)
+
+
+def test_windowed_indicators_match_a_loop():
+    values = random_klines(200)['close']
+    expected_sma = [np.nan] * 19 + [values[i - 19:i + 1].mean() for i in range(19, 200)]
+    np.testing.assert_allclose(sma(values, 20), expected_sma, rtol=1e-12)
+
+    middle, upper, lower = bollinger_bands(values, 20, 2.0)
+    std = values[-20:].std()
+    assert middle[-1] == pytest.approx(values[-20:].mean())
+    assert upper[-1] == pytest.approx(values[-20:].mean() + 2 * std)
+    assert lower[-1] == pytest.approx(values[-20:].mean() - 2 * std)
+
+
+def test_rsi_matches_wilder_smoothing():
+    close = random_klines(300)['close']
+    change = np.diff(close)
+    gain = np.maximum(change, 0)[:14].mean()
+    loss = np.maximum(-change, 0)[:14].mean()
+    for value in change[14:]:
+        gain = (gain * 13 + max(value, 0)) / 14
+        loss = (loss * 13 + max(-value, 0)) / 14
+    assert rsi(close, 14)[-1] == pytest.approx(100 - 100 / (1 + gain / loss))
+    assert np.isnan(rsi(close, 14)[:14]).all()
+    assert rsi(np.arange(30.0), 14)[-1] == 100.0
+
+
+@pytest.mark.parametrize('chunks', [[1000], [500, 500], [600, 1, 1, 398], [100, 300, 600]])
+def test_incremental_updates_match_a_full_recompute(chunks):
+    klines = random_klines(sum(chunks))
+    engine = IndicatorEngine()
+    end = 0
+    for chunk in chunks:
+        end += chunk
+        values = engine.update('BTCUSDT', '1m', {name: column[:end] for name, column in klines.items()})
+
+    full = IndicatorEngine().update('BTCUSDT', '1m', klines)
+    assert values.keys() == full.keys()
+    for name in full:
+        assert values[name] == pytest.approx(full[name], rel=1e-9), name
+
+    close = klines['close']
+    assert full['sma'] == pytest.approx(sma(close, 20)[-1])
+    assert full['rsi'] == pytest.approx(rsi(close, 14)[-1])
+    assert full['atr'] == pytest.approx(atr(klines['high'], klines['low'], close, 14)[-1])
+    assert full['vwap'] == pytest.approx(vwap(klines['high'], klines['low'], close, klines['volume'])[-1])
+
+
+def test_update_without_new_candles_returns_the_last_values():
+    klines = random_klines(100)
+    engine = IndicatorEngine()
+    first = engine.update('BTCUSDT', '1m', klines)
+    assert engine.update('BTCUSDT', '1m', klines) == first
+    assert engine.update('ETHUSDT', '1m', {name: column[:0] for name, column in klines.items()}) == {}
+
+
+def test_short_series_are_not_kept_as_state():
+    klines = random_klines(10)
+    engine = IndicatorEngine()
+    values = engine.update('BTCUSDT', '1m', klines)
+    assert math.isnan(values['sma']) and math.isnan(values['rsi'])
+    # Too short to seed the Wilder averages, the next update starts over with the whole series
+    longer = random_klines(60)
+    assert engine.update('BTCUSDT', '1m', longer) == pytest.approx(IndicatorEngine().update('BTCUSDT', '1m', longer))
+
+
+def test_sliding_windows_match_a_from_scratch_computation():
+    klines = random_klines(1600)
+    engine = IndicatorEngine()
+    # Like the bot, every update passes the latest 1000 closed candles
+    for end in (1000, 1001, 1050, 1300, 1600):
+        window = {name: column[end - 1000:end] for name, column in klines.items()}
+        values = engine.update('BTCUSDT', '1m', window)
+
+        # Recursive indicators continue from the first window, windowed ones only see the candles passed in
+        seen = IndicatorEngine().update('BTCUSDT', '1m', {name: column[:end] for name, column in klines.items()})
+        scratch = IndicatorEngine().update('BTCUSDT', '1m', window)
+        for name in ('ema', 'macd', 'macd_signal', 'macd_histogram', 'rsi', 'atr'):
+            assert values[name] == pytest.approx(seen[name], rel=1e-9), (end, name)
+        for name in ('sma', 'bollinger_middle', 'bollinger_upper', 'bollinger_lower', 'vwap'):
+            assert values[name] == pytest.approx(scratch[name], rel=1e-9), (end, name)
+        assert values['vwap'] == pytest.approx(vwap(window['high'], window['low'], window['close'], window['volume'])[-1])
+
+
+@pytest.mark.parametrize('window', [
+    # A candle is missing after the processed ones
+    np.r_[300:500, 501:600],
+    # The processed candles are no longer in the series
+    np.r_[550:600],
+    # The store was rewritten with a different history
+    np.r_[0:100],
+])
+def test_broken_continuity_starts_over(window):
+    klines = random_klines(600)
+    engine = IndicatorEngine()
+    engine.update('BTCUSDT', '1m', {name: column[:500] for name, column in klines.items()})
+
+    columns = {name: column[window] for name, column in klines.items()}
+    assert engine.update('BTCUSDT', '1m', columns) == pytest.approx(IndicatorEngine().update('BTCUSDT', '1m', columns))
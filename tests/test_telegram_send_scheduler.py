@@ -0,0 +1,81 @@
+import asyncio
+import random
+
+from telegram.error import NetworkError, RetryAfter, TimedOut
+
+from telegram_send_scheduler import TelegramSendScheduler
+
+
+class FakeBot:
+    """
+    Records delivered texts per chat; every call takes a random time, so concurrent sends would reorder.
+    """
+
+    def __init__(self, failures=None):
+        self.delivered = {}
+        self.calls = 0
+        self.failures = failures or {}
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(random.uniform(0, 0.01))
+        failure = self.failures.get(text)
+        if failure:
+            raise failure.pop(0)
+        self.delivered.setdefault(chat_id, []).append(text)
+        return text
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        return await self.send_message(chat_id, text)
+
+
+def scheduler(bot):
+    return TelegramSendScheduler(bot, global_rate=1e6, global_burst=1e6, chat_rate=1e6, chat_burst=3,
+                                 retry_delay=0.01)
+
+
+def test_messages_of_a_chat_are_delivered_in_order():
+    async def run():
+        random.seed(7)
+        bot = FakeBot()
+        sender = scheduler(bot)
+        sender.start()
+        futures = [sender.send_message(chat_id, f'{chat_id}-{i}') for i in range(20) for chat_id in (1, 2, 3)]
+        await asyncio.gather(*futures)
+        await sender.stop()
+        return bot
+
+    bot = asyncio.run(run())
+    for chat_id in (1, 2, 3):
+        assert bot.delivered[chat_id] == [f'{chat_id}-{i}' for i in range(20)]
+
+
+def test_retry_after_keeps_the_order():
+    async def run():
+        bot = FakeBot({'a': [RetryAfter(0.05)], 'b': [NetworkError('connection reset')]})
+        sender = scheduler(bot)
+        sender.start()
+        await asyncio.gather(*(sender.send_message(1, text) for text in 'abcd'))
+        await sender.stop()
+        return bot, sender
+
+    bot, sender = asyncio.run(run())
+    assert bot.delivered[1] == list('abcd')
+    assert sender.retried == 2
+
+
+def test_timed_out_new_message_is_not_sent_twice():
+    async def run():
+        bot = FakeBot({'a': [TimedOut()], 'edit': [TimedOut()]})
+        sender = scheduler(bot)
+        sender.start()
+        results = await asyncio.gather(sender.send_message(1, 'a'), sender.edit_message_text(1, 10, 'edit'),
+                                       return_exceptions=True)
+        await sender.stop()
+        return bot, results
+
+    bot, results = asyncio.run(run())
+    assert isinstance(results[0], TimedOut)
+    # Edits are idempotent and retried
+    assert results[1] == 'edit'
+    assert bot.calls == 3
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+from user_state_store import UserStateStore
+
+
+class CountingStore(UserStateStore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saves = []
+
+    def _save(self, items):
+        self.saves.append(dict(items))
+        super()._save(items)
+
+
+def read_back(path, chat_ids):
+    async def main():
+        store = UserStateStore(path)
+        try:
+            return {chat_id: await store.get(chat_id) for chat_id in chat_ids}
+        finally:
+            await store.stop()
+
+    return asyncio.run(main())
+
+
+def test_updates_are_coalesced_into_one_transaction(tmp_path):
+    path = str(tmp_path / 'state.db')
+
+    async def main():
+        store = CountingStore(path)
+        await store.update(1, symbol='BTCUSDT')
+        await store.update(3, symbol='SOLUSDT')
+        for symbol in ('ETHUSDT', 'BNBUSDT', 'XRPUSDT'):
+            await store.update(2, symbol=symbol, watchlist=[symbol])
+        await store.update(1, symbol=None)
+        assert await store.flush() == 3
+        assert await store.flush() == 0
+        await store.stop()
+        return store.saves
+
+    saves = asyncio.run(main())
+    assert saves == [{1: {}, 2: {'symbol': 'XRPUSDT', 'watchlist': ['XRPUSDT']}, 3: {'symbol': 'SOLUSDT'}}]
+    assert read_back(path, [1, 2, 3]) == {1: {}, 2: {'symbol': 'XRPUSDT', 'watchlist': ['XRPUSDT']},
+                                          3: {'symbol': 'SOLUSDT'}}
+
+
+def test_evicted_chats_are_read_from_the_pending_writes_and_the_database(tmp_path):
+    async def main():
+        store = UserStateStore(str(tmp_path / 'state.db'), cache_size=2)
+        for chat_id in range(4):
+            await store.update(chat_id, symbol=f'COIN{chat_id}USDT')
+        assert list(store._cache) == [2, 3]
+
+        # Not written yet, the pending write still has it
+        assert await store.get_value(0, 'symbol') == 'COIN0USDT'
+        assert list(store._cache) == [3, 0]
+        assert store.misses == 4
+
+        await store.flush()
+        assert await store.get_value(1, 'symbol') == 'COIN1USDT'
+        assert store.misses == 5
+        assert await store.get_value(1, 'symbol') == 'COIN1USDT'
+        assert store.hits == 1
+        assert len(store._cache) == 2
+        await store.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_writes_the_pending_changes(tmp_path):
+    path = str(tmp_path / 'state.db')
+
+    async def main():
+        store = UserStateStore(path, flush_interval=3600)
+        store.start()
+        await store.update(7, portfolio={'BTC': 0.5})
+        await store.stop()
+
+    asyncio.run(main())
+    assert read_back(path, [7]) == {7: {'portfolio': {'BTC': 0.5}}}
+
+
+def test_a_flush_cancelled_by_stop_is_not_lost(tmp_path):
+    path = str(tmp_path / 'state.db')
+    release = threading.Event()
+
+    class FailingStore(CountingStore):
+        def _save(self, items):
+            if not self.saves:
+                self.saves.append(None)
+                # Still writing when stop() cancels the timer, then the disk fails
+                release.wait(5)
+                raise OSError('disk I/O error')
+            super()._save(items)
+
+    async def main():
+        store = FailingStore(path, flush_interval=0.01)
+        store.start()
+        await store.update(7, symbol='BTCUSDT')
+        while not store.saves:
+            await asyncio.sleep(0.01)
+        threading.Timer(0.1, release.set).start()
+        await store.stop()
+        return store.saves
+
+    assert asyncio.run(main()) == [None, {7: {'symbol': 'BTCUSDT'}}]
+    assert read_back(path, [7]) == {7: {'symbol': 'BTCUSDT'}}
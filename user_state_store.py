@@ -0,0 +1,198 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class UserStateStore:
+    """
+    Per-chat settings (default symbol, watchlist, portfolio, ...) persisted in SQLite.
+
+    Every chat is one row holding its settings as a JSON object. The
+    database runs in WAL mode and is only touched by one background thread,
+    so handlers never wait for the disk on the event loop:
+        - reads go through a bounded LRU cache and only load a chat from the
+          database on a miss; concurrent misses of one chat share one load;
+        - writes update the cache and mark the chat dirty; a timer flushes all
+          dirty chats in a single transaction.
+
+    Only recently used chats are kept in memory, so the number of chats is
+    bounded by the disk, not by RAM.
+    """
+
+    DEFAULT_PATH = 'user_state.db'
+
+    def __init__(self, path=DEFAULT_PATH, cache_size=10000, flush_interval=1.0) -> None:
+        """
+        Args:
+            path (str, optional): Location of the database, or ':memory:'. Default: user_state.db.
+            cache_size (int, optional): Chats kept in the LRU cache. Default: 10000.
+            flush_interval (float, optional): Seconds between two flushes of the pending writes. Default: 1.
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        self.flushed = 0
+        self._cache = OrderedDict()
+        self._dirty = {}
+        self._flushing = {}
+        self._loading = {}
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='user-state')
+        self._db = None
+        self._task = None
+
+    def start(self) -> None:
+        """
+        Starts the flush timer on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the flush timer, writes the pending changes and closes the database.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self._call(self._close)
+        self._executor.shutdown(wait=False)
+
+    async def get(self, chat_id) -> dict:
+        """
+        Returns the settings of a chat, an empty dict if it has none.
+
+        The dict is shared with the cache and must not be modified, use update() instead.
+        """
+        state = self._cache.get(chat_id)
+        if state is not None:
+            self._cache.move_to_end(chat_id)
+            self.hits += 1
+            return state
+        state = self._dirty.get(chat_id, self._flushing.get(chat_id))
+        if state is not None:
+            self._remember(chat_id, state)
+            return state
+
+        loading = self._loading.get(chat_id)
+        if loading is None:
+            self.misses += 1
+            loading = self._loading[chat_id] = asyncio.ensure_future(self._call(self._load, chat_id))
+            try:
+                state = await loading
+            finally:
+                del self._loading[chat_id]
+            # An update may have been made while the row was read
+            state = self._cache.get(chat_id, state)
+            self._remember(chat_id, state)
+            return state
+        await loading
+        return await self.get(chat_id)
+
+    async def get_value(self, chat_id, key, default=None):
+        return (await self.get(chat_id)).get(key, default)
+
+    async def update(self, chat_id, **values) -> dict:
+        """
+        Sets settings of a chat; a None value removes the setting. The write is flushed later.
+
+        Returns:
+            dict: The new settings of the chat.
+        """
+        state = dict(await self.get(chat_id))
+        for key, value in values.items():
+            if value is None:
+                state.pop(key, None)
+            else:
+                state[key] = value
+        self._remember(chat_id, state)
+        self._dirty[chat_id] = state
+        return state
+
+    async def flush(self) -> int:
+        """
+        Writes the pending changes in one transaction.
+
+        Returns:
+            int: Number of chats written.
+        """
+        if not self._dirty or self._flushing:
+            return 0
+        self._flushing, self._dirty = self._dirty, {}
+        try:
+            await self._call(self._save, list(self._flushing.items()))
+        except (Exception, asyncio.CancelledError):
+            # Keep the batch for the next flush unless a newer change replaced it. A cancelled
+            # flush (the timer stopped by stop()) may still be writing, writing it again is harmless
+            for chat_id, state in self._flushing.items():
+                self._dirty.setdefault(chat_id, state)
+            raise
+        finally:
+            count = len(self._flushing)
+            self._flushing = {}
+        self.flushed += count
+        return count
+
+    def _remember(self, chat_id, state) -> None:
+        self._cache[chat_id] = state
+        self._cache.move_to_end(chat_id)
+        while len(self._cache) > self.cache_size:
+            # Dirty chats can be evicted, reads find them in the pending writes
+            self._cache.popitem(last=False)
+
+    def _call(self, function, *args):
+        return asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Failed to save the user state: {e!r}")
+
+    # The methods below run on the store thread only
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('CREATE TABLE IF NOT EXISTS chat_state ('
+                       'chat_id INTEGER PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)')
+            self._db = db
+        return self._db
+
+    def _load(self, chat_id) -> dict:
+        row = self._connection().execute('SELECT state FROM chat_state WHERE chat_id = ?', (chat_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _save(self, items) -> None:
+        db = self._connection()
+        now = time.time()
+        db.execute('BEGIN')
+        try:
+            db.executemany(
+                'INSERT INTO chat_state (chat_id, state, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (chat_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at',
+                [(chat_id, json.dumps(state, separators=(',', ':')), now) for chat_id, state in items if state])
+            db.executemany('DELETE FROM chat_state WHERE chat_id = ?',
+                           [(chat_id,) for chat_id, state in items if not state])
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+
+    def _close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None